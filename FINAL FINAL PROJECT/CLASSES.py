@@ -1,7 +1,36 @@
 from ENUMS import ServiceType, EventType
+from PRICING import pricing
+
+
+# Base class of every entity, attributes live in __slots__ so 100k records do not carry 100k dictionaries
+class Record:
+    """class representing an entity stored in __slots__"""
+    __slots__ = ()
+    defaults = {}  # Attribute -> default for attributes missing from records saved by older versions
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.slot_names() if hasattr(self, name)}
+
+    def __setstate__(self, state):
+        # Records pickled before __slots__ hold a plain __dict__, or (dict, slots) for slotted ones
+        if isinstance(state, tuple):
+            state = {**(state[0] or {}), **(state[1] or {})}
+        for name, value in self.defaults.items():
+            if name not in state:
+                state[name] = list(value) if isinstance(value, list) else value
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    @classmethod
+    def slot_names(cls):
+        return [name for klass in cls.__mro__ for name in getattr(klass, '__slots__', ())]
+
+
 # Base Person class
-class Person:
+class Person(Record):
     """class representing person"""
+    __slots__ = ('ID', 'name', 'address', 'contact')
+
     def __init__(self, ID, name, address, contact):
         self.ID = ID
         self.name = name
@@ -11,6 +40,8 @@ class Person:
 # Employee class inherits from Person
 class Employee(Person):
     """class representing employee"""
+    __slots__ = ('department', 'job_title', 'salary')
+
     def __init__(self, ID, name, address, contact, department, job_title, salary):
         super().__init__(ID, name, address, contact)
         self.department = department
@@ -26,6 +57,9 @@ class Employee(Person):
 # Client class inherits from Person
 class Client(Person):
     """class representing client"""
+    __slots__ = ('budget', 'events')
+    defaults = {'events': []}
+
     def __init__(self, client_id, name, address, contact, budget):
         super().__init__(client_id, name, address, contact)
         self.budget = budget
@@ -43,8 +77,10 @@ class Client(Person):
             print(f"Event Type: {event.name}")
 
 
-class Service:
+class Service(Record):
     """class representing service"""
+    __slots__ = ('service_id', 'name', 'contact_details', 'address')
+
     def __init__(self, service_id, name, contact_details, address):
         self.service_id = service_id
         self.name = name
@@ -55,6 +91,8 @@ class Service:
 
 class Catering(Service):
     """class representing catering"""
+    __slots__ = ('menu', 'min_guests', 'max_guests', 'supplier')
+
     def __init__(self, service_id, name, contact_details, address, menu, min_guests, max_guests):
         super().__init__(service_id, name, contact_details, address)
         self.menu = menu
@@ -62,8 +100,10 @@ class Catering(Service):
         self.max_guests = max_guests
         self.supplier= None
 
-class Supplier:
+class Supplier(Record):
     """class representing supplier"""
+    __slots__ = ('supplier_id', 'name', 'address', 'contact_details', 'event_type', 'min_guests', 'max_guests')
+
     def __init__(self, supplier_id, name, address, contact_details, event_type, min_guests, max_guests):
         self.supplier_id = supplier_id
         self.name = name
@@ -74,48 +114,45 @@ class Supplier:
         self.max_guests = max_guests if max_guests is not None else 0
 
 
-class Guest:
+class Guest(Record):
     """class representing guest"""
-    def __init__(self, guest_id, name, address, contact_details, event_type=None, services=None):
+    __slots__ = ('guest_id', 'name', 'email', 'phone_number', 'total_cost', 'event_type', 'services')
+
+    def __init__(self, guest_id, name, email, phone_number, total_cost="0", event_type=None, services=None):
         self.guest_id = guest_id
         self.name = name
-        self.address = address
-        self.contact_details = contact_details
-        self.event_type = event_type
-        self.services = services or []
+        self.email = email
+        self.phone_number = phone_number
+        self.total_cost = total_cost  # Kept as typed, e.g. "1200" or "$1200.00"
+        self.event_type = event_type  # Event type label of the guest's quote, None if they have none
+        self.services = services or ()  # Guests without a quote share one empty tuple instead of a list each
 
     def calculate_cost(self):
-        base_prices = {
-            "Wedding": 1000,
-            "Birthday": 500,
-            "Themed Party": 750,
-            "Graduation": 600
-        }
-        cost = base_prices.get(self.event_type, 0)
-        for service in self.services:
-            if service == "Catering":
-                cost += 200
-            elif service == "Cleaning":
-                cost += 100
-            elif service == "Decorations":
-                cost += 150
-
-
-class Event:
+        # Base price of the event type plus the chosen services, see PRICING.py
+        return pricing.price(self.event_type, self.services)
+
+
+class Event(Record):
     """class representing event"""
+    __slots__ = ('event_id', 'event_type', 'date', 'client', 'venue', 'guest_list', 'services')
+
     def __init__(self, event_id, event_type, date, client, venue, guest_list=None, services=None):
         self.event_id = event_id
         self.event_type = event_type  # Should be an instance of EventType enum
-        self.date = date
-        self.client = client  # This should be an instance of Client
-        self.venue = venue  # This should be an instance of Venue
-        self.guest_list = guest_list if guest_list is not None else []
-        self.services = services if services is not None else []  # List of Service instances
-        self.venue.add_event(self)  # Add this event to the venue's schedule
+        self.date = date  # YYYY-MM-DD
+        self.client = client  # The client's name, or an instance of Client
+        self.venue = venue  # The venue's ID or name, or an instance of Venue
+        self.guest_list = guest_list if guest_list is not None else ()  # Shared empty tuple until guests are set
+        self.services = services if services is not None else ()  # Service instances
+        if isinstance(venue, Venue):
+            self.venue.add_event(self)  # Add this event to the venue's schedule
 
 
-class Venue:
+class Venue(Record):
     """class representing venue"""
+    __slots__ = ('venue_id', 'name', 'address', 'contact', 'min_guests', 'max_guests', 'events')
+    defaults = {'events': []}  # Venues pickled before events existed load with an empty schedule
+
     def __init__(self, venue_id, name, address, contact, min_guests, max_guests):
         self.venue_id = venue_id
         self.name = name
@@ -123,7 +160,7 @@ class Venue:
         self.contact = contact
         self.min_guests = min_guests
         self.max_guests = max_guests
-
+        self.events = []  # Events scheduled at this venue
 
     def add_event(self, event):
         self.events.append(event) #adds event
@@ -0,0 +1,238 @@
+"""Command-line access to the event data, for scripts and servers without a display.
+
+Run from the project folder, for example:
+    python -m CLI list guests --limit 20
+    python -m CLI list guests --sort total_cost --desc --from 500 --to 1500
+    python -m CLI search clients smith
+    python -m CLI add venues name="Grand Hall" address=Dubai contact=0501234567 min_guests=50 max_guests=400
+    python -m CLI import guests guests.csv
+    python -m CLI events-for venues "Grand Hall"
+    python -m CLI suppliers-for WEDDING 300
+    python -m CLI clients-for WEDDING
+    python -m CLI report
+    python -m CLI report --html report.html --csv reports
+    EVENTS_COMPRESSION=guests=zlib python -m CLI compact guests
+"""
+import argparse
+import json
+import sys
+from REPOSITORY import COLUMNS, to_row
+from TRANSFER import KEY_TYPES, headers
+from SERVICES import open_service
+from REPORTS import write_csv, write_html
+
+
+def print_rows(service, name, keys):
+    # One tab separated line per record, after a header line
+    collection = getattr(service, name)
+    print('\t'.join(headers(name)))
+    for key in keys:
+        print('\t'.join(str(value) for value in (key,) + to_row(name, collection[key])))
+
+
+def parse_fields(pairs):
+    # column=value arguments into a row dictionary like one read from an import file
+    row = {}
+    for pair in pairs:
+        column, separator, value = pair.partition('=')
+        if not separator:
+            raise ValueError(f"expected column=value, got {pair!r}")
+        row[column.strip()] = value
+    return row
+
+
+def run_list(service, args):
+    if args.sort:
+        keys = service.sorted_keys(args.name, args.sort, args.desc, args.low, args.high)
+    elif args.low or args.high:
+        raise ValueError("--from and --to filter the field given with --sort")
+    else:
+        keys = list(getattr(service, args.name).keys())
+    print_rows(service, args.name, keys[:args.limit] if args.limit else keys)
+
+
+def run_show(service, args):
+    key = service.find_record(args.name, args.key)
+    if key is None:
+        raise KeyError(f"no {args.name} record matches {args.key!r}")
+    print_rows(service, args.name, [key])
+
+
+def run_search(service, args):
+    print_rows(service, args.name, service.search_records(args.name, args.text, args.limit))
+
+
+def run_add(service, args):
+    print(service.add_record(args.name, parse_fields(args.fields)))
+
+
+def run_delete(service, args):
+    if not service.remove_record(args.name, KEY_TYPES[args.name](args.key)):
+        raise KeyError(f"no {args.name} record with ID {args.key}")
+
+
+def run_import(service, args):
+    count, errors = service.import_records(args.name, args.path)
+    print(f"{count} {args.name} imported")
+    for number, error in errors:
+        print(f"row {number}: {error}", file=sys.stderr)
+
+
+def run_export(service, args):
+    print(f"{service.export_records(args.name, args.path)} {args.name} exported to {args.path}")
+
+
+def run_reprice(service, args):
+    print(f"{len(service.reprice_guests())} guest costs were updated")
+
+
+def run_free_venues(service, args):
+    print_rows(service, 'venues', service.free_venues(args.date, args.guests))
+
+
+def run_events_for(service, args):
+    key = service.find_record(args.name, args.key)
+    if key is None:
+        raise KeyError(f"no {args.name} record matches {args.key!r}")
+    find = service.events_for_venue if args.name == 'venues' else service.events_for_client
+    print_rows(service, 'events', find(key))
+
+
+def run_suppliers_for(service, args):
+    print_rows(service, 'suppliers', service.suppliers_for_event(args.event_type, args.guests))
+
+
+def run_clients_for(service, args):
+    print_rows(service, 'clients', service.clients_for_event_type(args.event_type))
+
+
+def run_report(service, args):
+    if args.csv or args.html:
+        reports = service.reports()
+        paths = write_csv(reports, args.csv) if args.csv else []
+        if args.html:
+            paths.append(write_html(reports, args.html))
+        for path in paths:
+            print(f"report written to {path}")
+        return
+    summary = service.summary()
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    for name, count in summary['counts'].items():
+        print(f"{name}: {count}")
+    print(f"guest revenue: {summary['guest_revenue']:.2f}")
+    for event_type, count in summary['guests_by_event_type'].items():
+        print(f"{event_type} guests: {count}")
+    for event_type, count in summary['events_by_type'].items():
+        print(f"{event_type} events: {count}")
+
+
+def run_compact(service, args):
+    if not hasattr(service.store, 'compact'):
+        raise ValueError("only the journal storage keeps snapshots to compact")
+    for name in args.names or COLUMNS:
+        if name not in COLUMNS:
+            raise ValueError(f"unknown collection {name!r}")
+        service.store.compact(name)
+        print(f"{name} compacted")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m CLI', description="The Best Events Company data tools")
+    parser.add_argument('--data', help="folder holding the data files (default: EVENTS_DATA_DIR or the app's)")
+    parser.add_argument('--storage', choices=('journal', 'sqlite'), help="storage backend (default: EVENTS_STORAGE)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    names = list(COLUMNS)
+
+    command = commands.add_parser('list', help="print the records of a collection")
+    command.add_argument('name', choices=names)
+    command.add_argument('--limit', type=int)
+    command.add_argument('--sort', metavar='FIELD', help="sort by a field, e.g. total_cost, salary or date")
+    command.add_argument('--desc', action='store_true', help="sort from the highest value down")
+    command.add_argument('--from', dest='low', metavar='VALUE', help="only records with the sort field from VALUE")
+    command.add_argument('--to', dest='high', metavar='VALUE', help="only records with the sort field up to VALUE")
+    command.set_defaults(run=run_list)
+
+    command = commands.add_parser('show', help="print one record by ID or name")
+    command.add_argument('name', choices=names)
+    command.add_argument('key')
+    command.set_defaults(run=run_show)
+
+    command = commands.add_parser('search', help="print the records with words starting with the text")
+    command.add_argument('name', choices=names)
+    command.add_argument('text')
+    command.add_argument('--limit', type=int)
+    command.set_defaults(run=run_search)
+
+    command = commands.add_parser('add', help="add a record given as column=value pairs, prints its ID")
+    command.add_argument('name', choices=names)
+    command.add_argument('fields', nargs='+', metavar='column=value')
+    command.set_defaults(run=run_add)
+
+    command = commands.add_parser('delete', help="delete a record by ID")
+    command.add_argument('name', choices=names)
+    command.add_argument('key')
+    command.set_defaults(run=run_delete)
+
+    command = commands.add_parser('import', help="import a CSV or JSON file")
+    command.add_argument('name', choices=names)
+    command.add_argument('path')
+    command.set_defaults(run=run_import)
+
+    command = commands.add_parser('export', help="export a collection to a CSV or JSON file")
+    command.add_argument('name', choices=names)
+    command.add_argument('path')
+    command.set_defaults(run=run_export)
+
+    command = commands.add_parser('reprice', help="recalculate the cost of every quoted guest")
+    command.set_defaults(run=run_reprice)
+
+    command = commands.add_parser('free-venues', help="print the venues free on a date for a number of guests")
+    command.add_argument('date')
+    command.add_argument('guests', type=int)
+    command.set_defaults(run=run_free_venues)
+
+    command = commands.add_parser('events-for', help="print the events of a venue or client, by ID or name")
+    command.add_argument('name', choices=('venues', 'clients'))
+    command.add_argument('key')
+    command.set_defaults(run=run_events_for)
+
+    command = commands.add_parser('suppliers-for', help="print the suppliers serving an event type and number of guests")
+    command.add_argument('event_type')
+    command.add_argument('guests', type=int)
+    command.set_defaults(run=run_suppliers_for)
+
+    command = commands.add_parser('clients-for', help="print the clients interested in an event type")
+    command.add_argument('event_type')
+    command.set_defaults(run=run_clients_for)
+
+    command = commands.add_parser('report', help="print record counts, guest revenue and events per type, or write "
+                                                 "the management reports as CSV files or an HTML page")
+    command.add_argument('--json', action='store_true')
+    command.add_argument('--csv', metavar='FOLDER', help="write one CSV file per report table into FOLDER")
+    command.add_argument('--html', metavar='FILE', help="write every report table into one HTML page")
+    command.set_defaults(run=run_report)
+
+    command = commands.add_parser('compact', help="fold the journals into new snapshots, written with the "
+                                                  "compression EVENTS_COMPRESSION chooses")
+    command.add_argument('names', nargs='*', metavar='name', help="collections to compact (default: all)")
+    command.set_defaults(run=run_compact)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    service = open_service(args.data, args.storage)
+    try:
+        args.run(service, args)
+    except (KeyError, ValueError, OSError) as error:
+        print(f"error: {error.args[0] if error.args else error}", file=sys.stderr)
+        return 1
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import json
+import pickle
+from REPOSITORY import COLUMNS, to_row, from_row, upgrade_record
+
+# Snapshot files start with a header line naming the format, its version and the columns written,
+# followed by one JSON array [id, column values...] per record. Records are rebuilt by from_row, so
+# loading a file never runs code named by the file. Columns may only ever be added at the end: a
+# reader fills the columns an older file does not have with '' and ignores ones it does not know.
+FORMAT = 'events-records'
+VERSION = 1
+
+
+def write_snapshot(f, name, data):
+    # Write every record of a collection to the text file f
+    f.write(json.dumps({'format': FORMAT, 'version': VERSION, 'collection': name,
+                        'columns': COLUMNS[name], 'count': len(data)}) + '\n')
+    for key, record in data.items():
+        f.write(json.dumps([key, *to_row(name, record)], separators=(',', ':')) + '\n')
+
+
+def read_header(f, name):
+    header = json.loads(f.readline() or '{}')
+    if header.get('format') != FORMAT:
+        raise ValueError(f"{getattr(f, 'name', 'file')} is not an {FORMAT} file")
+    if header['version'] > VERSION:
+        raise ValueError(f"{getattr(f, 'name', 'file')} was written by a newer version (format {header['version']})")
+    if header['collection'] != name:
+        raise ValueError(f"{getattr(f, 'name', 'file')} holds {header['collection']}, not {name}")
+    return header
+
+
+def column_mapper(name, columns):
+    # Function turning a row written with columns into a tuple matching today's COLUMNS
+    columns = list(columns)
+    if columns == list(COLUMNS[name]):
+        return tuple
+    positions = [columns.index(column) if column in columns else None for column in COLUMNS[name]]
+    return lambda row: tuple('' if position is None else row[position] for position in positions)
+
+
+def read_snapshot(f, name, data=None):
+    # Read a file written by write_snapshot into data, a new {key: record} if not given
+    header = read_header(f, name)
+    mapper = column_mapper(name, header['columns'])
+    rows = json.loads('[' + ','.join(line for line in f if line.strip()) + ']')
+    if data is None:
+        return {row[0]: from_row(name, row[0], mapper(row[1:])) for row in rows}
+    for row in rows:
+        data[row[0]] = from_row(name, row[0], mapper(row[1:]))
+    return data
+
+
+def encode_entry(op, key, row=None, version=None):
+    # One journal line: ["put", id, column values...] or ["delete", id], followed by {"v": version}
+    # once entries carry the version of the record they write
+    entry = [op, key, *row] if op == 'put' else [op, key]
+    if version is not None:
+        entry.append({'v': version})
+    return json.dumps(entry, separators=(',', ':')) + '\n'
+
+
+def decode_entry(name, line):
+    # (op, id, record or None, version or None) of one journal line
+    entry = json.loads(line)
+    version = entry.pop()['v'] if isinstance(entry[-1], dict) else None  # Column values are never objects
+    op, key = entry[0], entry[1]
+    if op != 'put':
+        return op, key, None, version
+    row = tuple(entry[2:])
+    row += ('',) * (len(COLUMNS[name]) - len(row))  # Written before a column was added
+    return op, key, from_row(name, key, row), version
+
+
+class RecordUnpickler(pickle.Unpickler):
+    """class representing an unpickler for files written by older versions, it only rebuilds the app's classes"""
+    ALLOWED = {('CLASSES', name) for name in ('Person', 'Employee', 'Client', 'Service', 'Catering',
+                                              'Supplier', 'Guest', 'Event', 'Venue')}
+    ALLOWED |= {('ENUMS', 'EventType'), ('ENUMS', 'ServiceType'),
+                ('copyreg', '_reconstructor'), ('builtins', 'object')}
+
+    def find_class(self, module, name):
+        if (module, name) not in self.ALLOWED:
+            raise pickle.UnpicklingError(f"{module}.{name} is not allowed in a data file")
+        return super().find_class(module, name)
+
+
+def load_legacy(f):
+    # Read one pickled object written by an older version, e.g. a whole snapshot or a journal entry
+    return RecordUnpickler(f).load()
+
+
+def upgrade_collection(name, data):
+    # Replace the dictionaries older versions stored for guests and events with records
+    if name in ('guests', 'events'):
+        for key, record in data.items():
+            if isinstance(record, dict):
+                data[key] = upgrade_record(name, key, record)
+    return data
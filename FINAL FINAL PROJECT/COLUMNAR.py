@@ -0,0 +1,366 @@
+from array import array
+from collections.abc import MutableMapping
+from PRICING import pricing, load_numpy, format_cost
+
+
+def parse_cost(text):
+    # Costs are typed as "1200", "1200.5" or "$1,200.00", returns None for anything else
+    try:
+        return float(str(text).strip().lstrip('$').replace(',', '') or 0)
+    except ValueError:
+        return None
+
+
+class TextColumn:
+    """class representing a column of strings packed one after another into a single UTF-8 buffer"""
+    def __init__(self):
+        self.heap = bytearray()
+        self.starts = array('I')  # Row -> offset of its text in heap
+        self.lengths = array('I')  # Row -> length of its text in bytes
+        self.garbage = 0  # Bytes of heap no row points at any more, reclaimed by compacted()
+
+    def append(self, text):
+        data = str(text).encode('utf-8')
+        self.starts.append(len(self.heap))
+        self.lengths.append(len(data))
+        self.heap += data
+
+    def get(self, row):
+        start = self.starts[row]
+        return self.heap[start:start + self.lengths[row]].decode('utf-8')
+
+    def set(self, row, text):
+        # Changed text goes at the end of the heap, the old bytes become garbage
+        data = str(text).encode('utf-8')
+        start = self.starts[row]
+        if self.heap[start:start + self.lengths[row]] == data:
+            return
+        self.garbage += self.lengths[row]
+        self.starts[row] = len(self.heap)
+        self.lengths[row] = len(data)
+        self.heap += data
+
+    def compacted(self, rows):
+        column = TextColumn()
+        for row in rows:
+            start = self.starts[row]
+            column.starts.append(len(column.heap))
+            column.lengths.append(self.lengths[row])
+            column.heap += self.heap[start:start + self.lengths[row]]
+        return column
+
+
+class DictColumn:
+    """class representing a column of values from a small set, stored as codes into a list of the distinct values"""
+    def __init__(self, empty=None):
+        self.values = [empty]  # Code -> value, code 0 is the empty value
+        self.value_codes = {empty: 0}  # Value -> code
+        self.codes = array('I')  # Row -> code
+
+    def code(self, value):
+        code = self.value_codes.get(value)
+        if code is None:
+            code = self.value_codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value):
+        self.codes.append(self.code(value))
+
+    def get(self, row):
+        return self.values[self.codes[row]]
+
+    def set(self, row, value):
+        self.codes[row] = self.code(value)
+
+    def compacted(self, rows):
+        column = DictColumn()
+        column.values = list(self.values)
+        column.value_codes = dict(self.value_codes)
+        column.codes = array('I', (self.codes[row] for row in rows))
+        return column
+
+
+def text_property(column):
+    def get(self):
+        return getattr(self.table, column).get(self.table.row(self.guest_id))
+
+    def set(self, value):
+        getattr(self.table, column).set(self.table.row(self.guest_id), value)
+    return property(get, set)
+
+
+class GuestRow:
+    """class representing one guest of a GuestTable, reading and writing its columns directly"""
+    __slots__ = ('table', 'guest_id')
+
+    def __init__(self, table, guest_id):
+        self.table = table
+        self.guest_id = guest_id
+
+    name = text_property('names')
+    email = text_property('emails')
+    phone_number = text_property('phones')
+
+    @property
+    def total_cost(self):
+        return self.table.cost_text(self.table.row(self.guest_id))
+
+    @total_cost.setter
+    def total_cost(self, value):
+        self.table.set_cost(self.table.row(self.guest_id), value)
+
+    @property
+    def event_type(self):
+        return self.table.event_types.get(self.table.row(self.guest_id))
+
+    @event_type.setter
+    def event_type(self, value):
+        self.table.set_event_type(self.table.row(self.guest_id), value)
+
+    @property
+    def services(self):
+        return list(self.table.services.get(self.table.row(self.guest_id)))
+
+    @services.setter
+    def services(self, value):
+        self.table.services.set(self.table.row(self.guest_id), tuple(value or ()))
+
+    def calculate_cost(self):
+        return pricing.price(self.event_type, self.services)
+
+
+class GuestTable(MutableMapping):
+    """class representing the guests as typed columns with a dense ID to row index, instead of one object per guest"""
+    def __init__(self):
+        self.ids = array('q')  # Row -> numeric guest ID, -1 for deleted rows and IDs that are not plain numbers
+        self.other_keys = {}  # Row -> guest ID, for IDs that are not plain numbers such as "G12" or are too large
+        self.rows = array('q')  # Numeric guest ID -> row, -1 where there is none
+        self.other_rows = {}  # Guest ID -> row, for IDs that are not plain numbers or are too large for self.rows
+        self.live = bytearray()  # Row -> 1, or 0 once the guest is deleted
+        self.count = 0
+        self.names = TextColumn()
+        self.emails = TextColumn()
+        self.phones = TextColumn()
+        self.costs = array('d')  # Row -> total cost, 0 for deleted rows so sums need no mask
+        self.odd_costs = {}  # Row -> total cost as typed, for costs that are not numbers
+        self.event_types = DictColumn()  # Event type label of the guest's quote, None without one
+        self.services = DictColumn(())  # Tuple of services of the guest's quote
+        # Event type code -> number of guests and sum of their costs, kept up to date on every change
+        # so revenue reports never scan the columns
+        self.type_counts = array('q')
+        self.type_costs = array('d')
+
+    @staticmethod
+    def numeric_id(key):
+        return int(key) if isinstance(key, str) and key.isdigit() and str(int(key)) == key else None
+
+    def dense_limit(self):
+        # Numeric IDs below this get a slot in self.rows, a stray large ID such as "9999999999" would
+        # otherwise allocate a slot for every number below it
+        return max(1024, 2 * len(self.ids))
+
+    def find_row(self, key):
+        number = self.numeric_id(key)
+        row = self.rows[number] if number is not None and number < len(self.rows) else -1
+        return row if row >= 0 else self.other_rows.get(key, -1)
+
+    def row(self, key):
+        row = self.find_row(key)
+        if row < 0:
+            raise KeyError(key)
+        return row
+
+    def key_of(self, row):
+        number = self.ids[row]
+        return str(number) if number >= 0 else self.other_keys[row]
+
+    def cost_text(self, row):
+        return self.odd_costs[row] if row in self.odd_costs else format_cost(self.costs[row])
+
+    def tally(self, code, count, cost):
+        # Add to the totals of an event type code
+        if code >= len(self.type_counts):
+            self.type_counts.extend([0] * (code + 1 - len(self.type_counts)))
+            self.type_costs.extend([0.0] * (code + 1 - len(self.type_costs)))
+        self.type_counts[code] += count
+        self.type_costs[code] += cost
+
+    def set_cost(self, row, value):
+        cost = parse_cost(value)
+        self.odd_costs.pop(row, None)
+        if cost is None:
+            self.odd_costs[row] = str(value)  # Kept as typed, counted as 0 in totals
+            cost = 0.0
+        self.tally(self.event_types.codes[row], 0, cost - self.costs[row])
+        self.costs[row] = cost
+
+    def set_event_type(self, row, value):
+        # Move the guest and its cost to the totals of its new event type
+        old = self.event_types.codes[row]
+        self.event_types.set(row, value or None)
+        new = self.event_types.codes[row]
+        if new != old:
+            self.tally(old, -1, -self.costs[row])
+            self.tally(new, 1, self.costs[row])
+
+    def __getitem__(self, key):
+        self.row(key)
+        return GuestRow(self, key)
+
+    def __setitem__(self, key, guest):
+        row = self.find_row(key)
+        if row >= 0:
+            self.names.set(row, guest.name)
+            self.emails.set(row, guest.email)
+            self.phones.set(row, guest.phone_number)
+        else:
+            row = len(self.ids)
+            number = self.numeric_id(key)
+            if number is not None and number >= len(self.rows) and number >= self.dense_limit():
+                number = None  # Kept like an ID that is not a number
+            if number is None:
+                self.ids.append(-1)
+                self.other_keys[row] = key
+                self.other_rows[key] = row
+            else:
+                if number >= len(self.rows):
+                    self.rows.extend([-1] * (number + 1 - len(self.rows)))
+                self.rows[number] = row
+                self.ids.append(number)
+            self.live.append(1)
+            self.count += 1
+            self.names.append(guest.name)
+            self.emails.append(guest.email)
+            self.phones.append(guest.phone_number)
+            self.costs.append(0.0)
+            self.event_types.append(None)
+            self.services.append(())
+            self.tally(0, 1, 0.0)
+        self.set_cost(row, guest.total_cost)
+        self.set_event_type(row, guest.event_type)
+        self.services.set(row, tuple(guest.services or ()))
+        self.maybe_compact()  # Only once every column is written, compacting moves the rows
+
+    def __delitem__(self, key):
+        row = self.row(key)
+        number = self.ids[row]
+        if number >= 0:
+            self.rows[number] = -1
+            self.ids[row] = -1
+        else:
+            del self.other_rows[self.other_keys.pop(row)]
+        self.live[row] = 0
+        self.count -= 1
+        self.tally(self.event_types.codes[row], -1, -self.costs[row])
+        self.costs[row] = 0.0  # Deleted rows count as 0 in every sum
+        self.odd_costs.pop(row, None)
+        self.event_types.set(row, None)
+        self.services.set(row, ())
+        self.maybe_compact()
+
+    def __contains__(self, key):
+        return self.find_row(key) >= 0
+
+    def __iter__(self):
+        live = self.live
+        for row in range(len(self.ids)):
+            if live[row]:
+                yield self.key_of(row)
+
+    def __len__(self):
+        return self.count
+
+    def copy(self):
+        # Copy of the columns without the deleted rows, e.g. for writing a snapshot on another thread
+        table = GuestTable()
+        rows = [row for row in range(len(self.ids)) if self.live[row]]
+        table.ids = array('q', (self.ids[row] for row in rows))
+        table.other_keys = {new: self.other_keys[old] for new, old in enumerate(rows) if old in self.other_keys}
+        table.other_rows = {key: new for new, key in table.other_keys.items()}
+        table.rows = array('q', [-1]) * len(self.rows)
+        for new, number in enumerate(table.ids):
+            if number >= 0:
+                table.rows[number] = new
+        table.live = bytearray(b'\x01') * len(rows)
+        table.count = len(rows)
+        table.names = self.names.compacted(rows)
+        table.emails = self.emails.compacted(rows)
+        table.phones = self.phones.compacted(rows)
+        table.costs = array('d', (self.costs[row] for row in rows))
+        table.odd_costs = {new: self.odd_costs[old] for new, old in enumerate(rows) if old in self.odd_costs}
+        table.event_types = self.event_types.compacted(rows)
+        table.services = self.services.compacted(rows)
+        table.type_counts = array('q', self.type_counts)  # Codes are the same in the compacted columns
+        table.type_costs = array('d', self.type_costs)
+        return table
+
+    def maybe_compact(self):
+        # Compact once half the rows are deleted or half the text is garbage
+        if len(self.ids) > 1024 and self.count < len(self.ids) // 2:
+            self.compact()
+        elif any(column.garbage > 65536 and column.garbage > len(column.heap) // 2
+                 for column in (self.names, self.emails, self.phones)):
+            self.compact()
+
+    def compact(self):
+        # Drop deleted rows and unused text, row numbers change but keys do not
+        self.__dict__.update(self.copy().__dict__)
+
+    def total_revenue(self):
+        # Sum of every guest's cost, from the running totals
+        return sum(self.type_costs)
+
+    def guests_per_event_type(self):
+        # {event type label: number of guests}, guests without a quote are left out
+        values = self.event_types.values
+        return {values[code]: count for code, count in enumerate(self.type_counts) if code and count}
+
+    def revenue_per_event_type(self):
+        values = self.event_types.values
+        return {values[code]: self.type_costs[code] for code in range(1, len(self.type_counts))
+                if self.type_counts[code]}
+
+    def reprice(self, pricing):
+        # Recalculate the cost of every guest with a quote straight from the code columns: price each
+        # distinct (event type, services) pair once, then gather every row's price from that table in one
+        # pass, with NumPy when it is installed. Returns the keys of the guests whose cost changed
+        width = len(self.services.values)
+        prices = pricing.code_prices(self.event_types.values, self.services.values)
+        event_codes = self.event_types.codes
+        service_codes = self.services.codes
+        numpy = load_numpy()
+        if numpy is not None and len(self.ids):
+            events = numpy.frombuffer(event_codes, dtype=event_codes.typecode).astype(numpy.intp)
+            services = numpy.frombuffer(service_codes, dtype=service_codes.typecode)
+            costs = numpy.frombuffer(self.costs, dtype=self.costs.typecode)  # Writes go to self.costs
+            new = numpy.take(numpy.array(prices, dtype=numpy.float64), events * width + services)
+            changed = (events != 0) & (new != costs)
+            if self.odd_costs:
+                # Costs typed as text count as 0, a quote replaces them even when it prices at 0
+                odd = numpy.fromiter(self.odd_costs, dtype=numpy.intp, count=len(self.odd_costs))
+                changed[odd] |= events[odd] != 0
+            rows = numpy.flatnonzero(changed)
+            deltas = numpy.bincount(events[rows], weights=new[rows] - costs[rows], minlength=len(self.type_costs))
+            costs[rows] = new[rows]
+            deltas = {code: float(deltas[code]) for code in numpy.flatnonzero(deltas).tolist()}
+            rows = rows.tolist()
+        else:
+            deltas = {}  # Event type code -> change of its cost total
+            rows = []
+            costs = self.costs
+            for row, (event, service, cost) in enumerate(zip(event_codes, service_codes, costs)):
+                if event:
+                    price = prices[event * width + service]
+                    if price != cost or row in self.odd_costs:
+                        deltas[event] = deltas.get(event, 0.0) + price - cost
+                        costs[row] = price
+                        rows.append(row)
+        for code, delta in deltas.items():
+            self.tally(code, 0, delta)
+        if self.odd_costs:
+            for row in rows:
+                self.odd_costs.pop(row, None)
+        if self.other_keys:
+            return [self.key_of(row) for row in rows]
+        return list(map(str, map(self.ids.__getitem__, rows)))  # Every ID is a plain number
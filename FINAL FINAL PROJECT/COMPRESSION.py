@@ -0,0 +1,80 @@
+import lzma
+import os
+import zlib
+
+# Codec of each collection's snapshots, e.g. EVENTS_COMPRESSION=zlib for all of them or
+# EVENTS_COMPRESSION=guests=lzma,clients=zlib for some. Snapshots are uncompressed and memory-mapped by default.
+COMPRESSION = os.environ.get('EVENTS_COMPRESSION', '')
+
+zstd = None  # zstandard module, imported by load_zstd when installed
+zstd_checked = False
+
+
+def load_zstd():
+    # Import zstandard once, the zstd codec is only offered when it is installed
+    global zstd, zstd_checked
+    if not zstd_checked:
+        zstd_checked = True
+        try:
+            import zstandard
+            zstd = zstandard
+        except ImportError:
+            zstd = None
+    return zstd
+
+
+class Codec:
+    """class representing a compression method for snapshot chunks, each chunk is compressed on its own"""
+    def __init__(self, name, compress, decompress):
+        self.name = name  # Written into the snapshot, so a file names the codec it needs
+        self.compress = compress
+        self.decompress = decompress
+
+
+def zstd_codec():
+    module = load_zstd()
+    if module is None:
+        return None
+    return Codec('zstd', module.ZstdCompressor(level=3).compress, module.ZstdDecompressor().decompress)
+
+
+CODECS = {
+    'zlib': lambda: Codec('zlib', lambda data: zlib.compress(data, 6), zlib.decompress),
+    'lzma': lambda: Codec('lzma', lambda data: lzma.compress(data, preset=6), lzma.decompress),
+    'zstd': zstd_codec,
+}
+
+
+def available_codecs():
+    # Names of the codecs that can be used here, zstd only when zstandard is installed
+    return [name for name, make in CODECS.items() if name != 'zstd' or load_zstd() is not None]
+
+
+def get_codec(name):
+    # Codec called name, None for no compression
+    if not name or name == 'none':
+        return None
+    if name not in CODECS:
+        raise ValueError(f"Unknown compression: {name}")
+    codec = CODECS[name]()
+    if codec is None:
+        raise ValueError(f"{name} compression needs the zstandard package")  # Only zstd is optional
+    return codec
+
+
+def parse_compression(text):
+    # "zlib" -> {'*': 'zlib'}, "guests=lzma,clients=zlib" -> {'guests': 'lzma', 'clients': 'zlib'}
+    choices = {}
+    for part in (text or '').split(','):
+        name, separator, codec = part.strip().rpartition('=')
+        if codec.strip():
+            choices[name.strip() if separator else '*'] = codec.strip().lower()
+    return choices
+
+
+def codec_for(name, compression=None):
+    # Codec name of a collection from a {collection or '*': codec} choice, EVENTS_COMPRESSION if not given
+    choices = parse_compression(COMPRESSION) if compression is None else compression
+    if isinstance(choices, str):
+        choices = parse_compression(choices)
+    return choices.get(name, choices.get('*'))
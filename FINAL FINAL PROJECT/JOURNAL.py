@@ -0,0 +1,550 @@
+import atexit
+import json
+import os
+import pickle
+import threading
+import time
+from REPOSITORY import Repository, to_row, upgrade_record
+from CODEC import read_snapshot, encode_entry, decode_entry, load_legacy, upgrade_collection
+from COLUMNAR import GuestTable
+from METRICS import metrics
+from SNAPSHOT import MappedSnapshot, MappedCollection, open_snapshot, write_snapshot
+from COMPRESSION import codec_for, get_codec
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Container each collection is loaded into, a plain dictionary unless listed
+CONTAINERS = {'guests': GuestTable}
+
+# Several copies of the app may share a data folder. Each collection has, next to its files:
+#   guests.lock        locked while a process reads or changes the files below
+#   guests.meta        JSON with the journal generation and the next free ID
+#   guests.pkl.journal changes of every process, one JSON line each, ending with the record's new version
+#   guests.pkl.journal.<generation>  older journals, renamed when they were compacted
+#   guests.<generation>.snap  snapshot of every journal up to and including that generation
+# A process remembers how far into the journal it has read. Before writing it reads what the others wrote
+# since, drops its own change to any record they changed first and writes the rest, so changes to
+# different records merge and the first change to a record wins.
+VERSION_SHIFT = 40  # A version is the generation shifted left by this, plus where the entry ends in the journal
+
+
+class FileLock:
+    """class representing an advisory lock on a file, exclusive between processes and between threads"""
+    def __init__(self, path):
+        self.path = path
+        self.thread_lock = threading.RLock()
+        self.depth = 0  # How many times the thread holding the lock has entered it
+        self.file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def acquire(self, timeout=None):
+        # Take the lock, waiting at most timeout seconds if given. Returns False if it was not free in time
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self.thread_lock.acquire(timeout=-1 if timeout is None else timeout):
+            return False
+        if self.depth == 0:
+            try:
+                self.file = open(self.path, 'a+b')
+                while not self.lock_file(blocking=deadline is None):
+                    if time.monotonic() >= deadline:
+                        self.file.close()
+                        self.file = None
+                        self.thread_lock.release()
+                        return False
+                    time.sleep(0.01)
+            except BaseException:
+                if self.file is not None:
+                    self.file.close()
+                    self.file = None
+                self.thread_lock.release()
+                raise
+        self.depth += 1
+        return True
+
+    def lock_file(self, blocking=True):
+        # Lock the open file against other processes, returns False if one holds it and blocking is False
+        if fcntl is not None:
+            try:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                return False
+            return True
+        self.file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False  # LK_LOCK gives up after 10 seconds, keep waiting
+
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+            else:
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+            self.file.close()
+            self.file = None
+        self.thread_lock.release()
+
+
+class CollectionJournal:
+    """class representing the snapshots and change journal of one collection, shared with other processes"""
+    def __init__(self, snapshot_path, compact_every=500, name=None, container=dict, codec=None):
+        base_path = os.path.splitext(snapshot_path)[0]
+        self.directory = os.path.dirname(snapshot_path) or '.'
+        self.snapshot_path = snapshot_path  # Pickled snapshot written by older versions, e.g. guests.pkl
+        self.records_path = base_path + '.records'  # Snapshot in the CODEC format, written by older versions
+        self.mapped_path = base_path + '.snap'  # Snapshot written before snapshots were numbered by generation
+        self.name = name or os.path.splitext(os.path.basename(snapshot_path))[0]  # Collection name, e.g. guests
+        self.container = container  # Mapping type the collection is loaded into
+        self.codec = codec  # Compression of the snapshots this process writes, None for memory-mapped ones
+        self.journal_path = snapshot_path + '.journal'  # Changes written since the last compaction
+        self.compacting_path = snapshot_path + '.journal.compacting'  # Journal older versions were compacting
+        self.meta_path = base_path + '.meta'
+        self.file_lock = FileLock(base_path + '.lock')
+        self.compact_every = compact_every  # Number of journal entries before a compaction is started
+        self.entries = 0  # Entries in the current journal file
+        self.generation = 0  # Generation of the journal file being read, every compaction starts a new one
+        self.offset = 0  # Bytes of the current journal file this process has read or written
+        self.lock = threading.RLock()  # Guards pending, versions, remote and conflicts
+        self.pending = {}  # Key -> (version the change was made to, op, row) not written yet, one per record
+        self.versions = {}  # Key -> version of the record as this process has it, 0 if not in self.versions
+        self.remote = {}  # Key -> (op, record, version) written by other processes, not applied yet
+        self.conflicts = []  # Keys whose change was dropped because another process changed the record first
+        self.needs_reload = False  # Set when journals this process had not read yet were already removed
+        self.writer = None  # JournalWriter that writes pending changes in the background, None to write at once
+        self.compactor = None  # Background thread writing a snapshot, if one is running
+
+    def numbered(self, prefix, suffix=''):
+        # {generation: path} of the files in the folder named prefix + generation + suffix
+        found = {}
+        for file_name in os.listdir(self.directory):
+            number = file_name[len(prefix):len(file_name) - len(suffix)]
+            if file_name.startswith(prefix) and file_name.endswith(suffix) and number.isdigit():
+                found[int(number)] = os.path.join(self.directory, file_name)
+        return found
+
+    def snapshots(self):
+        return self.numbered(self.name + '.', '.snap')
+
+    def rotated(self):
+        return self.numbered(os.path.basename(self.journal_path) + '.')
+
+    def read_meta(self):
+        try:
+            with open(self.meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'generation': 0}
+
+    def write_meta(self, meta):
+        temp_path = self.meta_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(temp_path, self.meta_path)
+
+    def read_base(self, container, versions):
+        # The newest snapshot in a new container, and the generation it includes (-1 for older formats)
+        snapshots = self.snapshots()
+        generation = max(snapshots, default=-1)
+        snapshot = open_snapshot(snapshots[generation] if snapshots else self.mapped_path, self.name)
+        if isinstance(snapshot, MappedSnapshot) and container is dict:
+            data = MappedCollection(snapshot)  # Records are only decoded when used
+        else:
+            data = container()
+        if snapshot is not None and not isinstance(data, MappedCollection):
+            data.update(snapshot.items())  # Compressed snapshots are decoded chunk by chunk as they are read
+        elif snapshot is None and os.path.exists(self.records_path):
+            with open(self.records_path, encoding='utf-8') as f:
+                read_snapshot(f, self.name, data)
+        elif snapshot is None and os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'rb') as f:
+                data.update(upgrade_collection(self.name, load_legacy(f)))
+        if not snapshots:
+            self.replay(self.compacting_path, data, versions)
+        return data, generation
+
+    def load(self):
+        # Start from the newest snapshot, then replay the journals written after it
+        with self.file_lock:
+            versions = {}
+            data, generation = self.read_base(self.container, versions)
+            rotated = self.rotated()
+            for number in sorted(rotated):
+                if number > generation:
+                    self.replay(rotated[number], data, versions)
+            self.generation = self.read_meta()['generation']
+            self.entries, self.offset = self.replay(self.journal_path, data, versions)
+            with self.lock:
+                self.versions = versions
+                self.remote = {}
+                self.needs_reload = False
+        self.maybe_compact()
+        return data
+
+    def read_entries(self, path, start=0):
+        # (op, key, record, version, end offset) of every complete entry of a journal file after start
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as f:
+            f.seek(start)
+            while True:
+                try:
+                    if f.peek(1)[:1] == b'\x80':
+                        # Entry pickled by an older version
+                        op, key, value = load_legacy(f)
+                        value, version = upgrade_record(self.name, key, value), None
+                    else:
+                        line = f.readline()
+                        if not line.endswith(b'\n'):
+                            break
+                        op, key, value, version = decode_entry(self.name, line)
+                except (EOFError, pickle.UnpicklingError, ValueError, IndexError, KeyError, TypeError):
+                    break  # End of file, or an entry cut short by a crash
+                yield op, key, value, version, f.tell()
+
+    def replay(self, path, data, versions):
+        # Apply every complete entry of a journal file to data, returns (number of entries, bytes read)
+        count = offset = 0
+        for op, key, value, version, offset in self.read_entries(path):
+            if op == 'put':
+                data[key] = value
+            else:
+                data.pop(key, None)
+            if version is not None:
+                versions[key] = version
+            count += 1
+        return count, offset
+
+    def catch_up(self):
+        # Read what other processes wrote since this one last read or wrote, into self.remote.
+        # Called with the file lock held, returns False if a journal it still had to read is gone
+        generation = self.read_meta()['generation']
+        paths = [(self.journal_path, self.offset)]
+        if generation != self.generation:
+            # Others compacted meanwhile: finish the renamed journals, then read the new one from the start
+            rotated = self.rotated()
+            if any(number not in rotated for number in range(self.generation, generation)):
+                self.needs_reload = True
+                return False
+            paths = [(rotated[number], self.offset if number == self.generation else 0)
+                     for number in range(self.generation, generation)] + [(self.journal_path, 0)]
+            self.generation, self.offset, self.entries = generation, 0, 0
+        for path, start in paths:
+            for op, key, value, version, offset in self.read_entries(path, start):
+                with self.lock:
+                    self.remote[key] = (op, value, version)
+                if path == self.journal_path:
+                    self.offset = offset
+                    self.entries += 1
+        return True
+
+    def disk_version(self, key):
+        # Version of the record as last written by any process
+        return self.remote[key][2] if key in self.remote else self.versions.get(key, 0)
+
+    def remote_changes(self, timeout=None):
+        # [(key, record, or None if deleted)] written by other processes since the last call, and the keys
+        # whose change from this process was dropped because another process changed the record first.
+        # The caller applies the changes to the collection. With a timeout, the journal is only read if the
+        # file lock is free within it, e.g. not held by another process reading a whole snapshot
+        if self.file_lock.acquire(timeout):
+            try:
+                self.catch_up()
+            finally:
+                self.file_lock.release()
+        with self.lock:
+            remote, self.remote = self.remote, {}
+            conflicts, self.conflicts = self.conflicts, []
+            for key, (op, value, version) in remote.items():
+                self.versions[key] = version
+        return [(key, value if op == 'put' else None) for key, (op, value, version) in remote.items()], conflicts
+
+    def append(self, op, key, value=None):
+        # Queue a single change for the writer
+        self.append_many([(op, key, value)])
+
+    def append_many(self, ops):
+        # Queue several changes, their rows are taken now so later edits to the records are saved separately
+        changes = [(op, key, to_row(self.name, value) if op == 'put' else None) for op, key, value in ops]
+        with self.lock:
+            for op, key, row in changes:
+                # A change replacing one not written yet keeps the version the first one was made to
+                base = self.pending.pop(key)[0] if key in self.pending else self.versions.get(key, 0)
+                self.pending[key] = (base, op, row)
+        self.written()
+
+    def written(self):
+        if self.writer is not None:
+            self.writer.mark_dirty(self)
+        else:
+            self.flush()
+
+    def flush(self):
+        # Write the queued changes no other process got to first, with a single write
+        with self.file_lock:
+            if not self.pending or not self.catch_up():
+                return  # After a failed catch up the changes wait until the collection is reloaded
+            if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) > self.offset:
+                os.truncate(self.journal_path, self.offset)  # Half an entry left by a process that crashed
+            with self.lock:
+                pending, self.pending = self.pending, {}
+                lines = []
+                written = {}  # Key -> (change, version before), to undo if the write fails
+                offset = self.offset
+                for key, (base, op, row) in pending.items():
+                    if base != self.disk_version(key):
+                        self.conflicts.append(key)  # The other process's change is applied instead
+                        continue
+                    line = encode_entry(op, key, row, 0).encode('utf-8')
+                    version = (self.generation << VERSION_SHIFT) + offset + len(line)  # Unique, never 0
+                    line = encode_entry(op, key, row, version).encode('utf-8')
+                    lines.append(line)
+                    offset += len(line)
+                    written[key] = ((base, op, row), self.versions.get(key))
+                    self.versions[key] = version
+            if not lines:
+                return
+            try:
+                with metrics.timer('journal_write', self.name) as timing, open(self.journal_path, 'ab') as f:
+                    f.write(b''.join(lines))
+                    timing.records = len(lines)
+            except OSError:
+                if os.path.exists(self.journal_path):
+                    os.truncate(self.journal_path, self.offset)
+                with self.lock:
+                    for key, (change, version) in written.items():
+                        if version is None:
+                            self.versions.pop(key, None)
+                        else:
+                            self.versions[key] = version
+                        if key in self.pending:
+                            change = (change[0],) + self.pending[key][1:]  # Changes made meanwhile win
+                        self.pending[key] = change
+                raise
+            self.offset = offset
+            self.entries += len(lines)
+            self.maybe_compact()
+
+    def is_compacting(self):
+        return self.compactor is not None and self.compactor.is_alive()
+
+    def maybe_compact(self):
+        with self.file_lock:
+            if self.entries >= self.compact_every and self.catch_up() and self.entries >= self.compact_every:
+                self.compact()
+
+    def compact(self, background=True):
+        # Start a new journal generation and fold the old one into a snapshot
+        with self.file_lock:
+            generation = self.generation
+            if os.path.exists(self.journal_path):
+                os.replace(self.journal_path, f'{self.journal_path}.{generation}')
+            meta = self.read_meta()
+            meta['generation'] = generation + 1
+            self.write_meta(meta)
+            self.generation, self.offset, self.entries = generation + 1, 0, 0
+        if self.is_compacting():
+            return  # The next compaction folds this generation as well
+        if background:
+            self.compactor = threading.Thread(target=self.fold, args=(generation,), daemon=True)
+            self.compactor.start()
+        else:
+            self.fold(generation)
+
+    def fold(self, generation):
+        # Write the snapshot of every journal up to generation, then remove the files it replaces
+        with metrics.timer('compact', self.name) as timing:
+            with self.file_lock:
+                data, base = self.read_base(dict, {})
+                rotated = self.rotated()
+                for number in sorted(rotated):
+                    if base < number <= generation:
+                        self.replay(rotated[number], data, {})
+            write_snapshot(os.path.join(self.directory, f'{self.name}.{generation}.snap'), self.name, data,
+                           self.codec)
+            timing.records = len(data)
+        with self.file_lock:
+            # The journal of this generation is kept for processes that have not read all of it yet
+            old_files = [path for number, path in self.rotated().items() if number < generation]
+            old_files += [path for number, path in self.snapshots().items() if number < generation]
+            old_files += [self.mapped_path, self.records_path, self.snapshot_path, self.compacting_path]
+            for path in old_files:
+                try:
+                    if os.path.exists(path):
+                        os.remove(path)
+                except PermissionError:
+                    pass  # Windows keeps a snapshot another process has mapped, the next compaction retries
+
+    def allocate_ids(self, minimum, count=1):
+        # Reserve count IDs no other process will hand out, returns the first; minimum is this process's own guess
+        with self.file_lock:
+            meta = self.read_meta()
+            first = max(meta.get('next_id', 1), minimum)
+            meta['next_id'] = first + count
+            self.write_meta(meta)
+        return first
+
+    def close(self):
+        if self.needs_reload and self.pending:
+            self.load()  # Check the queued changes against what the others wrote
+        self.flush()
+        if self.compactor is not None:
+            self.compactor.join()
+
+
+class JournalWriter:
+    """class representing the background thread that writes queued journal changes, a burst of edits in one write"""
+    def __init__(self, delay=0.05):
+        self.delay = delay  # Seconds to wait for more changes after the first one before writing
+        self.dirty = set()  # Journals with queued changes
+        self.condition = threading.Condition()
+        self.thread = None
+        self.stopped = False
+        self.error = None  # Last error writing in the background, the changes stay queued and are retried
+
+    def mark_dirty(self, journal):
+        with self.condition:
+            self.dirty.add(journal)
+            if self.thread is None and not self.stopped:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+                atexit.register(self.stop)  # Nothing queued is lost if the program ends without closing
+            self.condition.notify()
+        if self.stopped:
+            journal.flush()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.dirty and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+            time.sleep(self.delay)
+            self.flush(background=True)
+
+    def flush(self, background=False):
+        # Write every queued change now
+        with self.condition:
+            journals, self.dirty = self.dirty, set()
+        for journal in journals:
+            try:
+                journal.flush()
+            except OSError as error:
+                if not background:
+                    raise
+                self.error = error
+                with self.condition:
+                    self.dirty.add(journal)
+
+    def stop(self):
+        # Stop the thread and write what is left, safe to call more than once
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+            thread = self.thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+
+
+def has_journal_files(directory, name):
+    # True if the folder holds data of the collection in any format the journals read
+    prefixes = (f'{name}.pkl', f'{name}.records', f'{name}.snap', f'{name}.meta')
+    return any(file_name.startswith(prefixes) or (file_name.startswith(f'{name}.') and file_name.endswith('.snap'))
+               for file_name in os.listdir(directory))
+
+
+class JournalStore(Repository):
+    """class representing journal based storage for all collections in a data directory"""
+    def __init__(self, directory, compact_every=500, write_delay=0.05, compression=None):
+        self.directory = directory
+        self.compact_every = compact_every
+        self.compression = compression  # {collection or '*': codec} or a codec name, EVENTS_COMPRESSION if None
+        self.writer = JournalWriter(write_delay) if write_delay is not None else None  # None writes every change at once
+        self.journals = {}  # Collection name -> CollectionJournal
+        self.collections = {}  # Collection name -> loaded dictionary
+
+    def journal(self, name):
+        if name not in self.journals:
+            path = os.path.join(self.directory, f'{name}.pkl')
+            codec = codec_for(name, self.compression)
+            get_codec(codec)  # An unknown or missing codec fails here rather than at the first compaction
+            self.journals[name] = CollectionJournal(path, self.compact_every, name, CONTAINERS.get(name, dict), codec)
+            self.journals[name].writer = self.writer
+        return self.journals[name]
+
+    def load(self, name):
+        # Load a collection from its snapshot and journals
+        data = self.journal(name).load()
+        self.collections[name] = data
+        return data
+
+    def loaded(self, name):
+        return self.collections[name] if name in self.collections else self.load(name)
+
+    def put(self, name, key, value):
+        # Record that a single record was added or changed
+        self.journal(name).append('put', key, value)
+
+    def delete(self, name, key):
+        # Record that a single record was removed
+        self.journal(name).append('delete', key)
+
+    def put_many(self, name, items):
+        # Record several added or changed records at once
+        self.journal(name).append_many(('put', key, value) for key, value in items)
+
+    def allocate_ids(self, name, minimum, count=1):
+        return self.journal(name).allocate_ids(minimum, count)
+
+    def refresh(self, name, timeout=None):
+        # What other processes changed in a loaded collection: (reloaded collection or None, [(key, record
+        # or None if deleted)], [keys whose change from this process was dropped]). timeout limits the wait
+        # for the collection's lock, it is read next time if another process holds it that long
+        journal = self.journals.get(name)
+        if journal is None or name not in self.collections:
+            return None, [], []
+        if journal.needs_reload:
+            # This process fell too far behind the others to read their changes one by one
+            conflicts = journal.remote_changes()[1]
+            data = self.load(name)
+            journal.written()  # Queued changes can be checked against the reloaded versions now
+            return data, [], conflicts
+        changes, conflicts = journal.remote_changes(timeout)
+        return None, changes, conflicts
+
+    def flush(self):
+        # Write every queued change now
+        if self.writer is not None:
+            self.writer.flush()
+
+    def compact(self, name):
+        # Fold the journals of a collection into a new snapshot now, e.g. after changing its compression
+        journal = self.journal(name)
+        self.loaded(name)
+        self.flush()
+        if journal.is_compacting():
+            journal.compactor.join()
+        journal.compact(background=False)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.stop()
+        for journal in self.journals.values():
+            journal.close()
@@ -0,0 +1,123 @@
+from bisect import bisect_left, bisect_right
+from ENUMS import EventType
+from OBSERVABLE import Follower
+from RELATIONS import event_type_names
+from SCHEDULE import guest_limit
+
+UNLIMITED = float('inf')  # Maximum of a record whose max_guests cannot be read
+
+
+def guest_range(record):
+    # (min, max) guests of a supplier or caterer, None if the range is empty
+    low = guest_limit(record.min_guests, 0)
+    high = guest_limit(record.max_guests, UNLIMITED)
+    return (low, high) if low <= high else None
+
+
+def served_event_types(record):
+    # Event type names a supplier serves, caterers have no event type and serve all of them
+    event_types = getattr(record, 'event_type', None)
+    if event_types is None:
+        return [event_type.name for event_type in EventType]
+    return event_type_names(event_types)
+
+
+def build_tree(intervals):
+    # Centered interval tree over (low, high, key) tuples. Each node is
+    # (center, lows, keys by low, highs, keys by high, left, right) where lows and highs are the sorted
+    # ends of the intervals containing center, left holds the intervals ending before it, right the
+    # ones starting after it
+    if not intervals:
+        return None
+    ends = sorted(end for low, high, key in intervals for end in (low, high))
+    center = ends[len(ends) // 2]
+    here, left, right = [], [], []
+    for interval in intervals:
+        if interval[1] < center:
+            left.append(interval)
+        elif interval[0] > center:
+            right.append(interval)
+        else:
+            here.append(interval)
+    by_low = sorted(here, key=lambda interval: interval[0])
+    by_high = sorted(here, key=lambda interval: interval[1])
+    return (center, [interval[0] for interval in by_low], [interval[2] for interval in by_low],
+            [interval[1] for interval in by_high], [interval[2] for interval in by_high],
+            build_tree(left), build_tree(right))
+
+
+def stab(node, guests):
+    # Keys of the intervals of a tree containing guests
+    result = []
+    while node is not None:
+        center, lows, low_keys, highs, high_keys, left, right = node
+        if guests < center:
+            result += low_keys[:bisect_right(lows, guests)]  # Every interval here ends after guests
+            node = left
+        elif guests > center:
+            result += high_keys[bisect_left(highs, guests):]  # Every interval here starts before guests
+            node = right
+        else:
+            result += low_keys
+            break
+    return result
+
+
+class CapacityIndex(Follower):
+    """class representing the guest ranges of suppliers and caterers, as one interval tree per event type"""
+    def __init__(self):
+        self.ranges = {}  # key -> (event type names, (low, high)) of every indexed record
+        self.by_type = {event_type.name: {} for event_type in EventType}  # event type -> {key: (low, high)}
+        self.trees = {}  # event type -> interval tree, dropped when a record of that type changes
+
+    def build(self, collection):
+        for key, record in collection.items():
+            self.add(key, record)
+        return self
+
+    def add(self, key, record):
+        limits = guest_range(record)
+        if limits is None:
+            return
+        event_types = served_event_types(record)
+        self.ranges[key] = (event_types, limits)
+        for event_type in event_types:
+            self.by_type[event_type][key] = limits
+            self.trees.pop(event_type, None)
+
+    def remove(self, key):
+        event_types, limits = self.ranges.pop(key, ((), None))
+        for event_type in event_types:
+            del self.by_type[event_type][key]
+            self.trees.pop(event_type, None)
+
+    def update(self, key, record):
+        self.remove(key)
+        self.add(key, record)
+
+    def tree(self, event_type):
+        # The interval tree of an event type, rebuilt after its records changed
+        tree = self.trees.get(event_type)
+        if tree is None and event_type not in self.trees:
+            ranges = self.by_type[event_type]
+            tree = self.trees[event_type] = build_tree([(low, high, key) for key, (low, high) in ranges.items()])
+        return tree
+
+    def match(self, event_type, guests):
+        # Keys of the records serving an event type (its name) whose range includes guests,
+        # numeric IDs in numeric order
+        keys = stab(self.tree(event_type), guests)
+        if all(type(key) is int for key in keys):
+            return sorted(keys)  # Supplier IDs are ints, sorting them without a key function is much faster
+        return sorted(keys, key=lambda key: (len(str(key)), str(key)))
+
+    def match_many(self, requests):
+        # match() for many (event type name, guests) pairs, each tree is rebuilt at most once and
+        # repeated pairs are answered once
+        answers = {}
+        results = []
+        for request in requests:
+            if request not in answers:
+                answers[request] = self.match(*request)
+            results.append(list(answers[request]))
+        return results
@@ -0,0 +1,166 @@
+import functools
+import json
+import os
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+# Upper bounds in seconds of the latency histogram buckets, the last bucket holds everything slower
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    """class representing the calls, records, errors and latency histogram of one operation on one collection"""
+    __slots__ = ('calls', 'records', 'errors', 'seconds', 'slowest', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.records = 0  # Records loaded, saved, listed or found by the calls
+        self.errors = 0
+        self.seconds = 0.0
+        self.slowest = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # Calls per bucket, not cumulative
+
+    def observe(self, seconds, records):
+        self.calls += 1
+        self.records += records
+        self.seconds += seconds
+        if seconds > self.slowest:
+            self.slowest = seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def quantile(self, fraction):
+        # Upper bound of the bucket holding the given fraction of the calls, the slowest call for the last one
+        wanted = fraction * self.calls
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            seen += count
+            if seen >= wanted and seen:
+                return min(bound, self.slowest)
+        return self.slowest
+
+
+class Metrics:
+    """class representing the timings of the hot paths, recorded only while enabled"""
+    def __init__(self, enabled=True):
+        self.enabled = enabled  # Checked first by every timer, so a disabled one costs one attribute read
+        self.metrics = {}  # (operation, collection) -> Metric
+        self.lock = threading.Lock()  # Timings come from the Tk thread, the task queue and the journal writer
+
+    def metric(self, operation, collection):
+        # Called with the lock held
+        metric = self.metrics.get((operation, collection))
+        if metric is None:
+            metric = self.metrics[operation, collection] = Metric()
+        return metric
+
+    def observe(self, operation, collection, seconds, records=0):
+        with self.lock:
+            self.metric(operation, collection).observe(seconds, records)
+
+    def error(self, operation, collection):
+        with self.lock:
+            self.metric(operation, collection).errors += 1
+
+    def timer(self, operation, collection=''):
+        return Timer(self, operation, collection)
+
+    def reset(self):
+        with self.lock:
+            self.metrics = {}
+
+    def snapshot(self):
+        # [{operation, collection, calls, ...}] sorted by operation and collection, latencies in milliseconds
+        with self.lock:
+            items = sorted(self.metrics.items())
+            return [{'operation': operation, 'collection': collection, 'calls': metric.calls,
+                     'records': metric.records, 'errors': metric.errors, 'total_ms': metric.seconds * 1000,
+                     'mean_ms': metric.seconds * 1000 / metric.calls if metric.calls else 0.0,
+                     'p50_ms': metric.quantile(0.5) * 1000, 'p95_ms': metric.quantile(0.95) * 1000,
+                     'max_ms': metric.slowest * 1000,
+                     'buckets': {str(bound): count for bound, count in zip(BUCKETS + ('+Inf',), metric.buckets)}}
+                    for (operation, collection), metric in items]
+
+    def to_json(self):
+        return json.dumps({'enabled': self.enabled, 'metrics': self.snapshot()}, indent=2)
+
+    def to_prometheus(self):
+        # Prometheus text exposition format, histogram buckets are cumulative there
+        with self.lock:
+            items = sorted(self.metrics.items())
+            lines = ["# HELP events_operation_seconds Time spent in load, save, populate, search and find calls.",
+                     "# TYPE events_operation_seconds histogram"]
+            for (operation, collection), metric in items:
+                labels = f'operation="{operation}",collection="{collection}"'
+                seen = 0
+                for bound, count in zip(BUCKETS + ('+Inf',), metric.buckets):
+                    seen += count
+                    lines.append(f'events_operation_seconds_bucket{{{labels},le="{bound}"}} {seen}')
+                lines.append(f'events_operation_seconds_sum{{{labels}}} {metric.seconds:.6f}')
+                lines.append(f'events_operation_seconds_count{{{labels}}} {metric.calls}')
+            counters = (('events_operation_records_total', 'records', "Records handled by the calls."),
+                        ('events_operation_errors_total', 'errors', "Calls that raised an error."))
+            for name, field, help_text in counters:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                lines += [f'{name}{{operation="{operation}",collection="{collection}"}} {getattr(metric, field)}'
+                          for (operation, collection), metric in items]
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        # Prometheus text for .prom and .txt files, JSON otherwise, through a temporary file
+        text = self.to_prometheus() if path.lower().endswith(('.prom', '.txt')) else self.to_json()
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, path)
+        return path
+
+
+class Timer:
+    """class representing one timed call, used as a context manager, set records to what the call handled"""
+    __slots__ = ('metrics', 'operation', 'collection', 'records', 'start')
+
+    def __init__(self, metrics, operation, collection):
+        self.metrics = metrics
+        self.operation = operation
+        self.collection = collection
+        self.records = 0
+        self.start = None
+
+    def __enter__(self):
+        if self.metrics.enabled:
+            self.start = perf_counter()
+        return self
+
+    def __exit__(self, kind, error, traceback):
+        if self.start is None:
+            return
+        if kind is not None:
+            self.metrics.error(self.operation, self.collection)
+        else:
+            self.metrics.observe(self.operation, self.collection, perf_counter() - self.start, self.records)
+
+
+# Timings of the whole process, EVENTS_METRICS=0 turns them off
+metrics = Metrics(os.environ.get('EVENTS_METRICS', '1') != '0')
+
+
+def timed(operation, records=None, collection=False):
+    # Decorator timing every call of a function. records(result) gives the number of records the call
+    # handled, collection=True takes the collection name from the first argument after self
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return function(*args, **kwargs)
+            name = args[1] if collection else ''
+            start = perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            except Exception:
+                metrics.error(operation, name)
+                raise
+            metrics.observe(operation, name, perf_counter() - start, records(result) if records else 0)
+            return result
+        return wrapper
+    return decorate
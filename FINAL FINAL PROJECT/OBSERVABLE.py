@@ -0,0 +1,132 @@
+from collections.abc import MutableMapping
+
+ADDED = 'added'
+UPDATED = 'updated'
+REMOVED = 'removed'
+BULK = 'bulk'  # Many records added or updated at once, the key passed to listeners is the list of keys
+
+
+class ObservableDict(MutableMapping):
+    """class representing a collection that tells its listeners which key was added, updated or removed"""
+    def __init__(self, data=None):
+        self.data = data if data is not None else {}  # A dict, or any mapping such as an SQLite table
+        self.listeners = []
+
+    def subscribe(self, listener):
+        # listener(change, key) is called after every change
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def notify(self, change, key):
+        for listener in list(self.listeners):
+            listener(change, key)
+
+    def touch(self, key):
+        # Report a record that was changed in place, e.g. employee.modify(...)
+        self.notify(UPDATED, key)
+
+    def update_many(self, items, notify=True):
+        # Add or replace many records with a single notification, or none for a caller adding several
+        # batches that sends one notification for all of them at the end
+        items = list(items)
+        if hasattr(self.data, 'update_many'):
+            self.data.update_many(items)
+        else:
+            self.data.update(items)
+        if notify:
+            self.notify(BULK, [key for key, value in items])
+
+    def replace(self, data):
+        # Swap in a freshly loaded collection, listeners hear about the removed keys and then all the others
+        removed = [key for key in self.data.keys() if key not in data]
+        self.data = data
+        for key in removed:
+            self.notify(REMOVED, key)
+        self.notify(BULK, list(data.keys()))
+
+    def snapshot(self):
+        # The records as they are now, for a task to read on another thread while this one goes on changing
+        # the collection. Containers that copy cheaply do, e.g. a GuestTable copies its columns
+        return self.data.copy() if hasattr(self.data, 'copy') else dict(self.data.items())
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        change = UPDATED if key in self.data else ADDED
+        self.data[key] = value
+        self.notify(change, key)
+
+    def __delitem__(self, key):
+        del self.data[key]
+        self.notify(REMOVED, key)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def keys(self):
+        return self.data.keys()
+
+    def items(self):
+        return self.data.items()
+
+    def values(self):
+        return self.data.values()
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+
+class ChangeRecorder:
+    """class representing the keys of an ObservableDict changed since the recorder was made"""
+    def __init__(self, collection):
+        self.collection = collection
+        self.keys = {}  # Changed keys, in the order they first changed
+        collection.subscribe(self.note)
+
+    def note(self, change, key):
+        for each_key in (key if change == BULK else (key,)):
+            self.keys[each_key] = None
+
+    def stop(self):
+        # Stop recording, returns the changed keys
+        self.collection.unsubscribe(self.note)
+        return list(self.keys)
+
+
+class Follower:
+    """class representing an index kept up to date with an ObservableDict, subclasses provide update and remove"""
+    def update(self, key, record):
+        raise NotImplementedError
+
+    def remove(self, key):
+        raise NotImplementedError
+
+    def follow(self, collection, changed=()):
+        # Keep the index up to date with an ObservableDict, returns the listener. changed are the keys
+        # changed since the snapshot the index was built from, brought up to date first
+        for key in changed:
+            if key in collection:
+                self.update(key, collection[key])
+            else:
+                self.remove(key)
+
+        def on_change(change, key):
+            if change == REMOVED:
+                self.remove(key)
+            elif change == BULK:
+                for each_key in key:
+                    self.update(each_key, collection[each_key])
+            else:
+                self.update(key, collection[key])
+        collection.subscribe(on_change)
+        return on_change
@@ -0,0 +1,137 @@
+from ENUMS import ServiceType, EventType
+
+np = None  # NumPy, imported by load_numpy() on the first batch so scripts that never price one start faster
+numpy_checked = False
+
+# Base price of each event type and price of each additional service
+BASE_PRICES = {
+    EventType.WEDDING: 1000,
+    EventType.BIRTHDAY: 500,
+    EventType.THEMED_PARTY: 750,
+    EventType.GRADUATION: 600,
+}
+SERVICE_PRICES = {
+    ServiceType.CATERING: 200,
+    ServiceType.CLEANING: 100,
+    ServiceType.DECORATIONS: 150,
+}
+
+
+def load_numpy():
+    # Import NumPy once, batches are priced with plain lists when it is not installed
+    global np, numpy_checked
+    if not numpy_checked:
+        numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+    return np
+
+
+def format_cost(value):
+    # A cost as stored and shown by every backend, always with two decimals ("123.50", "1200.00")
+    return f"{value:.2f}"
+
+
+def to_event_type(value):
+    # Accept an EventType, its name ("THEMED_PARTY") or the label shown to guests ("Themed Party")
+    if isinstance(value, EventType) or value is None:
+        return value
+    name = str(value).strip().upper().replace(' ', '_')
+    return EventType[name] if name in EventType.__members__ else None
+
+
+def to_service_type(value):
+    # Accept a ServiceType, its value ("Catering") or its name ("CATERING")
+    if isinstance(value, ServiceType):
+        return value
+    for service in ServiceType:
+        if str(value).strip().lower() in (service.value.lower(), service.name.lower()):
+            return service
+    return None
+
+
+class PricingEngine:
+    """class representing the single place guest and event costs are calculated"""
+    def __init__(self, base_prices=None, service_prices=None):
+        base_prices = BASE_PRICES if base_prices is None else base_prices
+        service_prices = SERVICE_PRICES if service_prices is None else service_prices
+        self.event_types = list(EventType)
+        self.event_codes = {event_type: code for code, event_type in enumerate(self.event_types)}
+        self.unknown_code = len(self.event_types)  # Code for a missing or unknown event type, base price 0
+        self.services = list(ServiceType)
+        self.service_bits = {service: 1 << bit for bit, service in enumerate(self.services)}
+        # Price of every (event type code, service bit mask) pair, so pricing is a single lookup
+        bases = [base_prices.get(event_type, 0) for event_type in self.event_types] + [0]
+        self.table = [[base + sum(service_prices.get(service, 0) for bit, service in enumerate(self.services)
+                                  if mask >> bit & 1)
+                       for mask in range(1 << len(self.services))]
+                      for base in bases]
+        self.array_table = None  # NumPy copy of table, made on the first batch
+        self.code_cache = {}  # Raw event type value -> code, records repeat the same few values
+        self.mask_cache = {}  # Tuple of raw service values -> bit mask
+
+    def event_code(self, event_type):
+        code = self.code_cache.get(event_type)
+        if code is None:
+            code = self.event_codes.get(to_event_type(event_type), self.unknown_code)
+            self.code_cache[event_type] = code
+        return code
+
+    def service_mask(self, services):
+        services = tuple(services or ())
+        mask = self.mask_cache.get(services)
+        if mask is None:
+            mask = 0
+            for service in services:
+                mask |= self.service_bits.get(to_service_type(service), 0)
+            self.mask_cache[services] = mask
+        return mask
+
+    def price(self, event_type, services=()):
+        # Cost of one event type plus its additional services
+        return self.table[self.event_code(event_type)][self.service_mask(services)]
+
+    def code_prices(self, event_values, service_values):
+        # Price of every pair of codes of an event type column and a services column, as one flat list at
+        # event code * len(service_values) + services code. Each distinct value is encoded once, so this
+        # costs the number of distinct quotes however many guests share them
+        masks = [self.service_mask(services) for services in service_values]
+        return [self.table[self.event_code(event_type)][mask] for event_type in event_values for mask in masks]
+
+    def encode(self, quotes):
+        # Turn (event_type, services) pairs into event type codes and service bit masks
+        codes = []
+        masks = []
+        for event_type, services in quotes:
+            codes.append(self.event_code(event_type))
+            masks.append(self.service_mask(services))
+        return codes, masks
+
+    def price_batch(self, quotes):
+        # Costs of many (event_type, services) pairs, one vectorized lookup when NumPy is available
+        codes, masks = self.encode(quotes)
+        if self.array_table is None and load_numpy() is not None:
+            self.array_table = np.array(self.table, dtype=np.int64)
+        if self.array_table is not None:
+            return self.array_table[np.array(codes, dtype=np.intp), np.array(masks, dtype=np.intp)].tolist()
+        table = self.table
+        return [table[code][mask] for code, mask in zip(codes, masks)]
+
+    def reprice_guests(self, guests, keys=None):
+        # Recalculate "Total Cost" of every guest that has an event type, returns the changed keys
+        keys = [key for key in (guests.keys() if keys is None else keys) if guests[key].event_type]
+        totals = self.price_batch((guests[key].event_type, guests[key].services) for key in keys)
+        changed = []
+        for key, total in zip(keys, totals):
+            guest = guests[key]
+            if guest.total_cost != format_cost(total):
+                guest.total_cost = format_cost(total)
+                changed.append(key)
+        return changed
+
+
+# Shared engine used by the app and by the entity classes
+pricing = PricingEngine()
@@ -0,0 +1,65 @@
+from OBSERVABLE import Follower
+from PRICING import to_event_type
+
+
+def link_text(value):
+    # Events name their client and venue as typed text, an ID, or a Client or Venue instance,
+    # all compared as lowercase text
+    value = getattr(value, 'name', value)
+    return str(value).strip().lower() if value is not None else ''
+
+
+def event_type_names(value):
+    # Names of the EventType members in a value holding one, a list of them, or their labels
+    values = value if isinstance(value, (list, tuple)) else [value]
+    event_types = [to_event_type(item) for item in values if item]
+    return [event_type.name for event_type in event_types if event_type is not None]
+
+
+# Fields that point from a record of one collection to other records, as functions returning the targets.
+# (collection, field) -> targets of a record
+RELATION_FIELDS = {
+    ('events', 'venue'): lambda event: [link_text(event.venue)],
+    ('events', 'client'): lambda event: [link_text(event.client)],
+    ('clients', 'events'): lambda client: event_type_names(client.events),
+}
+
+
+class RelationIndex(Follower):
+    """class representing the targets one field of a collection points to, and the records pointing at each target"""
+    def __init__(self, targets):
+        self.targets = targets  # Function returning the targets of a record
+        self.forward = {}  # key -> tuple of targets of the record
+        self.reverse = {}  # target -> set of keys pointing at it
+
+    def build(self, collection):
+        for key, record in collection.items():
+            self.add(key, record)
+        return self
+
+    def add(self, key, record):
+        targets = tuple(dict.fromkeys(target for target in self.targets(record) if target))
+        self.forward[key] = targets
+        for target in targets:
+            self.reverse.setdefault(target, set()).add(key)
+
+    def remove(self, key):
+        for target in self.forward.pop(key, ()):
+            keys = self.reverse[target]
+            keys.discard(key)
+            if not keys:
+                del self.reverse[target]
+
+    def update(self, key, record):
+        self.remove(key)
+        self.add(key, record)
+
+    def targets_of(self, key):
+        return self.forward.get(key, ())
+
+    def keys_for(self, *targets):
+        # Keys of the records pointing at any of the targets, numeric IDs in numeric order
+        keys = set()
+        for target in targets:
+            keys.update(self.reverse.get(target, ()))
+        return sorted(keys, key=lambda key: (len(str(key)), str(key)))
@@ -0,0 +1,197 @@
+import csv
+import html
+import os
+from ENUMS import EventType
+from OBSERVABLE import Follower
+from COLUMNAR import parse_cost
+from PRICING import pricing, to_event_type
+from RELATIONS import link_text
+
+
+def event_type_label(value):
+    # "Themed Party" for an EventType, its name or its label, the value as typed if it is none of them
+    event_type = to_event_type(value)
+    return event_type.name.replace('_', ' ').title() if event_type is not None else str(value or '')
+
+
+def department_of(employee):
+    return str(employee.department).strip() or '(none)'
+
+
+def salary_of(employee):
+    return parse_cost(employee.salary) or 0.0  # Salaries are kept as typed
+
+
+def event_price(event):
+    return float(pricing.price(event.event_type, event.services))
+
+
+# Totals kept for each collection, as (collection, group of a record, numbers added up for each group)
+ROLLUPS = {
+    'payroll': ('employees', department_of, lambda employee: (salary_of(employee),)),
+    'events_by_type': ('events', lambda event: event_type_label(event.event_type), lambda event: ()),
+    'events_by_venue': ('events', lambda event: link_text(event.venue), lambda event: ()),
+    'client_spend': ('events', lambda event: link_text(event.client), lambda event: (event_price(event),)),
+    'guest_revenue': ('guests', lambda guest: event_type_label(guest.event_type),
+                      lambda guest: (parse_cost(guest.total_cost) or 0.0,)),
+}
+
+
+class Rollup(Follower):
+    """class representing running totals per group of a collection, updated record by record as it changes"""
+    def __init__(self, group, measures):
+        self.group = group  # Function returning the group of a record
+        self.measures = measures  # Function returning the numbers a record adds to its group
+        self.contributions = {}  # key -> (group, numbers) the record added, taken back when it changes
+        self.totals = {}  # group -> [number of records, sum of each number]
+
+    def build(self, collection):
+        for key, record in collection.items():
+            self.add(key, record)
+        return self
+
+    def add(self, key, record):
+        group = self.group(record)
+        measures = tuple(self.measures(record))
+        self.contributions[key] = (group, measures)
+        totals = self.totals.get(group)
+        if totals is None:
+            totals = self.totals[group] = [0] + [0.0] * len(measures)
+        totals[0] += 1
+        for i, value in enumerate(measures, start=1):
+            totals[i] += value
+
+    def remove(self, key):
+        contribution = self.contributions.pop(key, None)
+        if contribution is None:
+            return
+        group, measures = contribution
+        totals = self.totals[group]
+        totals[0] -= 1
+        if not totals[0]:
+            del self.totals[group]
+            return
+        for i, value in enumerate(measures, start=1):
+            totals[i] -= value
+
+    def update(self, key, record):
+        self.remove(key)
+        self.add(key, record)
+
+    def get(self, group):
+        return self.totals.get(group, [0])
+
+
+class Report:
+    """class representing one table of a report, with a title, column headers and rows"""
+    def __init__(self, name, title, headers, rows):
+        self.name = name  # File name of the table in CSV output
+        self.title = title
+        self.headers = headers
+        self.rows = rows
+
+
+def share(part, whole):
+    return round(100.0 * part / whole, 1) if whole else None
+
+
+def revenue_report(service):
+    # Guest revenue by event type, from the running totals of a GuestTable or else a guest rollup
+    guests = service.guests.data
+    if hasattr(guests, 'revenue_per_event_type'):
+        counts = guests.guests_per_event_type()
+        revenue = guests.revenue_per_event_type()
+        totals = {event_type_label(label): [counts[label], revenue.get(label, 0.0)] for label in counts}
+        total = guests.total_revenue()
+    else:
+        rollup = service.rollup('guest_revenue')
+        totals = {group: values for group, values in rollup.totals.items() if group}
+        total = sum(values[1] for values in rollup.totals.values())
+    rows = []
+    for event_type in EventType:
+        count, revenue = totals.get(event_type_label(event_type), (0, 0.0))
+        rows.append((event_type_label(event_type), count, round(revenue, 2),
+                     round(revenue / count, 2) if count else 0.0, share(revenue, total)))
+    return Report('revenue_by_event_type', "Guest revenue by event type",
+                  ('event type', 'guests', 'revenue', 'average per guest', '% of revenue'), rows)
+
+
+def venue_report(service):
+    # Events booked at each venue. Guests are not linked to venues, so a venue's load is its number
+    # of events against its guest limit
+    rollup = service.rollup('events_by_venue')
+    rows = []
+    named = set()
+    for venue_id, venue in service.venues.items():
+        targets = {link_text(venue_id), link_text(venue)}
+        named |= targets
+        events = sum(rollup.get(target)[0] for target in targets)
+        rows.append((venue_id, venue.name, events, venue.min_guests, venue.max_guests))
+    for target, values in sorted(rollup.totals.items()):
+        if target not in named:
+            rows.append(('', f"{target} (not a venue)", values[0], '', ''))
+    return Report('events_by_venue', "Events per venue", ('venue', 'name', 'events', 'min guests', 'max guests'),
+                  rows)
+
+
+def payroll_report(service):
+    rollup = service.rollup('payroll')
+    total = sum(values[1] for values in rollup.totals.values())
+    rows = [(department, count, round(payroll, 2), round(payroll / count, 2), share(payroll, total))
+            for department, (count, payroll) in sorted(rollup.totals.items())]
+    return Report('payroll_by_department', "Employee payroll by department",
+                  ('department', 'employees', 'payroll', 'average salary', '% of payroll'), rows)
+
+
+def budget_report(service):
+    # Each client's budget against the base price of the events booked in their name
+    rollup = service.rollup('client_spend')
+    rows = []
+    for client_id, client in service.clients.items():
+        count, spend = (rollup.get(link_text(client)) + [0.0])[:2]
+        budget = parse_cost(client.budget) or 0.0
+        rows.append((client_id, client.name, round(budget, 2), count, round(spend, 2), share(spend, budget)))
+    return Report('client_budget_utilization', "Client budget utilization",
+                  ('client', 'name', 'budget', 'events', 'booked', '% of budget'), rows)
+
+
+REPORTS = (revenue_report, venue_report, payroll_report, budget_report)
+
+
+def build_reports(service):
+    # Every report table, read from the running totals so only the rows shown are visited
+    return [report(service) for report in REPORTS]
+
+
+def write_csv(reports, directory):
+    # One CSV file per table, returns their paths
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for report in reports:
+        path = os.path.join(directory, f"{report.name}.csv")
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(report.headers)
+            writer.writerows(('' if value is None else value for value in row) for row in report.rows)
+        paths.append(path)
+    return paths
+
+
+def write_html(reports, path, title="The Best Events Company report"):
+    # All tables in one HTML page
+    parts = [f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>",
+             "<style>body{font-family:Helvetica,sans-serif}table{border-collapse:collapse;margin-bottom:2em}"
+             "th,td{border:1px solid #ccc;padding:4px 8px;text-align:left}</style></head><body>",
+             f"<h1>{html.escape(title)}</h1>"]
+    for report in reports:
+        parts.append(f"<h2>{html.escape(report.title)}</h2><table><tr>")
+        parts += [f"<th>{html.escape(str(header))}</th>" for header in report.headers]
+        parts.append("</tr>")
+        for row in report.rows:
+            cells = ''.join(f"<td>{html.escape('' if value is None else str(value))}</td>" for value in row)
+            parts.append(f"<tr>{cells}</tr>")
+        parts.append("</table>")
+    parts.append("</body></html>\n")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(parts))
+    return path
@@ -0,0 +1,388 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from ENUMS import EventType
+from CLASSES import Employee, Client, Supplier, Guest, Event, Venue
+
+
+def event_type_name(event_type):
+    # Event types are stored by name, some old records hold the name string already
+    return event_type.name if isinstance(event_type, EventType) else event_type
+
+
+def event_type_from_name(name):
+    return EventType[name] if name in EventType.__members__ else name
+
+
+def split_names(text):
+    return [event_type_from_name(name) for name in text.split(',') if name]
+
+
+# Columns stored for every collection, the ID column is added by the table definition
+COLUMNS = {
+    'employees': ('name', 'address', 'contact', 'department', 'job_title', 'salary'),
+    'clients': ('name', 'address', 'contact', 'budget', 'events'),
+    'suppliers': ('name', 'address', 'contact_details', 'event_types', 'min_guests', 'max_guests'),
+    'guests': ('name', 'email', 'phone_number', 'total_cost', 'event_type', 'services'),
+    'venues': ('name', 'address', 'contact', 'min_guests', 'max_guests'),
+    'events': ('event_type', 'date', 'client', 'venue'),
+}
+
+# Indexed columns for every collection
+INDEXES = {
+    'employees': ('name', 'department'),
+    'clients': ('name',),
+    'suppliers': ('name',),
+    'guests': ('name', 'email'),
+    'venues': ('name',),
+    'events': ('date', 'event_type', 'venue', 'client'),
+}
+
+
+def to_row(name, record):
+    # Convert a record from the app's collections into a tuple matching COLUMNS
+    if name == 'employees':
+        return (record.name, record.address, record.contact, record.department, record.job_title, record.salary)
+    if name == 'clients':
+        events = ','.join(event_type_name(event) for event in record.events)
+        return (record.name, record.address, record.contact, record.budget, events)
+    if name == 'suppliers':
+        event_types = record.event_type if isinstance(record.event_type, list) else [record.event_type]
+        event_types = ','.join(event_type_name(event_type) for event_type in event_types if event_type)
+        return (record.name, record.address, record.contact_details, event_types, record.min_guests,
+                record.max_guests)
+    if name == 'guests':
+        return (record.name, record.email, record.phone_number, record.total_cost, record.event_type or '',
+                ','.join(record.services))
+    if name == 'venues':
+        return (record.name, record.address, record.contact, record.min_guests, record.max_guests)
+    if name == 'events':
+        return (event_type_name(record.event_type), record.date, record.client, record.venue)
+    raise KeyError(name)
+
+
+def from_row(name, key, row):
+    # Rebuild a record from its ID and a tuple matching COLUMNS
+    if name == 'employees':
+        return Employee(key, *row)
+    if name == 'clients':
+        client = Client(key, *row[:4])
+        client.events = split_names(row[4])
+        return client
+    if name == 'suppliers':
+        return Supplier(key, row[0], row[1], row[2], split_names(row[3]), row[4], row[5])
+    if name == 'guests':
+        # Only guests registered with a quote carry their event type and services
+        return Guest(key, row[0], row[1], row[2], row[3], row[4] or None,
+                     [service for service in row[5].split(',') if service] if row[4] else None)
+    if name == 'venues':
+        return Venue(key, *row)
+    if name == 'events':
+        return Event(key, event_type_from_name(row[0]), row[1], row[2], row[3])
+    raise KeyError(name)
+
+
+def upgrade_record(name, key, record):
+    # Guests and events were saved as plain dictionaries before they had classes
+    if not isinstance(record, dict):
+        return record
+    if name == 'guests':
+        return Guest(key, record["Name"], record["Email"], record["Phone Number"], record.get("Total Cost", "0"),
+                     record.get("Event Type") or None, list(record.get("Services", ())) or None)
+    if name == 'events':
+        return Event(key, record['Event Type'], record['Date'], record['Client'], record['Venue'])
+    return record
+
+
+def field_value(name, record, field):
+    # Read one of the COLUMNS fields from a record without going through the database
+    return to_row(name, record)[COLUMNS[name].index(field)]
+
+
+class Repository:
+    """class representing a storage backend for the six collections"""
+    def load(self, name):
+        raise NotImplementedError
+
+    @staticmethod
+    def upsert(name):
+        # Insert a row or update it in place: it keeps its rowid, so lists ordered by rowid keep their order
+        # (INSERT OR REPLACE deletes the row and inserts it again at the end)
+        columns = COLUMNS[name]
+        return (f'INSERT INTO {name} (id, {", ".join(columns)}) VALUES ({", ".join("?" * (len(columns) + 1))}) '
+                f'ON CONFLICT(id) DO UPDATE SET {", ".join(f"{column} = excluded.{column}" for column in columns)}')
+
+    def put(self, name, key, value):
+        raise NotImplementedError
+
+    def delete(self, name, key):
+        raise NotImplementedError
+
+    def put_many(self, name, items):
+        for key, value in items:
+            self.put(name, key, value)
+
+    def loaded(self, name):
+        # The collection as already loaded by the app, backends that keep it in memory override this
+        return self.load(name)
+
+    def allocate_ids(self, name, minimum, count=1):
+        # Reserve count new IDs, returns the first. Backends shared between processes make sure no other
+        # process gets the same ones, minimum is the next ID going by the records this process has loaded
+        return minimum
+
+    def refresh(self, name, timeout=None):
+        # Changes other processes made to a loaded collection: (reloaded collection or None,
+        # [(key, record or None if deleted)], [keys whose change from this process was dropped]).
+        # timeout limits how long a shared backend waits for another process to let go of the collection
+        return None, [], []
+
+    def search(self, name, field, value):
+        # Return {key: record} for records whose field equals value, ignoring case
+        collection = self.loaded(name)
+        value = str(value).lower()
+        return {key: record for key, record in collection.items()
+                if str(field_value(name, record, field)).lower() == value}
+
+    def close(self):
+        pass
+
+
+class SQLiteCollection(MutableMapping):
+    """class representing one SQLite table as a dictionary that reads rows on demand"""
+    # Like the journal backend's collections it only changes in memory, the service writes each change
+    # once through the repository's put and delete
+    def __init__(self, repository, name, cache_size=256):
+        self.repository = repository
+        self.name = name
+        self.cache = OrderedDict()  # Recently used records, so edits made in place are kept until saved
+        self.cache_size = cache_size
+        self.unsaved = {}  # Key -> record set but not written to the table yet
+        self.removed = set()  # Keys deleted but still in the table
+
+    def saved(self, key):
+        # Called by the repository once a change of the key is in the table
+        self.unsaved.pop(key, None)
+        self.removed.discard(key)
+
+    def remember(self, key, record):
+        self.cache[key] = record
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def __getitem__(self, key):
+        if key in self.removed:
+            raise KeyError(key)
+        if key in self.unsaved:
+            return self.unsaved[key]
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        row = self.repository.fetch_one(self.name, key)
+        if row is None:
+            raise KeyError(key)
+        record = from_row(self.name, key, row)
+        self.remember(key, record)
+        return record
+
+    def __setitem__(self, key, record):
+        self.removed.discard(key)
+        self.unsaved[key] = record
+        self.remember(key, record)
+
+    def update_many(self, items):
+        for key, record in items:
+            self[key] = record
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.cache.pop(key, None)
+        self.unsaved.pop(key, None)
+        self.removed.add(key)
+
+    def __contains__(self, key):
+        if key in self.removed:
+            return False
+        return key in self.unsaved or key in self.cache or self.repository.fetch_one(self.name, key) is not None
+
+    def __iter__(self):
+        keys = self.repository.fetch_keys(self.name)
+        if not self.unsaved and not self.removed:
+            return iter(keys)
+        in_table = set(keys)
+        return iter([key for key in keys if key not in self.removed] +
+                    [key for key in list(self.unsaved) if key not in in_table])
+
+    def __len__(self):
+        if not self.unsaved and not self.removed:
+            return self.repository.count(self.name)
+        return sum(1 for key in self)  # Only until the service saves the changes
+
+    def items(self):
+        # Stream the whole table in one query instead of one query per key, then the records not saved yet
+        in_table = set()
+        for key, row in self.repository.fetch_all(self.name):
+            in_table.add(key)
+            if key not in self.removed:
+                yield key, self.unsaved.get(key) or self.cache.get(key) or from_row(self.name, key, row)
+        for key in list(self.unsaved):
+            if key not in in_table:
+                yield key, self.unsaved[key]
+
+    def values(self):
+        for key, record in self.items():
+            yield record
+
+    def copy(self):
+        # The table itself, not a copy: every read is a query under the repository's lock
+        return self
+
+
+class SQLiteRepository(Repository):
+    """class representing storage in a single SQLite database with indexed columns"""
+    def __init__(self, directory, filename='events.db'):
+        self.directory = directory
+        self.path = os.path.join(directory, filename)
+        self.lock = threading.RLock()  # Re-entrant, put_many may read rows while it writes
+        self.collections = {}  # Collection name -> SQLiteCollection handed out by load, told when its changes are saved
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.create_tables()
+
+    def create_tables(self):
+        with self.lock, self.connection:
+            for name, columns in COLUMNS.items():
+                # The ID column has no declared type so integer and string IDs keep their type
+                definition = ', '.join(('id PRIMARY KEY',) + columns)
+                self.connection.execute(f'CREATE TABLE IF NOT EXISTS {name} ({definition})')
+                # Add columns introduced after the table was first created
+                existing = {row[1] for row in self.connection.execute(f'PRAGMA table_info({name})')}
+                for column in columns:
+                    if column not in existing:
+                        self.connection.execute(f"ALTER TABLE {name} ADD COLUMN {column} DEFAULT ''")
+                for column in INDEXES[name]:
+                    self.connection.execute(
+                        f'CREATE INDEX IF NOT EXISTS {name}_{column} ON {name} ({column} COLLATE NOCASE)')
+            self.connection.execute('CREATE TABLE IF NOT EXISTS id_counters (name PRIMARY KEY, next_id INTEGER)')
+
+    def load(self, name):
+        # Copy an existing snapshot and journal into the empty table the first time
+        from JOURNAL import JournalStore, has_journal_files
+        if self.count(name) == 0 and has_journal_files(self.directory, name):
+            journal_store = JournalStore(self.directory)
+            self.put_many(name, journal_store.load(name).items())
+            journal_store.close()
+        if name not in self.collections:
+            self.collections[name] = SQLiteCollection(self, name)
+        return self.collections[name]
+
+    def mark_saved(self, name, keys):
+        collection = self.collections.get(name)
+        if collection is not None:
+            for key in keys:
+                collection.saved(key)
+
+    def put(self, name, key, value):
+        with self.lock, self.connection:
+            self.connection.execute(self.upsert(name), (key,) + to_row(name, value))
+        self.mark_saved(name, (key,))
+
+    def put_many(self, name, items):
+        items = list(items)
+        with self.lock, self.connection:
+            self.connection.executemany(self.upsert(name), ((key,) + to_row(name, value) for key, value in items))
+        self.mark_saved(name, (key for key, value in items))
+
+    def delete(self, name, key):
+        with self.lock, self.connection:
+            deleted = self.connection.execute(f'DELETE FROM {name} WHERE id = ?', (key,)).rowcount > 0
+        self.mark_saved(name, (key,))
+        return deleted
+
+    def allocate_ids(self, name, minimum, count=1):
+        # The UPDATE takes SQLite's write lock, so two processes never get the same IDs
+        with self.lock, self.connection:
+            self.connection.execute('INSERT OR IGNORE INTO id_counters VALUES (?, 1)', (name,))
+            self.connection.execute('UPDATE id_counters SET next_id = MAX(next_id, ?) + ? WHERE name = ?',
+                                    (minimum, count, name))
+            return self.connection.execute('SELECT next_id - ? FROM id_counters WHERE name = ?',
+                                           (count, name)).fetchone()[0]
+
+    def search(self, name, field, value):
+        if field not in COLUMNS[name]:
+            raise KeyError(field)
+        with self.lock:
+            rows = self.connection.execute(
+                f'SELECT id, {", ".join(COLUMNS[name])} FROM {name} WHERE {field} = ? COLLATE NOCASE',
+                (value,)).fetchall()
+        return {row[0]: from_row(name, row[0], row[1:]) for row in rows}
+
+    def fetch_one(self, name, key):
+        with self.lock:
+            return self.connection.execute(f'SELECT {", ".join(COLUMNS[name])} FROM {name} WHERE id = ?',
+                                           (key,)).fetchone()
+
+    def fetch_keys(self, name):
+        with self.lock:
+            return [row[0] for row in self.connection.execute(f'SELECT id FROM {name} ORDER BY rowid')]
+
+    def fetch_all(self, name):
+        cursor = self.connection.cursor()
+        with self.lock:
+            rows = cursor.execute(f'SELECT id, {", ".join(COLUMNS[name])} FROM {name} ORDER BY rowid')
+        while True:
+            with self.lock:
+                batch = rows.fetchmany(1000)
+            if not batch:
+                break
+            for row in batch:
+                yield row[0], row[1:]
+
+    def count(self, name):
+        with self.lock:
+            return self.connection.execute(f'SELECT COUNT(*) FROM {name}').fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+def open_repository(directory, backend=None):
+    # Pick the storage backend, EVENTS_STORAGE=sqlite switches from the default journal files
+    backend = backend or os.environ.get('EVENTS_STORAGE', 'journal')
+    if backend == 'sqlite':
+        return SQLiteRepository(directory)
+    if backend == 'journal':
+        from JOURNAL import JournalStore
+        return JournalStore(directory)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+class LazyCollection:
+    """class representing a collection attribute that is loaded from storage the first time it is used"""
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        data = instance.__dict__.get(self.name)
+        if data is None:
+            # The owner provides load_lock, load_data and on_collection_loaded
+            with instance.load_lock:
+                data = instance.__dict__.get(self.name)
+                if data is None:
+                    data = instance.load_data(self.name)
+                    instance.on_collection_loaded(self.name, data)
+                    instance.__dict__[self.name] = data
+        return data
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+
+    def is_loaded(self, instance):
+        return self.name in instance.__dict__
@@ -0,0 +1,120 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+from OBSERVABLE import Follower
+
+
+def parse_date(text):
+    # Event dates are typed as YYYY-MM-DD, returns None for anything else
+    if isinstance(text, date):
+        return text
+    try:
+        return date.fromisoformat(str(text).strip())
+    except ValueError:
+        return None
+
+
+def guest_limit(value, default):
+    # Venue guest limits are stored as typed, so they may be strings
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class VenueSchedule:
+    """class representing the booked date intervals of one venue, sorted by start date"""
+    def __init__(self):
+        self.bookings = []  # Sorted (start, end, event_id) tuples, end is inclusive
+        self.reach = []  # Index -> latest end of the bookings up to and including that index
+
+    def add(self, start, end, event_id):
+        index = bisect_left(self.bookings, (start, end, event_id))
+        self.bookings.insert(index, (start, end, event_id))
+        self.reach.insert(index, end)
+        self.update_reach(index)
+
+    def remove(self, start, end, event_id):
+        index = bisect_left(self.bookings, (start, end, event_id))
+        if index < len(self.bookings) and self.bookings[index] == (start, end, event_id):
+            del self.bookings[index]
+            del self.reach[index]
+            self.update_reach(index)
+
+    def update_reach(self, index):
+        # Recompute the running latest end from index on, stopping once it matches what was there
+        latest = self.reach[index - 1] if index > 0 else date.min
+        for position in range(index, len(self.bookings)):
+            latest = max(latest, self.bookings[position][1])
+            if position > index and self.reach[position] == latest:
+                break
+            self.reach[position] = latest
+
+    def conflict(self, start, end, ignore=None):
+        # Return the ID of an event overlapping [start, end], or None
+        # Imported events may already overlap each other, so a booking that starts early can still outlast
+        # the ones after it: walk back from the last booking starting on or before end until none reach start
+        index = bisect_right(self.bookings, (end, date.max, chr(0x10FFFF)))
+        while index > 0:
+            index -= 1
+            if self.reach[index] < start:
+                return None
+            booked_start, booked_end, event_id = self.bookings[index]
+            if booked_end >= start and event_id != ignore:
+                return event_id
+        return None
+
+
+class ScheduleIndex(Follower):
+    """class representing the bookings of every venue, for double-booking checks and free venue queries"""
+    def __init__(self, venue_key=str):
+        self.venue_key = venue_key  # Function turning the venue typed on an event into a schedule key
+        self.schedules = {}  # Venue key -> VenueSchedule
+        self.slots = {}  # Event ID -> (venue key, start, end)
+
+    def build(self, events):
+        for event_id, event in events.items():
+            self.book(event_id, event.venue, event.date)
+        return self
+
+    def book(self, event_id, venue, start, end=None):
+        # Record an event in its venue's schedule, events with an unreadable date are left out
+        self.cancel(event_id)
+        start = parse_date(start)
+        end = parse_date(end) if end is not None else start
+        if start is None or end is None:
+            return
+        key = self.venue_key(venue)
+        self.schedules.setdefault(key, VenueSchedule()).add(start, end, event_id)
+        self.slots[event_id] = (key, start, end)
+
+    def cancel(self, event_id):
+        slot = self.slots.pop(event_id, None)
+        if slot is not None:
+            key, start, end = slot
+            self.schedules[key].remove(start, end, event_id)
+
+    def update(self, event_id, event):
+        self.book(event_id, event.venue, event.date)
+
+    def remove(self, event_id):
+        self.cancel(event_id)
+
+    def conflict(self, venue, start, end=None, ignore=None):
+        # ID of an event already booked at venue between start and end, or None
+        start = parse_date(start)
+        end = parse_date(end) if end is not None else start
+        schedule = self.schedules.get(self.venue_key(venue))
+        if schedule is None or start is None:
+            return None
+        return schedule.conflict(start, end, str(ignore) if ignore is not None else None)
+
+    def free_venues(self, venues, day, guests):
+        # IDs of venues that are not booked on day and can hold the number of guests
+        day = parse_date(day)
+        free = []
+        for venue_id, venue in venues.items():
+            if not guest_limit(venue.min_guests, 0) <= guests <= guest_limit(venue.max_guests, guests):
+                continue
+            if self.conflict(venue_id, day) is None:
+                free.append(venue_id)
+        return free
@@ -0,0 +1,80 @@
+import re
+from bisect import bisect_left, insort
+from OBSERVABLE import Follower
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Text fields indexed for each collection
+SEARCH_FIELDS = {
+    'guests': lambda guest: (guest.name, guest.email, guest.phone_number),
+    'clients': lambda client: (client.name, client.address, client.contact),
+    'suppliers': lambda supplier: (supplier.name, supplier.address, supplier.contact_details),
+    'venues': lambda venue: (venue.name, venue.address, venue.contact),
+}
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+class SearchIndex(Follower):
+    """class representing an inverted index with prefix lookup over the text fields of a collection"""
+    def __init__(self, fields):
+        self.fields = fields  # Function returning the texts to index for a record
+        self.postings = {}  # token -> set of keys whose fields contain the token
+        self.key_tokens = {}  # key -> tokens indexed for it, so an update can remove the old ones
+        self.vocabulary = []  # Sorted tokens, a prefix matches a contiguous run of them
+
+    def build(self, collection):
+        # Index every record, sorting the vocabulary once at the end
+        for key, record in collection.items():
+            self.add(key, record, keep_sorted=False)
+        self.vocabulary = sorted(self.postings)
+        return self
+
+    def add(self, key, record, keep_sorted=True):
+        tokens = set(tokenize(key))
+        for text in self.fields(record):
+            tokens.update(tokenize(text))
+        self.key_tokens[key] = tokens
+        for token in tokens:
+            keys = self.postings.get(token)
+            if keys is None:
+                self.postings[token] = keys = set()
+                if keep_sorted:
+                    insort(self.vocabulary, token)
+            keys.add(key)
+
+    def remove(self, key):
+        for token in self.key_tokens.pop(key, ()):
+            keys = self.postings[token]
+            keys.discard(key)
+            if not keys:
+                del self.postings[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+
+    def update(self, key, record):
+        self.remove(key)
+        self.add(key, record)
+
+    def prefix_keys(self, prefix):
+        # Every key with a token starting with prefix
+        start = bisect_left(self.vocabulary, prefix)
+        end = bisect_left(self.vocabulary, prefix + '\uffff')
+        if end - start == 1:
+            return self.postings[self.vocabulary[start]]
+        keys = set()
+        for token in self.vocabulary[start:end]:
+            keys.update(self.postings[token])
+        return keys
+
+    def search(self, text, limit=None):
+        # Keys with a token starting with every word of text, so results update while the user types
+        words = tokenize(text)
+        if not words:
+            return []
+        matches = [self.prefix_keys(word) for word in words]
+        matches.sort(key=len)
+        result = set(matches[0]).intersection(*matches[1:])
+        result = sorted(result, key=lambda key: (len(str(key)), str(key)))  # Numeric IDs in numeric order
+        return result[:limit] if limit else result
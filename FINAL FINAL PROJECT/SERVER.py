@@ -0,0 +1,314 @@
+"""HTTP/JSON access to the event data, for kiosks and the web check-in page, without a display.
+
+Run from the project folder, for example:
+    python -m SERVER --port 8080
+
+Every collection (employees, clients, suppliers, guests, venues, events) has the same endpoints:
+    GET    /api/guests?offset=0&limit=50    one page of records and the total number of records
+    GET    /api/guests/search?q=smith       records with words starting with the text
+    GET    /api/guests/12                   one record
+    POST   /api/guests                      add a record given as a JSON object of columns, answers with it
+    PUT    /api/guests/12                   change the columns given, the others keep their value
+    DELETE /api/guests/12                   delete a record
+and
+    GET    /api/venues/3/events             events booked at a venue
+    GET    /api/clients/7/events            events of a client
+    GET    /api/suppliers/match?event_type=WEDDING&guests=300
+                                            suppliers serving that event type and number of guests
+    GET    /api/clients/match?event_type=WEDDING
+                                            clients interested in that event type
+    GET    /api/enums                       the event types and services records may use
+    GET    /api/summary                     record counts, guest revenue and events per type
+    GET    /metrics                         timings of the requests and of loading, saving and searching,
+                                            in the Prometheus text format
+"""
+import argparse
+import asyncio
+import json
+import signal
+import sys
+from itertools import islice
+from urllib.parse import urlsplit, parse_qs, unquote
+from ENUMS import EventType, ServiceType
+from REPOSITORY import COLUMNS, to_row
+from TRANSFER import KEY_TYPES, headers
+from SERVICES import open_service
+from METRICS import metrics
+
+PAGE_SIZE = 50  # Records per page when the request gives no limit
+MAX_PAGE_SIZE = 1000
+MAX_BODY = 1 << 20  # Largest request body accepted, in bytes
+IDLE_TIMEOUT = 30  # Seconds a kept-alive connection may wait for its next request
+SYNC_INTERVAL = 1  # Seconds between reading the changes other copies of the app saved
+SYNC_LOCK_WAIT = 0.2  # Seconds a sync waits for a collection another copy has locked, it is read next time
+
+# (collection, path after a record's ID) -> (collection listed, EventService method finding its keys)
+RELATED = {('venues', 'events'): ('events', 'events_for_venue'),
+           ('clients', 'events'): ('events', 'events_for_client')}
+
+REASONS = {200: 'OK', 201: 'Created', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 411: 'Length Required', 413: 'Payload Too Large'}
+
+
+class HTTPError(Exception):
+    """class representing an error answered with an HTTP status and a message"""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def record_json(name, key, record):
+    # {"id": key, column: value, ...} of a record, the same columns as an export file
+    return dict(zip(headers(name), (key,) + tuple(to_row(name, record))))
+
+
+def response(status, payload, keep_alive):
+    # The bytes of a response with a JSON body, a plain text one for a str payload, no body for 204
+    content_type = 'application/json'
+    if status == 204:
+        body = b''
+    elif isinstance(payload, str):
+        body = payload.encode('utf-8')
+        content_type = 'text/plain; version=0.0.4'
+    else:
+        body = json.dumps(payload).encode('utf-8')
+    head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: {content_type}; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('ascii') + body
+
+
+async def read_request(reader):
+    # (method, target, body, keep_alive) of the next request on a connection, None once the client
+    # closed it or left it idle for IDLE_TIMEOUT. Raises HTTPError for requests that cannot be read
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), IDLE_TIMEOUT)
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(400, "the request headers are too long")
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, version = lines[0].split(' ')
+    except ValueError:
+        raise HTTPError(400, "malformed request line")
+    fields = {}
+    for line in lines[1:]:
+        field, separator, value = line.partition(':')
+        if separator:
+            fields[field.strip().lower()] = value.strip()
+    if 'transfer-encoding' in fields:
+        raise HTTPError(411, "send the body with a Content-Length")
+    try:
+        length = int(fields.get('content-length', 0))
+    except ValueError:
+        raise HTTPError(400, "Content-Length is not a number")
+    if length > MAX_BODY:
+        raise HTTPError(413, f"the body is larger than {MAX_BODY} bytes")
+    try:
+        body = await reader.readexactly(length) if length else b''
+    except asyncio.IncompleteReadError:
+        return None
+    # HTTP/1.1 connections stay open unless the client asks otherwise, HTTP/1.0 ones only if it asks
+    connection = fields.get('connection', '').lower()
+    keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+    return method.upper(), target, body, keep_alive
+
+
+class EventServer:
+    """class representing the HTTP API over one EventService, requests are answered one at a time on the event loop"""
+    def __init__(self, service, host='127.0.0.1', port=8080):
+        self.service = service
+        self.host = host
+        self.port = port  # 0 picks a free port, the one chosen is stored here by start()
+        self.server = None
+        self.syncing = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.syncing = asyncio.create_task(self.sync_loop())
+
+    async def serve(self):
+        await self.start()
+        print(f"Serving on http://{self.host}:{self.port}/api/", flush=True)
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def sync_loop(self):
+        # Show what the desktop app and other copies save while the server runs. The files are read on a
+        # worker thread so requests are answered meanwhile, the collections are only changed here.
+        # Any error, e.g. the data folder being unreachable for now, is reported and retried next time
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(SYNC_INTERVAL)
+            try:
+                fetched = await loop.run_in_executor(None, self.service.fetch_changes, SYNC_LOCK_WAIT)
+                dropped = self.service.apply_changes(fetched)
+            except Exception as error:
+                print(f"Reading the changes of other copies failed, retrying: {error!r}", file=sys.stderr)
+                continue
+            for name, key in dropped:
+                print(f"{name} {key} was changed by another copy first, the change made here was dropped",
+                      file=sys.stderr)
+
+    async def handle(self, reader, writer):
+        # Answer the requests of one connection in order until the client closes it or asks to
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as error:
+                    writer.write(response(error.status, {'error': str(error)}, False))
+                    break
+                if request is None:
+                    break
+                method, target, body, keep_alive = request
+                status, payload = self.dispatch(method, target, body)
+                writer.write(response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass  # The client went away in the middle of a request
+        finally:
+            writer.close()
+
+    def dispatch(self, method, target, body):
+        # (status, JSON payload) of one request, invalid records become 400 answers
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.split('/') if part]
+        query = {field: values[-1] for field, values in parse_qs(url.query).items()}
+        try:
+            if parts == ['metrics']:
+                self.allow(method, 'GET')
+                return 200, metrics.to_prometheus()
+            if len(parts) < 2 or parts[0] != 'api':
+                raise HTTPError(404, f"no endpoint at {url.path}")
+            with metrics.timer(f'api_{method.lower()}', parts[1]):
+                return self.route(method, parts[1:], query, body)
+        except HTTPError as error:
+            return error.status, {'error': str(error)}
+        except (ValueError, TypeError) as error:
+            return 400, {'error': str(error)}
+
+    def route(self, method, parts, query, body):
+        if parts == ['enums']:
+            self.allow(method, 'GET')
+            return 200, {'event_types': [event_type.name for event_type in EventType],
+                         'services': [service.value for service in ServiceType]}
+        if parts == ['summary']:
+            self.allow(method, 'GET')
+            return 200, self.service.summary()
+        name = parts[0]
+        if name not in COLUMNS or len(parts) > 3 or (len(parts) == 3 and (name, parts[2]) not in RELATED):
+            raise HTTPError(404, f"no endpoint at /api/{'/'.join(parts)}")
+        if len(parts) == 1:
+            self.allow(method, 'GET', 'POST')
+            if method == 'GET':
+                return 200, self.page(name, query)
+            key = self.service.add_record(name, self.read_object(body))
+            return 201, record_json(name, key, getattr(self.service, name)[key])
+        if parts[1] == 'search':
+            self.allow(method, 'GET')
+            limit = self.number(query, 'limit', PAGE_SIZE, 1, MAX_PAGE_SIZE)
+            keys = self.service.search_records(name, query.get('q', ''), limit)
+            collection = getattr(self.service, name)
+            return 200, {'items': [record_json(name, key, collection[key]) for key in keys]}
+        if name == 'suppliers' and parts[1] == 'match':
+            self.allow(method, 'GET')
+            keys = self.service.suppliers_for_event(query.get('event_type', ''), query.get('guests', ''))
+            return 200, {'items': [record_json(name, key, self.service.suppliers[key]) for key in keys]}
+        if name == 'clients' and parts[1] == 'match':
+            self.allow(method, 'GET')
+            keys = self.service.clients_for_event_type(query.get('event_type', ''))
+            return 200, {'items': [record_json(name, key, self.service.clients[key]) for key in keys]}
+        if len(parts) == 3:
+            self.allow(method, 'GET')
+            related, find = RELATED[name, parts[2]]
+            keys = getattr(self.service, find)(self.key(name, parts[1]))
+            collection = getattr(self.service, related)
+            return 200, {'items': [record_json(related, key, collection[key]) for key in keys]}
+        self.allow(method, 'GET', 'PUT', 'DELETE')
+        key = self.key(name, parts[1])
+        if method == 'GET':
+            return 200, record_json(name, key, getattr(self.service, name)[key])
+        if method == 'PUT':
+            self.service.update_record(name, key, self.read_object(body))
+            return 200, record_json(name, key, getattr(self.service, name)[key])
+        self.service.remove_record(name, key)
+        return 204, None
+
+    def allow(self, method, *methods):
+        if method not in methods:
+            raise HTTPError(405, f"{method} is not allowed here, use {' or '.join(methods)}")
+
+    def key(self, name, text):
+        # Key of an existing record from the text of its URL
+        try:
+            key = KEY_TYPES[name](text)
+        except ValueError:
+            key = None
+        if key is None or key not in getattr(self.service, name):
+            raise HTTPError(404, f"no {name} record with ID {text}")
+        return key
+
+    def number(self, query, field, default, low, high):
+        value = int(query.get(field, default))
+        if not low <= value <= high:
+            raise HTTPError(400, f"{field} must be between {low} and {high}")
+        return value
+
+    def read_object(self, body):
+        row = json.loads(body or b'null')
+        if not isinstance(row, dict):
+            raise HTTPError(400, "the body must be a JSON object of column values")
+        return row
+
+    def page(self, name, query):
+        # One page of a collection in key order, or sorted by ?sort=field&order=desc and filtered by
+        # ?from=&to=, with the offset of the next page or None after the last
+        offset = self.number(query, 'offset', 0, 0, sys.maxsize)
+        limit = self.number(query, 'limit', PAGE_SIZE, 1, MAX_PAGE_SIZE)
+        collection = getattr(self.service, name)
+        if 'sort' in query:
+            keys = self.service.sorted_keys(name, query['sort'], query.get('order') == 'desc',
+                                            query.get('from'), query.get('to'))
+            items = [record_json(name, key, collection[key]) for key in keys[offset:offset + limit]]
+            total = len(keys)
+        else:
+            items = [record_json(name, key, collection[key])
+                     for key in islice(collection.keys(), offset, offset + limit)]
+            total = len(collection)
+        end = offset + len(items)
+        return {'items': items, 'total': total, 'offset': offset, 'limit': limit,
+                'next': end if end < total else None}
+
+
+def stop(signum, frame):
+    # Stop on SIGTERM the same way as on Ctrl+C, so queued changes are still written
+    raise KeyboardInterrupt
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m SERVER', description="The Best Events Company HTTP API")
+    parser.add_argument('--data', help="folder holding the data files (default: EVENTS_DATA_DIR or the app's)")
+    parser.add_argument('--storage', choices=('journal', 'sqlite'), help="storage backend (default: EVENTS_STORAGE)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080, help="port to listen on, 0 picks a free one")
+    args = parser.parse_args(argv)
+    signal.signal(signal.SIGTERM, stop)
+    service = open_service(args.data, args.storage)
+    try:
+        service.preload()  # Load everything first, so no request waits for a collection to be read
+        asyncio.run(EventServer(service, args.host, args.port).serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
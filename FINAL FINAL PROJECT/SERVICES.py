@@ -0,0 +1,543 @@
+import os
+import threading
+from ENUMS import EventType
+from CLASSES import Employee, Client, Supplier, Guest, Event, Venue
+from REPOSITORY import open_repository, LazyCollection, COLUMNS, to_row, from_row
+from OBSERVABLE import ObservableDict
+from SEARCH import SearchIndex, SEARCH_FIELDS
+from SORTING import SortedIndex, SORT_FIELDS, sort_value, parse_bound
+from SCHEDULE import ScheduleIndex, parse_date
+from RELATIONS import RelationIndex, RELATION_FIELDS, link_text
+from MATCHING import CapacityIndex
+from REPORTS import Rollup, ROLLUPS, build_reports, event_type_label
+from METRICS import metrics, timed
+from PRICING import pricing, to_event_type, format_cost
+from TRANSFER import KEY_TYPES, validate, check_event_type, import_file, export_file
+
+# Folder holding the snapshot and journal files, EVENTS_DATA_DIR points scripts at another one
+DATA_DIR = os.environ.get('EVENTS_DATA_DIR', '../final assignmnet ')
+
+# File the load, save, populate and search timings are written to on close, Prometheus text for a .prom file
+METRICS_FILE = os.environ.get('EVENTS_METRICS_FILE')
+
+# Field looked up when a record is searched by something other than its ID
+NAME_FIELDS = {'employees': 'name', 'clients': 'name', 'suppliers': 'name', 'guests': 'name',
+               'venues': 'name', 'events': 'client'}
+
+# Attribute holding the next ID of each collection, the store makes sure other copies of the app do not reuse it
+ID_COUNTERS = {'clients': 'client_id_counter', 'employees': 'employee_id_counter',
+               'suppliers': 'supplier_id_counter', 'guests': 'guest_id_counter',
+               'venues': 'venue_id_counter', 'events': 'event_id_counter'}
+
+
+class EventService:
+    """class representing the collections and business rules of the company, without any user interface"""
+    # Dictionaries to store data about clients, employees, suppliers, guests, venues and events,
+    # each one is loaded from storage the first time it is used
+    clients = LazyCollection('clients')
+    employees = LazyCollection('employees')
+    suppliers = LazyCollection('suppliers')
+    guests = LazyCollection('guests')
+    venues = LazyCollection('venues')
+    events = LazyCollection('events')
+
+    def __init__(self, store):
+        # ID counters, updated when their collection is loaded
+        self.client_id_counter = 1
+        self.employee_id_counter = 1
+        self.supplier_id_counter = 1
+        self.guest_id_counter = 1
+        self.event_id_counter = 1
+        self.venue_id_counter = 1
+        self.load_lock = threading.RLock()  # Stops the preload thread and a screen loading the same collection
+        self.search_indexes = {}  # Collection name -> SearchIndex, built the first time it is searched
+        self.sort_indexes = {}  # (collection, field) -> SortedIndex, built the first time a list is sorted by it
+        self.schedule = None  # ScheduleIndex of venue bookings, built the first time an event is booked
+        self.relations = {}  # (collection, field) -> RelationIndex, built the first time it is queried
+        self.capacity = None  # CapacityIndex of the suppliers' guest ranges, built the first time one is matched
+        self.rollups = {}  # Report name -> Rollup, built the first time the report is made
+        self.store = store  # Journal files by default, EVENTS_STORAGE=sqlite for SQLite
+        self.closed = False  # Set by close(), the app closes on its window's close and again as it exits
+
+    def preload(self):
+        # Touching each collection loads it if nothing has yet, the app runs this on a background thread
+        self.load_collections(COLUMNS)
+
+    def load_collections(self, names, progress=None):
+        # Load several collections, e.g. the ones a screen needs, calling progress(loaded, total) after each
+        names = list(names)
+        for number, name in enumerate(names, start=1):
+            getattr(self, name)
+            if progress is not None:
+                progress(number, len(names))
+
+    def next_id(self, name):
+        # Hand out the next ID of a collection, as an int or a string like the collection's keys
+        return self.next_ids(name, 1)[0]
+
+    def next_ids(self, name, count):
+        # Reserve count IDs through the store, so other copies of the app sharing the data never get them
+        getattr(self, name)  # Loading the collection moves its counter past the IDs already used
+        counter = ID_COUNTERS[name]
+        first = self.store.allocate_ids(name, getattr(self, counter), count)
+        setattr(self, counter, first + count)
+        return [number if name in ('clients', 'employees', 'suppliers') else str(number)
+                for number in range(first, first + count)]
+
+    def on_collection_loaded(self, name, data):
+        # Continue the ID counter of a collection after its highest existing ID
+        if name == 'clients':
+            self.client_id_counter = max(data.keys(), default=0) + 1
+        elif name == 'employees':
+            self.employee_id_counter = max(data.keys(), default=0) + 1
+        elif name == 'suppliers':
+            self.supplier_id_counter = max((int(k) for k in data.keys() if str(k).isdigit()), default=0) + 1
+        elif name == 'guests':
+            self.guest_id_counter = max((int(k) for k in data.keys() if str(k).isdigit()), default=0) + 1
+        elif name == 'venues':
+            self.venue_id_counter = max((int(k) for k in data.keys()), default=0) + 1
+        elif name == 'events':
+            self.event_id_counter = max((int(key) for key in data.keys()), default=0) + 1
+
+    @timed('load', records=len, collection=True)
+    def load_data(self, name):
+        # Load a collection from its snapshot plus journal, an empty dictionary if neither exists,
+        # wrapped so the list views hear about every added, updated or removed record
+        return ObservableDict(self.store.load(name))
+
+    @timed('save', collection=True)
+    def save_record(self, name, key):
+        # Append only the changed record to the collection's journal
+        self.store.put(name, key, getattr(self, name)[key])
+
+    @timed('delete', collection=True)
+    def delete_record(self, name, key):
+        # Append a removal of the record to the collection's journal
+        self.store.delete(name, key)
+
+    def sync(self):
+        # Apply to the loaded collections what other copies of the app sharing the data saved since the
+        # last call. Returns [(name, key)] of this copy's changes that were dropped because another copy
+        # changed the same record first, the collections show the other copy's version instead
+        return self.apply_changes(self.fetch_changes())
+
+    def fetch_changes(self, timeout=None):
+        # Read what other copies saved without touching the collections, so it can run off the Tk thread.
+        # timeout limits the wait for a collection another copy has locked, it is read next time instead
+        fetched = []
+        for name in COLUMNS:
+            if self.__dict__.get(name) is not None:  # Not loaded yet, it will be read with every change when it is
+                fetched.append((name,) + tuple(self.store.refresh(name, timeout)))
+        return fetched
+
+    @timed('sync', records=len)
+    def apply_changes(self, fetched):
+        # Apply what fetch_changes read to the collections, returns the dropped [(name, key)] like sync
+        dropped = []
+        for name, data, changes, conflicts in fetched:
+            collection = self.__dict__[name]
+            if data is not None:
+                collection.replace(data)
+            for key, record in changes:
+                if record is not None:
+                    collection[key] = record
+                elif key in collection:
+                    del collection[key]
+            dropped += [(name, key) for key in conflicts]
+        return dropped
+
+    def close(self):
+        # Write queued changes, finish any background compaction and close the journals, once
+        if self.closed:
+            return
+        self.closed = True
+        self.store.close()
+        if METRICS_FILE and metrics.enabled:
+            metrics.write(METRICS_FILE)
+
+    #--------------------------------------------------------------------------
+
+    def search_index(self, name):
+        # Build the text index of a collection once, then keep it updated as records are saved
+        if name not in self.search_indexes:
+            collection = getattr(self, name)
+            self.search_indexes[name] = self.new_search_index(name).build(collection)
+            self.search_indexes[name].follow(collection)
+        return self.search_indexes[name]
+
+    def new_search_index(self, name):
+        # Empty text index of a collection, for a caller building it from a snapshot on another thread
+        return SearchIndex(SEARCH_FIELDS[name])
+
+    @timed('search', records=len, collection=True)
+    def search_records(self, name, text, limit=None):
+        # Keys of the records matching text, by word prefix where the collection has a text index
+        if name in SEARCH_FIELDS:
+            return self.search_index(name).search(text, limit)
+        keys = list(self.store.search(name, NAME_FIELDS[name], text.strip()))
+        return keys[:limit] if limit else keys
+
+    def sort_index(self, name, field):
+        # Build the sorted index of a field once, then keep it updated as records are saved
+        if (name, field) not in self.sort_indexes:
+            collection = getattr(self, name)
+            index = self.new_sort_index(name, field).build(collection)
+            index.follow(collection)
+            self.sort_indexes[name, field] = index
+        return self.sort_indexes[name, field]
+
+    def new_sort_index(self, name, field):
+        # Empty sorted index of a field, for a caller building it from a snapshot on another thread
+        if field not in SORT_FIELDS.get(name, {}):
+            raise ValueError(f"{name} cannot be sorted by {field}")
+        return SortedIndex(sort_value(field, SORT_FIELDS[name][field]))
+
+    @timed('sort', records=len, collection=True)
+    def sorted_keys(self, name, field, descending=False, low=None, high=None):
+        # Live view of the keys sorted by field. With low or high as typed, only the records whose field
+        # is in that range, a text range includes the values starting with high
+        index = self.sort_index(name, field)
+        kind = SORT_FIELDS[name][field]
+        low, high = parse_bound(kind, low), parse_bound(kind, high)
+        if kind == 'text' and high is not None:
+            high += '\uffff'
+        return index.view(low, high, descending)
+
+    @timed('find_by_name', collection=True)
+    def find_by_name(self, name, field, text):
+        # Look a record up by a non-ID field through the storage backend, returns its key or None
+        matches = self.store.search(name, field, text.strip())
+        return next(iter(matches), None)
+
+    @timed('find', collection=True)
+    def find_record(self, name, text):
+        # Key of the record with text as its ID, or else as its name (the client for events), or None
+        text = str(text).strip()
+        try:
+            key = KEY_TYPES[name](text)
+        except ValueError:
+            key = None
+        if key is not None and key in getattr(self, name):
+            return key
+        return self.find_by_name(name, NAME_FIELDS[name], text)
+
+    def venue_key(self, venue):
+        # Events name their venue by ID or by name, both map to the venue's name
+        text = str(venue).strip()
+        found = self.venues.get(text)
+        return (found.name if found else text).strip().lower()
+
+    def schedule_index(self):
+        # Build the venue booking index once, then keep it updated as events are saved
+        if self.schedule is None:
+            self.schedule = ScheduleIndex(self.venue_key).build(self.events)
+            self.schedule.follow(self.events)
+        return self.schedule
+
+    def booking_problem(self, venue, date, event_id=None):
+        # Why an event cannot be booked at venue on date, or None if it can
+        if parse_date(date) is None:
+            return "Please enter the date as YYYY-MM-DD."
+        conflict = self.schedule_index().conflict(venue, date, ignore=event_id)
+        if conflict is not None:
+            return f"{venue} is already booked on {date} by event {conflict}."
+        return None
+
+    def free_venues(self, date, guests):
+        # IDs of the venues free on date that can hold the number of guests
+        if parse_date(date) is None:
+            raise ValueError("Please enter the date as YYYY-MM-DD.")
+        return self.schedule_index().free_venues(self.venues, date, int(guests))
+
+    def relation_index(self, name, field):
+        # Build the index of a field pointing at other records once, then keep it updated as records are saved
+        if (name, field) not in self.relations:
+            collection = getattr(self, name)
+            self.relations[name, field] = RelationIndex(RELATION_FIELDS[name, field]).build(collection)
+            self.relations[name, field].follow(collection)
+        return self.relations[name, field]
+
+    def events_for_venue(self, venue_id):
+        # Keys of the events booked at a venue, which they may name by its ID or by its name
+        venue = self.venues.get(venue_id)
+        targets = (link_text(venue_id), link_text(venue)) if venue is not None else (link_text(venue_id),)
+        return self.relation_index('events', 'venue').keys_for(*targets)
+
+    def events_for_client(self, client_id):
+        # Keys of the events of a client, events name their client by name
+        client = self.clients.get(client_id)
+        if client is None:
+            return []
+        return self.relation_index('events', 'client').keys_for(link_text(client))
+
+    def clients_for_event_type(self, event_type):
+        # Keys of the clients interested in an event type
+        return self.relation_index('clients', 'events').keys_for(check_event_type(event_type))
+
+    def capacity_index(self):
+        # Build the guest range index of the suppliers once, then keep it updated as suppliers are saved
+        if self.capacity is None:
+            self.capacity = CapacityIndex().build(self.suppliers)
+            self.capacity.follow(self.suppliers)
+        return self.capacity
+
+    def suppliers_for_event(self, event_type, guests):
+        # Keys of the suppliers serving an event type whose guest range includes the number of guests
+        return self.capacity_index().match(check_event_type(event_type), int(guests))
+
+    def suppliers_for_events(self, guests_by_event):
+        # Suppliers for many events in one call, e.g. a whole season: {event ID: guests} -> {event ID: [keys]}
+        event_ids = list(guests_by_event)
+        requests = [(check_event_type(self.events[event_id].event_type), int(guests_by_event[event_id]))
+                    for event_id in event_ids]
+        return dict(zip(event_ids, self.capacity_index().match_many(requests)))
+
+    #--------------------------------------------------------------------------
+
+    def create_employee(self, name, department, job_title, salary):
+        if not all([name, department, job_title, salary]):
+            raise ValueError("All fields are required")
+        emp_id = self.next_id('employees')
+        self.employees[emp_id] = Employee(emp_id, name, "", "", department, job_title, salary)
+        self.save_record('employees', emp_id)
+        return emp_id
+
+    def edit_employee(self, emp_id, name, department, job_title, salary):
+        if not all([name, department, job_title, salary]):
+            raise ValueError("All fields are required")
+        self.employees[emp_id].modify(name, department, job_title, salary)
+        self.employees.touch(emp_id)  # Changed in place, so tell the list views
+        self.save_record('employees', emp_id)
+
+    #--------------------------------------------------------------------------
+
+    def create_client(self, name, address, contact_details, budget, event_type):
+        if not all([name, address, contact_details, budget]):
+            raise ValueError("All fields are required")
+        try:
+            budget = float(budget)
+        except ValueError:
+            raise ValueError("Invalid budget. Please enter a numeric value.")
+        client_id = self.next_id('clients')
+        new_client = Client(client_id, name, address, contact_details, budget)
+        new_client.add_event(event_type)
+        self.clients[client_id] = new_client
+        self.save_record('clients', client_id)
+        return client_id
+
+    def edit_client(self, client_id, name, address, contact_details, budget):
+        if not all([name, address, contact_details, budget]):
+            raise ValueError("All fields are required")
+        try:
+            budget = float(budget)
+        except ValueError:
+            raise ValueError("Invalid input for budget. Please enter a numeric value.")
+        client = self.clients[client_id]
+        client.name = name
+        client.address = address
+        client.contact = contact_details
+        client.budget = budget
+        self.clients.touch(client_id)  # Changed in place, so tell the list views
+        self.save_record('clients', client_id)
+
+    #--------------------------------------------------------------------------
+
+    def supplier_fields(self, name, address, contact_details, event_type, min_guests, max_guests):
+        # Check a supplier form, returns the event type and the guest limits as numbers
+        try:
+            min_guests = int(min_guests)
+            max_guests = int(max_guests)
+        except ValueError:
+            raise ValueError("Max Guests and Min Guests must be numbers")
+        if not all([name, address, contact_details, max_guests, min_guests, event_type]):
+            raise ValueError("All fields are required")
+        if to_event_type(event_type) is None:
+            raise ValueError("Invalid Event Type")
+        return to_event_type(event_type), min_guests, max_guests
+
+    def create_supplier(self, name, address, contact_details, max_guests, min_guests, event_type):
+        event_type, min_guests, max_guests = self.supplier_fields(name, address, contact_details, event_type,
+                                                                  min_guests, max_guests)
+        supplier_id = self.next_id('suppliers')
+        self.suppliers[supplier_id] = Supplier(supplier_id, name, address, contact_details, [event_type],
+                                               min_guests, max_guests)
+        self.save_record('suppliers', supplier_id)
+        return supplier_id
+
+    def edit_supplier(self, supplier_id, name, address, contact_details, event_type, min_guests, max_guests):
+        event_type, min_guests, max_guests = self.supplier_fields(name, address, contact_details, event_type,
+                                                                  min_guests, max_guests)
+        supplier = self.suppliers[supplier_id]
+        supplier.name = name
+        supplier.address = address
+        supplier.contact_details = contact_details
+        supplier.event_type = event_type
+        supplier.min_guests = min_guests
+        supplier.max_guests = max_guests
+        self.suppliers.touch(supplier_id)  # Changed in place, so tell the list views
+        self.save_record('suppliers', supplier_id)
+
+    #--------------------------------------------------------------------------
+
+    def create_guest(self, name, email, phone_number, total_cost, event_type=None, services=None):
+        guest_id = self.next_id('guests')
+        # A guest registered with a quote keeps its event type and services, so it can be re-priced later
+        self.guests[guest_id] = Guest(guest_id, name, email, phone_number, total_cost, event_type or None,
+                                      services if event_type else None)
+        self.save_record('guests', guest_id)
+        return guest_id
+
+    def quote_guest(self, name, email, phone_number, event_type, services):
+        # Register a guest with the price of the event type and services they picked
+        if not event_type:
+            raise ValueError("Please select an event type.")
+        return self.create_guest(name, email, phone_number, str(pricing.price(event_type, services)),
+                                 event_type, services)
+
+    def edit_guest(self, guest_id, name, email, phone_number, total_cost):
+        guest = self.guests[guest_id]
+        guest.name = name
+        guest.email = email
+        guest.phone_number = phone_number
+        guest.total_cost = total_cost
+        self.guests.touch(guest_id)  # Changed in place, so tell the list views
+        self.save_record('guests', guest_id)
+
+    def set_guest_cost(self, guest_id, total_cost):
+        self.guests[guest_id].total_cost = format_cost(float(total_cost))
+        self.guests.touch(guest_id)  # Changed in place, so tell the list views
+        self.save_record('guests', guest_id)
+
+    def reprice_guests(self):
+        # Price every quoted guest in one batch, then save the changed ones in one journal write
+        guests = self.guests.data
+        changed = guests.reprice(pricing) if hasattr(guests, 'reprice') else pricing.reprice_guests(guests)
+        self.store.put_many('guests', ((guest_id, self.guests[guest_id]) for guest_id in changed))
+        for guest_id in changed:
+            self.guests.touch(guest_id)
+        return changed
+
+    #--------------------------------------------------------------------------
+
+    def create_event(self, event_type, date, client_name, venue):
+        problem = self.booking_problem(venue, date)
+        if problem:
+            raise ValueError(problem)
+        event_id = self.next_id('events')
+        event_type = EventType[event_type] if isinstance(event_type, str) else event_type
+        self.events[event_id] = Event(event_id, event_type, date, client_name, venue)
+        self.save_record('events', event_id)
+        return event_id
+
+    def edit_event(self, event_id, event_type, date, client_name, venue):
+        problem = self.booking_problem(venue, date, event_id)
+        if problem:
+            raise ValueError(problem)
+        event_type = EventType[event_type] if isinstance(event_type, str) else event_type
+        self.events[event_id] = Event(event_id, event_type, date, client_name, venue)
+        self.save_record('events', event_id)
+
+    #--------------------------------------------------------------------------
+
+    def create_venue(self, name, address, contact, min_guests, max_guests):
+        venue_id = self.next_id('venues')
+        self.venues[venue_id] = Venue(venue_id, name, address, contact, min_guests, max_guests)
+        self.save_record('venues', venue_id)
+        return venue_id
+
+    def edit_venue(self, venue_id, name, address, contact, min_guests, max_guests):
+        venue = self.venues[venue_id]
+        venue.name = name
+        venue.address = address
+        venue.contact = contact
+        venue.min_guests = min_guests
+        venue.max_guests = max_guests
+        self.venues.touch(venue_id)  # Changed in place, so tell the list views
+        self.save_record('venues', venue_id)
+
+    #--------------------------------------------------------------------------
+
+    def add_record(self, name, row):
+        # Add one record given as {column: text}, checked the same way as an imported row
+        values = validate(name, row)
+        if name == 'events':
+            problem = self.booking_problem(values[3], values[1])
+            if problem:
+                raise ValueError(problem)
+        key = self.next_id(name)
+        record = from_row(name, key, values)
+        getattr(self, name)[key] = record
+        self.save_record(name, key)
+        return key
+
+    def update_record(self, name, key, row):
+        # Change the columns of a record given as {column: text}, columns left out keep their value.
+        # Returns False if there was no record with that key
+        collection = getattr(self, name)
+        if key not in collection:
+            return False
+        current = dict(zip(COLUMNS[name], to_row(name, collection[key])))
+        current.update(row)
+        values = validate(name, current)
+        if name == 'events':
+            problem = self.booking_problem(values[3], values[1], key)
+            if problem:
+                raise ValueError(problem)
+        collection[key] = from_row(name, key, values)
+        self.save_record(name, key)
+        return True
+
+    def remove_record(self, name, key):
+        # Delete a record, returns False if there was none with that key
+        collection = getattr(self, name)
+        if key not in collection:
+            return False
+        del collection[key]
+        self.delete_record(name, key)
+        return True
+
+    def import_records(self, name, path):
+        # Import a CSV or JSON file, returns (number imported, [(row number, error), ...])
+        collection = getattr(self, name)
+        # IDs for the rows without one are reserved per chunk, exactly as many as the chunk needs
+        count, errors = import_file(path, name, collection, self.store, lambda count: self.next_ids(name, count))
+        self.on_collection_loaded(name, collection)  # Move the ID counter past any imported IDs
+        self.store.allocate_ids(name, getattr(self, ID_COUNTERS[name]), 0)  # And the other copies' counters
+        return count, errors
+
+    def export_records(self, name, path, progress=None, records=None):
+        # records is a snapshot of the collection to write, taken by a caller exporting on another thread
+        return export_file(path, name, getattr(self, name) if records is None else records, progress)
+
+    def rollup(self, name):
+        # Build the running totals of a report once, then keep them updated as records are saved
+        if name not in self.rollups:
+            collection_name, group, measures = ROLLUPS[name]
+            collection = getattr(self, collection_name)
+            self.rollups[name] = Rollup(group, measures).build(collection)
+            self.rollups[name].follow(collection)
+        return self.rollups[name]
+
+    def reports(self):
+        # Revenue by event type, events per venue, payroll by department and client budget utilization
+        return build_reports(self)
+
+    def summary(self):
+        # Record counts, guest revenue, guests per event type and events per type, for the nightly report
+        guests = self.guests.data
+        if hasattr(guests, 'total_revenue'):
+            # Running totals of a GuestTable
+            revenue = guests.total_revenue()
+            guests_by_type = guests.guests_per_event_type()
+        else:
+            totals = self.rollup('guest_revenue').totals
+            revenue = sum(values[1] for values in totals.values())
+            guests_by_type = {group: values[0] for group, values in totals.items() if group}
+        events = self.rollup('events_by_type')
+        events_by_type = {event_type.name: events.get(event_type_label(event_type))[0] for event_type in EventType}
+        return {'counts': {name: len(getattr(self, name)) for name in COLUMNS},
+                'guest_revenue': revenue, 'guests_by_event_type': guests_by_type, 'events_by_type': events_by_type}
+
+def open_service(directory=None, backend=None):
+    # A service reading and writing the files in directory, without any window
+    return EventService(open_repository(directory or DATA_DIR, backend))
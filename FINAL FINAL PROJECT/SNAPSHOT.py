@@ -0,0 +1,327 @@
+import json
+import mmap
+import os
+import struct
+from collections.abc import MutableMapping
+from REPOSITORY import COLUMNS, to_row, from_row
+from CODEC import column_mapper
+from COMPRESSION import get_codec
+
+# Snapshot file layout, all integers little-endian:
+#   header   magic, version, number of columns, number of records, offsets of the sections below,
+#            and where the JSON description {"collection", "columns"} sits in the heap
+#   records  one fixed-width entry per record in insertion order: a (type, heap offset, length)
+#            triple for the key and for every column
+#   index    record numbers sorted by key, for binary search
+#   heap     the UTF-8 text of every key and value
+# Opening a file only reads the header, a record is decoded the first time it is used.
+MAGIC = b'EVSNAP01'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQQQQII')
+FIELD = struct.Struct('<BII')
+INDEX = struct.Struct('<I')
+
+# Compressed snapshot layout, for slow drives where reading the bytes takes longer than decoding them:
+#   header   magic, version, length of the JSON description {"collection", "columns", "codec", "count"}
+#   chunks   (compressed length, number of records) then the compressed JSON rows [id, column values...]
+#            of up to CHUNK_RECORDS records, each chunk compressed on its own
+# Loading reads and decompresses one chunk at a time, so the whole file is never held uncompressed.
+CHUNKED_MAGIC = b'EVSNAPZ1'
+CHUNKED_HEADER = struct.Struct('<8sII')
+CHUNK = struct.Struct('<II')
+CHUNK_RECORDS = 4096
+
+STR, INT, FLOAT, NONE = 0, 1, 2, 3
+
+
+def encode_value(value):
+    # (type, text) of a key or column value
+    if value is None:
+        return NONE, b''
+    if isinstance(value, bool):
+        return INT, str(int(value)).encode('utf-8')
+    if isinstance(value, int):
+        return INT, str(value).encode('utf-8')
+    if isinstance(value, float):
+        return FLOAT, repr(value).encode('utf-8')
+    return STR, str(value).encode('utf-8')
+
+
+def decode_value(kind, data):
+    if kind == STR:
+        return str(data, 'utf-8')
+    if kind == INT:
+        return int(data)
+    if kind == FLOAT:
+        return float(data)
+    return None
+
+
+def sort_key(key):
+    # Keys of one collection are all ints or all strings, the type keeps mixed ones comparable
+    return (0, key, '') if isinstance(key, int) else (1, 0, str(key))
+
+
+def write_snapshot(path, name, data, codec=None):
+    # Write {key: record} in the snapshot layout, through a temporary file renamed over path.
+    # With a codec name (zlib, lzma, zstd) the file is written as compressed chunks instead
+    if get_codec(codec) is not None:
+        return write_chunked_snapshot(path, name, data, get_codec(codec))
+    columns = COLUMNS[name]
+    record = struct.Struct('<' + 'BII' * (len(columns) + 1))
+    heap = bytearray()
+    entries = bytearray()
+    keys = []
+    for key, value in data.items():
+        fields = []
+        for item in (key,) + tuple(to_row(name, value)):
+            kind, text = encode_value(item)
+            fields += (kind, len(heap), len(text))
+            heap += text
+        entries += record.pack(*fields)
+        keys.append(key)
+    description = json.dumps({'collection': name, 'columns': columns}).encode('utf-8')
+    description_offset = len(heap)
+    heap += description
+    order = sorted(range(len(keys)), key=lambda number: sort_key(keys[number]))
+    index = struct.pack(f'<{len(order)}I', *order)
+    records_offset = HEADER.size
+    index_offset = records_offset + len(entries)
+    heap_offset = index_offset + len(index)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(columns), len(keys), records_offset, index_offset, heap_offset,
+                            description_offset, len(description)))
+        f.write(entries)
+        f.write(index)
+        f.write(heap)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def write_chunked_snapshot(path, name, data, codec):
+    # Write {key: record} as compressed chunks of JSON rows
+    description = json.dumps({'collection': name, 'columns': COLUMNS[name], 'codec': codec.name,
+                              'count': len(data)}).encode('utf-8')
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(CHUNKED_HEADER.pack(CHUNKED_MAGIC, VERSION, len(description)))
+        f.write(description)
+        rows = []
+        for key, record in data.items():
+            rows.append(json.dumps([key, *to_row(name, record)], separators=(',', ':')))
+            if len(rows) == CHUNK_RECORDS:
+                write_chunk(f, codec, rows)
+                rows = []
+        if rows:
+            write_chunk(f, codec, rows)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def write_chunk(f, codec, rows):
+    data = codec.compress(','.join(rows).encode('utf-8'))
+    f.write(CHUNK.pack(len(data), len(rows)))
+    f.write(data)
+
+
+def open_snapshot(path, name):
+    # Map a snapshot file, or open a compressed one for reading in chunks, None if there is none
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        magic = f.read(len(CHUNKED_MAGIC))
+    if magic == CHUNKED_MAGIC:
+        return ChunkedSnapshot(path, name)
+    return MappedSnapshot(path, name)
+
+
+class ChunkedSnapshot:
+    """class representing a compressed snapshot file, read and decoded one chunk at a time"""
+    def __init__(self, path, name):
+        self.path = path
+        self.name = name
+        with open(path, 'rb') as f:
+            description = self.read_description(f)
+        self.count = description['count']
+        self.codec = get_codec(description['codec'])  # ValueError if the codec is not installed here
+        self.mapper = column_mapper(name, description['columns'])
+        self.bytes_read = 0  # Compressed bytes read by the last items() call, for benchmarks
+
+    def read_description(self, f):
+        magic, version, length = CHUNKED_HEADER.unpack(f.read(CHUNKED_HEADER.size))
+        if version > VERSION:
+            raise ValueError(f"{self.path} was written by a newer version (format {version})")
+        description = json.loads(f.read(length))
+        if description['collection'] != self.name:
+            raise ValueError(f"{self.path} holds {description['collection']}, not {self.name}")
+        return description
+
+    def chunks(self):
+        # Decoded rows of each chunk in file order
+        with open(self.path, 'rb') as f:
+            self.read_description(f)
+            self.bytes_read = f.tell()
+            while True:
+                header = f.read(CHUNK.size)
+                if len(header) < CHUNK.size:
+                    return
+                length, count = CHUNK.unpack(header)
+                data = f.read(length)
+                if len(data) < length:
+                    raise ValueError(f"{self.path} ends in the middle of a chunk")
+                self.bytes_read += CHUNK.size + length
+                yield json.loads(b'[' + self.codec.decompress(data) + b']')
+
+    def keys(self):
+        for rows in self.chunks():
+            for row in rows:
+                yield row[0]
+
+    def items(self):
+        name, mapper = self.name, self.mapper
+        for rows in self.chunks():
+            for row in rows:
+                yield row[0], from_row(name, row[0], mapper(tuple('' if value is None else value
+                                                                  for value in row[1:])))
+
+
+class MappedSnapshot:
+    """class representing a snapshot file mapped into memory, records are decoded one at a time on request"""
+    def __init__(self, path, name):
+        self.name = name
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, column_count, self.count, self.records_offset, self.index_offset, self.heap_offset,
+         description_offset, description_length) = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        if version > VERSION:
+            raise ValueError(f"{path} was written by a newer version (format {version})")
+        start = self.heap_offset + description_offset
+        description = json.loads(self.map[start:start + description_length])
+        if description['collection'] != name:
+            raise ValueError(f"{path} holds {description['collection']}, not {name}")
+        self.record = struct.Struct('<' + 'BII' * (column_count + 1))
+        self.mapper = column_mapper(name, description['columns'])  # Files from older versions may lack columns
+
+    def value(self, kind, offset, length):
+        start = self.heap_offset + offset
+        return decode_value(kind, self.map[start:start + length])
+
+    def fields(self, number):
+        return self.record.unpack_from(self.map, self.records_offset + number * self.record.size)
+
+    def key_at(self, number):
+        kind, offset, length = FIELD.unpack_from(self.map, self.records_offset + number * self.record.size)
+        return self.value(kind, offset, length)
+
+    def record_at(self, number):
+        fields = self.fields(number)
+        values = [self.value(*fields[i:i + 3]) for i in range(0, len(fields), 3)]
+        row = tuple('' if value is None else value for value in values[1:])
+        return values[0], from_row(self.name, values[0], self.mapper(row))
+
+    def find(self, key):
+        # Record number of key by binary search over the index, or -1
+        target = sort_key(key)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            number = INDEX.unpack_from(self.map, self.index_offset + middle * INDEX.size)[0]
+            current = sort_key(self.key_at(number))
+            if current < target:
+                low = middle + 1
+            elif current > target:
+                high = middle
+            else:
+                return number
+        return -1
+
+    def keys(self):
+        for number in range(self.count):
+            yield self.key_at(number)
+
+    def items(self):
+        for number in range(self.count):
+            yield self.record_at(number)
+
+
+class MappedCollection(MutableMapping):
+    """class representing a collection read from a mapped snapshot, with the changes made since kept in memory"""
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.records = {}  # Key -> record, for records used or changed since the snapshot was opened
+        self.deleted = set()  # Keys of snapshot records that were removed
+        self.added = {}  # Keys that are not in the snapshot, in the order they were added
+
+    def in_snapshot(self, key):
+        return key not in self.deleted and self.snapshot.find(key) >= 0
+
+    def __getitem__(self, key):
+        record = self.records.get(key)
+        if record is not None:
+            return record
+        number = self.snapshot.find(key) if key not in self.deleted else -1
+        if number < 0:
+            raise KeyError(key)
+        key, record = self.snapshot.record_at(number)
+        self.records[key] = record  # Kept, so changes made to it in place are not lost
+        return record
+
+    def __setitem__(self, key, record):
+        if key not in self.records and key not in self.added and not self.in_snapshot(key):
+            if key in self.deleted:
+                self.deleted.discard(key)
+            else:
+                self.added[key] = None
+        self.records[key] = record
+
+    def __delitem__(self, key):
+        if key in self.added:
+            del self.added[key]
+        elif self.in_snapshot(key):
+            self.deleted.add(key)
+        else:
+            raise KeyError(key)
+        self.records.pop(key, None)
+
+    def __contains__(self, key):
+        return key in self.records or key in self.added or self.in_snapshot(key)
+
+    def __iter__(self):
+        deleted = self.deleted
+        for key in self.snapshot.keys():
+            if key not in deleted:
+                yield key
+        yield from list(self.added)
+
+    def __len__(self):
+        return self.snapshot.count - len(self.deleted) + len(self.added)
+
+    def items(self):
+        # Decode the snapshot records in order without keeping them, then the added ones
+        records = self.records
+        deleted = self.deleted
+        for number in range(self.snapshot.count):
+            key = self.snapshot.key_at(number)
+            if key in deleted:
+                continue
+            record = records.get(key)
+            yield (key, record) if record is not None else self.snapshot.record_at(number)
+        for key in list(self.added):
+            yield key, records[key]
+
+    def values(self):
+        for key, record in self.items():
+            yield record
+
+    def copy(self):
+        # Same snapshot with a copy of the changes, e.g. for writing a new snapshot on another thread
+        collection = MappedCollection(self.snapshot)
+        collection.records = dict(self.records)
+        collection.deleted = set(self.deleted)
+        collection.added = dict(self.added)
+        return collection
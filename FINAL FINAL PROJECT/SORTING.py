@@ -0,0 +1,159 @@
+from bisect import bisect_left, insort
+from collections.abc import Sequence
+from enum import Enum
+from OBSERVABLE import Follower
+from COLUMNAR import parse_cost
+
+# Fields each list can be sorted and filtered by, compared as numbers or as lowercase text
+SORT_FIELDS = {
+    'employees': {'name': 'text', 'department': 'text', 'job_title': 'text', 'salary': 'number'},
+    'clients': {'name': 'text', 'budget': 'number'},
+    'suppliers': {'name': 'text', 'event_type': 'text', 'min_guests': 'number', 'max_guests': 'number'},
+    'guests': {'name': 'text', 'email': 'text', 'total_cost': 'number', 'event_type': 'text'},
+    'venues': {'name': 'text', 'min_guests': 'number', 'max_guests': 'number'},
+    'events': {'event_type': 'text', 'date': 'text', 'client': 'text', 'venue': 'text'},
+}
+
+
+def field_text(value):
+    # Enum members by name, lists of them joined, anything else as typed
+    if isinstance(value, (list, tuple)):
+        return ', '.join(field_text(item) for item in value)
+    if isinstance(value, Enum):
+        return value.name
+    return '' if value is None else str(value)
+
+
+def sort_value(field, kind):
+    # Function returning what a record is sorted by, None for a number that cannot be read
+    if kind == 'number':
+        return lambda record: parse_cost(getattr(record, field, None))
+    return lambda record: field_text(getattr(record, field, None)).strip().lower()
+
+
+def parse_bound(kind, text):
+    # A filter bound as typed, in the form the index compares, None if left empty
+    text = str(text if text is not None else '').strip()
+    if not text:
+        return None
+    if kind == 'number':
+        value = parse_cost(text)
+        if value is None:
+            raise ValueError(f"{text!r} is not a number")
+        return value
+    return text.lower()
+
+
+def key_order(key):
+    # Ties are broken by key, ints and strings kept apart so they always compare
+    return (0, key, '') if isinstance(key, int) else (1, 0, str(key))
+
+
+class SortedIndex(Follower):
+    """class representing the keys of a collection kept sorted by one field, updated record by record"""
+    def __init__(self, value):
+        self.value = value  # Function returning the sort value of a record
+        self.order = []  # (sort value, key order, key) of every record, sorted, missing values first
+        self.entries = {}  # str(key) -> its entry in self.order
+        self.version = 0  # Changed on every update, views recompute their bounds after it changes
+
+    def entry(self, key, record):
+        value = self.value(record)
+        return (0,) if value is None else (1, value), key_order(key), key
+
+    def build(self, collection):
+        # Sort every record once, later changes are inserted with bisect
+        for key, record in collection.items():
+            self.entries[str(key)] = self.entry(key, record)
+        self.order = sorted(self.entries.values())
+        self.version += 1
+        return self
+
+    def add(self, key, record):
+        entry = self.entry(key, record)
+        self.entries[str(key)] = entry
+        insort(self.order, entry)
+        self.version += 1
+
+    def remove(self, key):
+        entry = self.entries.pop(str(key), None)
+        if entry is not None:
+            del self.order[bisect_left(self.order, entry)]
+            self.version += 1
+
+    def update(self, key, record):
+        if self.entries.get(str(key)) != self.entry(key, record):  # Most saves do not touch the sorted field
+            self.remove(key)
+            self.add(key, record)
+
+    def bounds(self, low=None, high=None):
+        # (start, end) in self.order of the values from low to high, both included. Records without a
+        # value are left out once either bound is given
+        if low is None and high is None:
+            return 0, len(self.order)
+        start = bisect_left(self.order, ((1,) if low is None else (1, low),))
+        end = len(self.order) if high is None else bisect_left(self.order, ((1, high), (2,)))
+        return start, max(start, end)
+
+    def view(self, low=None, high=None, descending=False):
+        return SortedView(self, low, high, descending)
+
+
+class SortedView(Sequence):
+    """class representing the keys of a SortedIndex between two values, in order, kept live as the index changes"""
+    def __init__(self, index, low=None, high=None, descending=False):
+        self.sorted_index = index
+        self.low = low
+        self.high = high
+        self.descending = descending
+        self.version = None  # Version of the index the bounds below were computed for
+        self.start = self.end = 0
+
+    def bounds(self):
+        if self.version != self.sorted_index.version:
+            self.start, self.end = self.sorted_index.bounds(self.low, self.high)
+            self.version = self.sorted_index.version
+        return self.start, self.end
+
+    def __len__(self):
+        start, end = self.bounds()
+        return end - start
+
+    def __getitem__(self, item):
+        # A key by position, or a list of keys for a slice, only the entries asked for are read
+        start, end = self.bounds()
+        order = self.sorted_index.order
+        if isinstance(item, slice):
+            first, last, step = item.indices(end - start)
+            if step != 1:
+                return [self[number] for number in range(first, last, step)]
+            if last <= first:
+                return []
+            if self.descending:
+                return [entry[2] for entry in reversed(order[end - last:end - first])]
+            return [entry[2] for entry in order[start + first:start + last]]
+        if item < 0:
+            item += end - start
+        if not 0 <= item < end - start:
+            raise IndexError(item)
+        return order[end - 1 - item][2] if self.descending else order[start + item][2]
+
+    def index(self, key, *args):
+        # Position of a key in the view, found by bisect
+        entry = self.sorted_index.entries.get(str(key))
+        start, end = self.bounds()
+        position = bisect_left(self.sorted_index.order, entry) if entry is not None else -1
+        if not start <= position < end:
+            raise ValueError(f"{key!r} is not in the view")
+        return end - 1 - position if self.descending else position - start
+
+    def __contains__(self, key):
+        try:
+            self.index(key)
+        except ValueError:
+            return False
+        return True
+
+    def __iter__(self):
+        for number in range(len(self)):
+            yield self[number]
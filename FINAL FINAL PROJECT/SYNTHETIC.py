@@ -0,0 +1,206 @@
+"""Seeded synthetic data at production scale, for benchmarks and for trying the app with a full company.
+
+Run from the project folder, for example:
+    python -m SYNTHETIC 100k --data ../synthetic-100k
+    python -m SYNTHETIC 1m --data ../synthetic-1m --seed 7 --storage sqlite
+    python -m SYNTHETIC 100k --data ../synthetic-zlib --compression guests=zlib,clients=lzma
+The size is the number of guests, the other collections are scaled from it. The same size and seed
+always give the same records.
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import date, timedelta
+from ENUMS import EventType, ServiceType
+from CLASSES import Employee, Client, Supplier, Guest, Event, Venue
+from COLUMNAR import GuestTable
+from COMPRESSION import codec_for
+from PRICING import pricing
+from REPOSITORY import open_repository
+from SNAPSHOT import write_snapshot
+
+SIZES = {'1k': 1000, '100k': 100000, '1m': 1000000}
+
+FIRST_NAMES = ("Aisha", "Omar", "Fatima", "Ahmed", "Mariam", "Khalid", "Noura", "Yousef", "Sara", "Hamdan",
+               "Layla", "Rashid", "Hessa", "Saeed", "Maitha", "Ali", "Shamma", "Sultan", "Reem", "Majid",
+               "Priya", "Arjun", "Maria", "John", "Elena", "David", "Chen", "Anna", "Lucas", "Amal")
+LAST_NAMES = ("Al Mansoori", "Al Hashemi", "Al Nuaimi", "Al Ketbi", "Al Falasi", "Al Mazrouei", "Al Suwaidi",
+              "Al Shamsi", "Al Dhaheri", "Al Marzooqi", "Khan", "Sharma", "Fernandes", "Smith", "Garcia",
+              "Nguyen", "Haddad", "Saleh", "Rahman", "Kowalski")
+CITIES = ("Abu Dhabi", "Dubai", "Sharjah", "Al Ain", "Ajman", "Ras Al Khaimah", "Fujairah")
+STREETS = ("Corniche Road", "Sheikh Zayed Road", "Hamdan Street", "Electra Street", "Al Wahda Street",
+           "Khalifa Street", "Airport Road", "Muroor Road")
+DEPARTMENTS = {  # Department -> (job titles, lowest salary, highest salary)
+    "Events": (("Event Planner", "Coordinator", "Event Manager"), 6000, 22000),
+    "Sales": (("Sales Executive", "Account Manager"), 5000, 20000),
+    "Catering": (("Chef", "Kitchen Assistant", "Catering Manager"), 3500, 18000),
+    "Logistics": (("Driver", "Logistics Officer"), 3000, 12000),
+    "Finance": (("Accountant", "Finance Manager"), 7000, 25000),
+    "HR": (("HR Officer", "Recruiter"), 6000, 16000),
+}
+SUPPLIER_KINDS = ("Catering", "Decor", "Sound & Light", "Furniture Rental", "Cleaning", "Photography", "Flowers")
+VENUE_KINDS = ("Hall", "Ballroom", "Garden", "Beach Club", "Terrace", "Pavilion")
+FIRST_DAY = date(2025, 1, 1)
+DAYS = 3 * 365  # Events are spread over three years
+
+
+def scaled(guests):
+    # Number of records of every collection for a number of guests
+    return {'employees': max(10, guests // 200), 'clients': max(10, guests // 100),
+            'suppliers': max(10, guests // 100), 'venues': max(5, guests // 2000),
+            'events': max(10, guests // 50), 'guests': guests}
+
+
+def parse_size(text):
+    # "1k", "100k", "1m" or a plain number of guests
+    text = str(text).strip().lower()
+    return SIZES[text] if text in SIZES else int(text)
+
+
+class Generator:
+    """class representing a seeded source of realistic records, the same seed gives the same records"""
+    def __init__(self, seed=1):
+        self.random = random.Random(seed)
+
+    def person(self):
+        return f"{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}"
+
+    def address(self):
+        return f"{self.random.randint(1, 400)} {self.random.choice(STREETS)}, {self.random.choice(CITIES)}"
+
+    def phone(self):
+        return f"05{self.random.choice('02468')}{self.random.randint(0, 9999999):07d}"
+
+    def employees(self, count):
+        departments = list(DEPARTMENTS)
+        records = {}
+        for key in range(1, count + 1):
+            department = self.random.choice(departments)
+            titles, low, high = DEPARTMENTS[department]
+            records[key] = Employee(key, self.person(), self.address(), self.phone(), department,
+                                    self.random.choice(titles), str(self.random.randrange(low, high, 250)))
+        return records
+
+    def clients(self, count):
+        event_types = list(EventType)
+        records = {}
+        for key in range(1, count + 1):
+            client = Client(key, f"{self.person()} {key}", self.address(), self.phone(),
+                            float(self.random.randrange(5000, 250000, 500)))
+            client.events = self.random.sample(event_types, self.random.choice((1, 1, 1, 2)))
+            records[key] = client
+        return records
+
+    def suppliers(self, count):
+        event_types = list(EventType)
+        records = {}
+        for key in range(1, count + 1):
+            low = self.random.choice((10, 20, 50, 100, 150, 200))
+            records[key] = Supplier(key, f"{self.random.choice(LAST_NAMES)} {self.random.choice(SUPPLIER_KINDS)} {key}",
+                                    self.address(), self.phone(),
+                                    self.random.sample(event_types, self.random.randint(1, len(event_types))),
+                                    low, low + self.random.randrange(50, 1000, 50))
+        return records
+
+    def venues(self, count):
+        records = {}
+        for number in range(1, count + 1):
+            key = str(number)
+            low = self.random.choice((10, 25, 50, 100))
+            records[key] = Venue(key, f"{self.random.choice(CITIES)} {self.random.choice(VENUE_KINDS)} {number}",
+                                 self.address(), self.phone(), low, low + self.random.randrange(100, 1500, 50))
+        return records
+
+    def events(self, count, clients, venues):
+        # Events of existing clients at existing venues, never two on the same day at one venue
+        client_list = list(clients.values())
+        venue_ids = list(venues)
+        booked = {venue_id: set() for venue_id in venue_ids}
+        records = {}
+        for number in range(1, count + 1):
+            key = str(number)
+            client = self.random.choice(client_list)
+            while True:
+                venue_id = self.random.choice(venue_ids)
+                day = self.random.randrange(DAYS)
+                if day not in booked[venue_id]:
+                    booked[venue_id].add(day)
+                    break
+            records[key] = Event(key, self.random.choice(client.events), (FIRST_DAY + timedelta(days=day)).isoformat(),
+                                 client.name, venue_id)
+        return records
+
+    def guests(self, count):
+        # Four guests in five have a quote priced like the app prices it, in a GuestTable to keep 1M small
+        labels = [event_type.name.replace('_', ' ').title() for event_type in EventType]
+        services = [service.value for service in ServiceType]
+        table = GuestTable()
+        for number in range(1, count + 1):
+            key = str(number)
+            first, last = self.random.choice(FIRST_NAMES), self.random.choice(LAST_NAMES)
+            email = f"{first.lower()}.{last.lower().replace(' ', '')}{number}@mail.com"
+            if self.random.random() < 0.8:
+                label = self.random.choice(labels)
+                chosen = [service for service in services if self.random.random() < 0.3]
+                table[key] = Guest(key, f"{first} {last}", email, self.phone(), str(pricing.price(label, chosen)),
+                                   label, chosen)
+            else:
+                table[key] = Guest(key, f"{first} {last}", email, self.phone(), "0")
+        return table
+
+    def collections(self, guests):
+        # Every collection for a number of guests, {name: {key: record}}
+        sizes = scaled(guests)
+        clients = self.clients(sizes['clients'])
+        venues = self.venues(sizes['venues'])
+        return {'employees': self.employees(sizes['employees']), 'clients': clients,
+                'suppliers': self.suppliers(sizes['suppliers']), 'venues': venues,
+                'events': self.events(sizes['events'], clients, venues), 'guests': self.guests(guests)}
+
+
+def generate(guests, seed=1):
+    return Generator(seed).collections(guests)
+
+
+def write_data(directory, collections, backend=None, compression=None):
+    # Save generated collections into an empty data folder, as snapshots (compressed as chosen by
+    # compression or EVENTS_COMPRESSION) or into the SQLite database
+    backend = backend or os.environ.get('EVENTS_STORAGE', 'journal')
+    os.makedirs(directory, exist_ok=True)
+    if os.listdir(directory):
+        raise ValueError(f"{directory} is not empty, generated data only goes into a new folder")
+    if backend == 'journal':
+        for name, data in collections.items():
+            write_snapshot(os.path.join(directory, f'{name}.snap'), name, data, codec_for(name, compression))
+        return
+    store = open_repository(directory, backend)
+    try:
+        for name, data in collections.items():
+            store.put_many(name, data.items())
+    finally:
+        store.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m SYNTHETIC', description="Write seeded synthetic event data")
+    parser.add_argument('size', help="number of guests: 1k, 100k, 1m or a number")
+    parser.add_argument('--data', required=True, help="new folder to write the data files into")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--storage', choices=('journal', 'sqlite'), help="storage backend (default: EVENTS_STORAGE)")
+    parser.add_argument('--compression', help="snapshot codec, e.g. zlib or guests=lzma,clients=zlib "
+                                              "(default: EVENTS_COMPRESSION)")
+    args = parser.parse_args(argv)
+    try:
+        collections = generate(parse_size(args.size), args.seed)
+        write_data(args.data, collections, args.storage, args.compression)
+    except (ValueError, OSError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    for name, data in collections.items():
+        print(f"{name}: {len(data)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskCancelled(Exception):
+    """class representing the exception that stops a task once it has been cancelled"""
+
+
+class Task:
+    """class representing one piece of background work, its progress and whether it was cancelled"""
+    def __init__(self, label):
+        self.label = label  # Shown next to the progress bar, e.g. "Loading guests", None for work not shown
+        self.progress = None  # (done, total) as last reported by the work, total may be None
+        self.cancelled = threading.Event()
+        self.future = None
+
+    def report(self, done, total=None):
+        # Called by the work from its thread, also the point where a cancelled task stops
+        self.progress = (done, total)
+        self.check()
+
+    def check(self):
+        if self.cancelled.is_set():
+            raise TaskCancelled(self.label)
+
+    def cancel(self):
+        # Work that has not started is dropped, work that has stops at its next report and its result is ignored
+        self.cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class TaskQueue:
+    """class representing a thread pool whose results are handed back to the Tk thread with after()"""
+    def __init__(self, widget, workers=2, poll=50):
+        self.widget = widget  # Any Tk widget, its after() runs the callbacks on the Tk thread
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='events-task')
+        self.poll = poll  # Milliseconds between checks of the running tasks
+        self.running = []  # [task, on_done, on_error, on_cancel] of every task not finished yet
+        self.listeners = []  # Functions called with the running tasks on every check, e.g. a status bar
+        self.polling = False
+
+    def submit(self, label, work, on_done=None, on_error=None, on_cancel=None):
+        # Run work(task) on the pool, then on_done(result) or on_error(exception) on the Tk thread, or
+        # on_cancel() if the task was cancelled. Tk widgets must only be used in the callbacks, never in work
+        task = Task(label)
+        task.future = self.executor.submit(work, task)
+        self.running.append([task, on_done, on_error, on_cancel])
+        if not self.polling:
+            self.polling = True
+            self.widget.after(self.poll, self.check)
+        return task
+
+    def check(self):
+        finished = []
+        running = []
+        for entry in self.running:
+            (finished if entry[0].future.done() else running).append(entry)
+        self.running = running
+        for task, on_done, on_error, on_cancel in finished:
+            if task.cancelled.is_set():
+                self.run_callback(on_cancel)
+                continue
+            error = task.future.exception()
+            if error is None:
+                self.run_callback(on_done, task.future.result())
+            elif isinstance(error, TaskCancelled):
+                continue
+            elif on_error is not None:
+                self.run_callback(on_error, error)
+            else:
+                self.report(error)
+        for listener in self.listeners:
+            self.run_callback(listener, [entry[0] for entry in self.running])
+        self.polling = bool(self.running)
+        if self.polling:
+            self.widget.after(self.poll, self.check)
+
+    def run_callback(self, callback, *args):
+        # A failing callback is reported by Tk, the other finished tasks and the next check still run
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as error:
+            self.report(error)
+
+    def report(self, error):
+        # Show an error the way Tk shows one raised by any callback
+        self.widget._root().report_callback_exception(type(error), error, error.__traceback__)
+
+    def cancel_all(self):
+        for task, on_done, on_error, on_cancel in self.running:
+            task.cancel()
+
+    def shutdown(self):
+        # Cancel everything, work already running finishes on its own and its result is dropped
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,183 @@
+import csv
+import json
+import os
+from ENUMS import EventType
+from OBSERVABLE import BULK
+from REPOSITORY import COLUMNS, to_row, from_row
+from PRICING import to_event_type, to_service_type
+from SCHEDULE import parse_date
+
+# Type of the ID of each collection, IDs read from files are converted to it
+KEY_TYPES = {'employees': int, 'clients': int, 'suppliers': int, 'guests': str, 'venues': str, 'events': str}
+
+
+def headers(name):
+    return ('id',) + COLUMNS[name]
+
+
+def split_list(value):
+    # Lists are written as comma separated text in CSV, JSON files may hold real lists
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value or '').split(',') if item.strip()]
+
+
+def read_json_array(f, chunk_size=65536):
+    # Yield the objects of a JSON array one at a time without reading the whole file
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    while True:
+        chunk = f.read(chunk_size)
+        buffer += chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if not started and position < len(buffer):
+                if buffer[position] != '[':
+                    raise ValueError("A JSON import file must hold a list of records")
+                started = True
+                position += 1
+                continue
+            if position < len(buffer) and buffer[position] == ']':
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                if not chunk:
+                    if buffer[position:].strip():
+                        raise ValueError("The JSON import file ends in the middle of a record")
+                    return
+                break  # The record continues in the next chunk
+            yield record
+            position = end
+        buffer = buffer[position:]
+        if not chunk:
+            return
+
+
+def read_rows(path):
+    # Yield one dictionary per record of a .csv or .json file
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith('.json'):
+            yield from read_json_array(f)
+        else:
+            yield from csv.DictReader(f)
+
+
+def validate(name, row):
+    # Check one record read from a file, returns the column tuple used by from_row or raises ValueError
+    values = {column: row.get(column, '') for column in COLUMNS[name]}
+    values = {column: '' if value is None else value for column, value in values.items()}
+    if 'name' in values and not str(values['name']).strip():
+        raise ValueError("name is required")
+    if name == 'employees':
+        float(values['salary'])  # Salary is kept as typed but has to be a number
+    elif name == 'clients':
+        values['budget'] = float(values['budget'])
+        values['events'] = ','.join(check_event_type(event) for event in split_list(values['events']))
+    elif name in ('suppliers', 'venues'):
+        values['min_guests'] = int(values['min_guests'])
+        values['max_guests'] = int(values['max_guests'])
+        if values['min_guests'] > values['max_guests']:
+            raise ValueError("min_guests is larger than max_guests")
+        if name == 'suppliers':
+            event_types = [check_event_type(event) for event in split_list(values['event_types'])]
+            if not event_types:
+                raise ValueError("at least one event type is required")
+            values['event_types'] = ','.join(event_types)
+    elif name == 'guests':
+        values['total_cost'] = str(values['total_cost'] or '0')
+        if values['event_type']:
+            if to_event_type(values['event_type']) is None:
+                raise ValueError(f"unknown event type {values['event_type']!r}")
+            for service in split_list(values['services']):
+                if to_service_type(service) is None:
+                    raise ValueError(f"unknown service {service!r}")
+        values['services'] = ','.join(split_list(values['services']))
+    elif name == 'events':
+        values['event_type'] = check_event_type(values['event_type'])
+        if parse_date(values['date']) is None:
+            raise ValueError(f"date {values['date']!r} is not YYYY-MM-DD")
+    return tuple(values[column] for column in COLUMNS[name])
+
+
+def check_event_type(value):
+    event_type = to_event_type(value)
+    if event_type is None:
+        raise ValueError(f"unknown event type {value!r}, expected one of {', '.join(EventType.__members__)}")
+    return event_type.name
+
+
+def import_file(path, name, collection, store, next_ids, chunk_size=1000):
+    # Read a file in chunks, add each valid chunk to the collection in one go, then tell the collection's
+    # listeners and save everything once at the end. next_ids(count) reserves IDs for the rows of a chunk
+    # without one. Returns (number imported, [(row number, error), ...])
+    key_type = KEY_TYPES[name]
+    imported = []
+    errors = []
+    batch = []  # (key or None, column values) of the valid rows of the chunk being read
+
+    def add_batch():
+        missing = sum(1 for key, values in batch if key is None)
+        keys = iter(next_ids(missing) if missing else ())
+        records = []
+        for key, values in batch:
+            key = next(keys) if key is None else key
+            records.append((key, from_row(name, key, values)))
+        collection.update_many(records, notify=False)
+        imported.extend(key for key, record in records)
+        batch.clear()
+
+    for number, row in enumerate(read_rows(path), start=1):
+        try:
+            values = validate(name, row)
+            key = str(row.get('id') or '').strip()
+            key = key_type(key) if key else None
+        except (ValueError, KeyError, TypeError) as error:
+            errors.append((number, str(error)))
+            continue
+        batch.append((key, values))
+        if len(batch) >= chunk_size:
+            add_batch()
+    if batch:
+        add_batch()
+    if imported:
+        collection.notify(BULK, imported)  # One redraw of the lists showing the collection, not one per chunk
+    store.put_many(name, ((key, collection[key]) for key in imported))
+    return len(imported), errors
+
+
+def export_file(path, name, collection, progress=None):
+    # Write every record of a collection to a .csv or .json file one row at a time,
+    # calling progress(written, total) every 1000 rows
+    columns = headers(name)
+    total = len(collection)
+    count = 0
+    temp_path = path + '.tmp'
+    try:
+        with open(temp_path, 'w', newline='', encoding='utf-8') as f:
+            if path.lower().endswith('.json'):
+                f.write('[')
+                for key, record in collection.items():
+                    f.write(',\n' if count else '\n')
+                    f.write(json.dumps(dict(zip(columns, (key,) + to_row(name, record)))))
+                    count += 1
+                    if progress is not None and count % 1000 == 0:
+                        progress(count, total)
+                f.write('\n]\n')
+            else:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                for key, record in collection.items():
+                    writer.writerow((key,) + to_row(name, record))
+                    count += 1
+                    if progress is not None and count % 1000 == 0:
+                        progress(count, total)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)  # Failed or cancelled, the old file at path is left alone
+        raise
+    return count
@@ -0,0 +1,447 @@
+import tkinter as tk
+from tkinter import ttk
+from OBSERVABLE import ADDED, UPDATED, REMOVED, BULK
+
+
+class VirtualTreeview(ttk.Treeview):
+    """class representing a Treeview that only creates rows for the part of the list on screen"""
+    def __init__(self, master, row=None, buffer=20, **kwargs):
+        super().__init__(master, **kwargs)
+        self.row = row  # Function returning the insert options (values, text) for a key
+        self.buffer = buffer  # Extra rows kept below the visible ones
+        self.keys = []  # Every key in display order, only a window of them exists as Treeview items
+        self.key_set = set()  # str(key) of every key in self.keys
+        self.positions = None  # str(key) -> index in self.keys, rebuilt when needed after a removal
+        self.offset = 0  # Index of the first materialized key
+        self.collection = None  # ObservableDict whose changes are applied to the rows
+        self.hidden = None  # str(key) -> key changed while the screen is hidden, None while it is shown
+        self.listing = None  # str(key) -> key changed while the keys are listed on another thread, see list_collection
+        self.order = None  # Live SortedView shown instead of the collection's own order, None when unsorted
+        self.sorted_by = None  # (column, descending) of the heading the rows are sorted by
+        self.stale = {}  # str(key) -> key of sorted rows changed since the window was last drawn
+        self.titles = {}  # column -> heading text without the sort mark
+        self.scrollbar = ttk.Scrollbar(master, orient=tk.VERTICAL, command=self.on_scroll)
+        self.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        self.bind("<Button-5>", lambda event: self.scroll_rows(3))
+        self.bind("<Down>", self.on_key_down)
+        self.bind("<Up>", self.on_key_up)
+        self.bind("<Configure>", lambda event: self.refresh())
+        self.bind("<Destroy>", lambda event: self.show_collection(None), add='+')
+
+    def set_rows(self, keys, row=None):
+        # Show a new list of keys, replacing the previous one
+        if row is not None:
+            self.row = row
+        self.order = None
+        if self.sorted_by is not None:
+            self.sorted_by = None
+            self.mark_headings()
+        self.keys = list(keys)
+        self.key_set = {str(key) for key in self.keys}
+        self.positions = None
+        self.offset = min(self.offset, max(len(self.keys) - 1, 0))
+        super().delete(*super().get_children())
+        self.refresh()
+
+    def show_collection(self, collection, row=None, keys=None):
+        # Show the keys of an ObservableDict and keep the rows in step with its changes
+        self.follow(collection, row)
+        if collection is not None:
+            self.set_rows(collection.keys() if keys is None else keys)
+
+    def follow(self, collection, row=None):
+        if self.collection is not None:
+            self.collection.unsubscribe(self.apply_change)
+        self.collection = collection
+        self.listing = None
+        if row is not None:
+            self.row = row
+        if collection is not None:
+            collection.subscribe(self.apply_change)
+
+    def list_collection(self, collection, row=None):
+        # Follow a collection whose keys are being listed on another thread, from a copy taken after this.
+        # The changes made meanwhile are noted and applied by show_listed once the keys arrive
+        self.follow(collection, row)
+        self.listing = {}
+
+    def show_listed(self, keys):
+        changed, self.listing = self.listing, None
+        self.set_rows(keys)
+        if changed:
+            self.catch_up(changed)
+
+    def show_order(self, view, sorted_by=None):
+        # Show the keys of a live SortedView, e.g. the collection sorted by a column. Nothing is copied:
+        # only the rows of the window are read from the view, and the sorted index keeps it in order
+        self.order = view
+        self.sorted_by = sorted_by
+        self.keys = view
+        self.key_set = view  # Answers "in" by bisect, like a set of the keys
+        self.positions = None
+        self.stale = {}
+        self.offset = 0
+        super().delete(*super().get_children())
+        self.mark_headings()
+        self.refresh()
+
+    def mark_headings(self):
+        # ▲ or ▼ after the title of the column the rows are sorted by
+        column, descending = self.sorted_by or (None, False)
+        for each_column in set(self.titles) | {column} - {None}:
+            title = self.titles.setdefault(each_column, self.heading(each_column, 'text'))
+            mark = (' ▼' if descending else ' ▲') if each_column == column else ''
+            self.heading(each_column, text=title + mark)
+
+    def redraw(self):
+        # Redraw the window of a sorted list once after a batch of changes, the index has placed them by now
+        stale, self.stale = self.stale, {}
+        if self.order is None:
+            return
+        for key in stale.values():
+            if super().exists(key) and key in self.collection:
+                super().item(key, **self.row(key))
+        self.offset = max(0, min(self.offset, len(self.keys) - 1))
+        self.refresh()
+
+    def pause(self):
+        # The screen was hidden: note which keys change instead of updating rows nobody sees
+        if self.hidden is None:
+            self.hidden = {}
+
+    def resume(self):
+        # The screen is shown again: bring only the rows of the keys that changed up to date
+        changed, self.hidden = self.hidden, None
+        if changed and self.collection is not None:
+            self.catch_up(changed)
+
+    def catch_up(self, changed):
+        # Bring the rows of the changed {str(key): key} up to date with the collection
+        if self.order is not None:
+            self.stale.update(changed)
+            self.redraw()
+            return
+        added = []
+        for key in changed.values():
+            if key not in self.collection:
+                self.remove_key(key)
+            elif str(key) not in self.key_set:
+                added.append(key)
+            elif super().exists(key):
+                super().item(key, **self.row(key))
+        if added:
+            self.add_keys(added)
+
+    def apply_change(self, change, key):
+        # Apply one added/updated/removed change with a single item operation
+        noted = self.listing if self.listing is not None else self.hidden
+        if noted is not None:
+            for each_key in (key if change == BULK else (key,)):
+                noted[str(each_key)] = each_key
+            return
+        if self.order is not None:
+            self.mark_stale(key if change == BULK else (key,))
+            return
+        if change == REMOVED:
+            self.remove_key(key)
+        elif change == BULK:
+            self.add_keys(key)
+        elif str(key) not in self.key_set:
+            self.key_set.add(str(key))
+            self.keys.append(key)
+            if self.positions is not None:
+                self.positions[str(key)] = len(self.keys) - 1
+            if len(self.keys) <= self.offset + self.window_size():
+                super().insert('', len(self.keys) - 1 - self.offset, iid=key, **self.row(key))
+            self.update_scrollbar()
+        elif change == UPDATED and super().exists(key):
+            super().item(key, **self.row(key))
+
+    def mark_stale(self, keys):
+        # The sorted index may hear about a change after this list does, so redraw once it is idle
+        if not self.stale:
+            self.after_idle(self.redraw)
+        for key in keys:
+            self.stale[str(key)] = key
+
+    def add_keys(self, keys):
+        # Many keys added or updated at once: append the new ones and redraw the window once
+        if self.order is not None:
+            self.mark_stale(keys)  # The sorted view places them, there is no list of keys to append to
+            return
+        for key in keys:
+            if str(key) not in self.key_set:
+                self.key_set.add(str(key))
+                self.keys.append(key)
+            elif super().exists(key):
+                super().item(key, **self.row(key))
+        self.positions = None
+        self.refresh()
+
+    def remove_key(self, key):
+        if self.order is not None:
+            self.mark_stale((key,))  # The sorted view drops the key itself, only the window needs redrawing
+            return
+        if str(key) not in self.key_set:
+            return
+        self.key_set.discard(str(key))
+        if self.positions is not None:
+            index = self.positions[str(key)]
+        else:
+            index = next(i for i, k in enumerate(self.keys) if str(k) == str(key))
+        self.keys.pop(index)
+        self.positions = None
+        if index < self.offset:
+            self.offset -= 1
+        if super().exists(key):
+            super().delete(key)
+            self.refresh()  # Brings the next row up into the window
+        else:
+            self.update_scrollbar()
+
+    def position(self, key):
+        if self.order is not None:
+            return self.order.index(key) if key in self.order else None
+        if self.positions is None:
+            self.positions = {str(k): index for index, k in enumerate(self.keys)}
+        return self.positions.get(str(key))
+
+    def window_size(self):
+        # Rows that fit on screen, plus the buffer
+        visible = max(int(self.cget('height')), self.winfo_height() // 20)
+        return visible + self.buffer
+
+    def refresh(self):
+        # Make the Treeview items match the keys in the current window
+        window = self.keys[self.offset:self.offset + self.window_size()]
+        wanted = [str(key) for key in window]
+        wanted_set = set(wanted)
+        existing = super().get_children()
+        stale = [item for item in existing if item not in wanted_set]
+        if stale:
+            super().delete(*stale)
+        existing = set(existing)
+        for index, key in enumerate(window):
+            if wanted[index] not in existing:
+                super().insert('', index, iid=key, **self.row(key))
+            elif self.order is not None:
+                super().move(key, '', index)  # Sorted rows may have changed places
+        super().yview_moveto(0)
+        self.update_scrollbar()
+
+    def update_scrollbar(self):
+        total = len(self.keys)
+        if total == 0:
+            self.scrollbar.set(0, 1)
+            return
+        visible = self.window_size() - self.buffer
+        self.scrollbar.set(self.offset / total, min(self.offset + visible, total) / total)
+
+    def scroll_to(self, offset):
+        visible = self.window_size() - self.buffer
+        offset = max(0, min(offset, len(self.keys) - visible))
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    def scroll_rows(self, rows):
+        self.scroll_to(self.offset + rows)
+        return "break"
+
+    def on_scroll(self, *args):
+        # Called by the scrollbar with ('moveto', fraction) or ('scroll', count, 'units'/'pages')
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * len(self.keys)))
+        elif args[0] == 'scroll':
+            count = int(args[1])
+            if args[2] == 'pages':
+                count *= self.window_size() - self.buffer
+            self.scroll_rows(count)
+
+    def on_mouse_wheel(self, event):
+        return self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def on_key_down(self, event):
+        # Move the window when the keyboard focus reaches the last visible row
+        children = super().get_children()
+        visible = self.window_size() - self.buffer
+        if children and self.focus() in children[visible - 1:visible]:
+            self.scroll_rows(1)
+
+    def on_key_up(self, event):
+        children = super().get_children()
+        if children and self.focus() == children[0] and self.offset > 0:
+            self.scroll_rows(-1)
+            first = super().get_children()[0]
+            self.focus(first)
+            self.selection_set(first)
+            return "break"
+
+    def reveal(self, item):
+        # Scroll so that a key outside the current window gets a Treeview item
+        position = self.position(item)
+        if position is not None and not super().exists(item):
+            self.scroll_to(position)
+
+    def see(self, item):
+        self.reveal(item)
+        super().see(item)
+
+    def selection_set(self, *items):
+        for item in items:
+            self.reveal(item)
+        super().selection_set(*items)
+
+    def focus(self, item=None):
+        if item is not None:
+            self.reveal(item)
+        return super().focus(item)
+
+    def item(self, item, option=None, **kw):
+        if not super().exists(item) and str(item) in self.key_set:
+            if kw:
+                return None  # Not on screen, the row is rebuilt from the data when it scrolls into view
+            self.reveal(item)
+        return super().item(item, option, **kw)
+
+    def insert(self, parent, index, iid=None, **kw):
+        # Add a key to the end of the list, its row is created if it falls in the window
+        if iid is None:
+            return super().insert(parent, index, **kw)
+        self.apply_change(ADDED, iid)
+        return str(iid)
+
+    def delete(self, *items):
+        # Remove keys from the list as well as their Treeview items
+        for item in items:
+            self.remove_key(item)
+
+
+class ScreenManager:
+    """class representing the screens of a window, each built once and then hidden and shown instead of rebuilt"""
+    def __init__(self, master, keep=(), **pack_options):
+        self.master = master
+        self.keep = keep  # Widget types of the window that stay when a screen is shown, e.g. the menu bar
+        self.pack_options = pack_options
+        self.screens = {}  # Screen name -> frame built for it
+        self.current = None  # Name of the screen on show
+
+    def show(self, name, build):
+        # Show a screen, calling build(frame) to fill its frame the first time, returns the frame
+        self.clear()
+        frame = self.screens.get(name)
+        if frame is None or not frame.winfo_exists():
+            frame = self.screens[name] = ttk.Frame(self.master)
+            build(frame)
+        else:
+            for table in self.tables(frame):
+                table.resume()
+        frame.pack(**self.pack_options)
+        self.current = name
+        return frame
+
+    def hide(self):
+        # Hide the screen on show, its tables only note what changes until it is shown again
+        frame = self.screens.get(self.current)
+        self.current = None
+        if frame is not None and frame.winfo_exists():
+            frame.pack_forget()
+            for table in self.tables(frame):
+                table.pause()
+
+    def clear(self):
+        # Hide the screen on show and destroy the other widgets of the window, e.g. a form
+        self.hide()
+        screens = {str(frame) for frame in self.screens.values()}
+        for widget in self.master.winfo_children():
+            if str(widget) not in screens and not isinstance(widget, self.keep):
+                widget.destroy()
+
+    def tables(self, widget):
+        # Every VirtualTreeview inside a widget
+        for child in widget.winfo_children():
+            if isinstance(child, VirtualTreeview):
+                yield child
+            yield from self.tables(child)
+
+
+class TaskStatusBar(ttk.Frame):
+    """class representing a status bar with the progress of the running background tasks and a Cancel button"""
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.tasks = []  # Tasks shown, cancelled together by the button
+        self.label = ttk.Label(self)
+        self.label.pack(side=tk.LEFT, padx=10)
+        self.progress = ttk.Progressbar(self, length=200)
+        self.progress.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10)
+        ttk.Button(self, text="Cancel", command=self.cancel).pack(side=tk.RIGHT, padx=10)
+
+    def show_tasks(self, tasks):
+        # Called by a TaskQueue with the running tasks, hides the bar once there are none.
+        # Tasks without a label, like the check for other copies' changes, are not shown
+        tasks = [task for task in tasks if task.label is not None and not task.cancelled.is_set()]
+        self.tasks = tasks
+        if not tasks:
+            self.progress.stop()
+            self.pack_forget()
+            return
+        if not self.winfo_ismapped():
+            self.pack(side=tk.BOTTOM, fill=tk.X, pady=5)
+        text = tasks[0].label + (f" (+{len(tasks) - 1} more)" if len(tasks) > 1 else "")
+        self.label.config(text=text + "...")
+        done, total = tasks[0].progress or (0, None)
+        if total:
+            self.progress.stop()
+            self.progress.config(mode='determinate', value=100 * done / total)
+        elif str(self.progress.cget('mode')) != 'indeterminate':
+            self.progress.config(mode='indeterminate')
+            self.progress.start(20)
+
+    def cancel(self):
+        for task in self.tasks:
+            task.cancel()
+        self.show_tasks([])
+
+
+class MetricsPanel(ttk.Frame):
+    """class representing a table of the recorded timings, refreshed every second while it is shown"""
+    COLUMNS = (('operation', "Operation", 110), ('collection', "Collection", 90), ('calls', "Calls", 60),
+               ('records', "Records", 80), ('errors', "Errors", 60), ('mean_ms', "Mean ms", 80),
+               ('p50_ms', "p50 ms", 70), ('p95_ms', "p95 ms", 70), ('max_ms', "Max ms", 80))
+
+    def __init__(self, master, metrics, save=None, refresh=1000, **kwargs):
+        super().__init__(master, **kwargs)
+        self.metrics = metrics
+        self.refresh = refresh  # Milliseconds between updates of the table
+        self.enabled = tk.BooleanVar(value=metrics.enabled)
+        buttons = ttk.Frame(self)
+        buttons.pack(side=tk.BOTTOM, fill=tk.X, pady=5)
+        ttk.Checkbutton(buttons, text="Record timings", variable=self.enabled,
+                        command=self.toggle).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Reset", command=self.reset).pack(side=tk.RIGHT, padx=5)
+        if save is not None:
+            ttk.Button(buttons, text="Save...", command=save).pack(side=tk.RIGHT, padx=5)
+        self.table = ttk.Treeview(self, columns=[column for column, heading, width in self.COLUMNS], show='headings')
+        for column, heading, width in self.COLUMNS:
+            self.table.heading(column, text=heading)
+            self.table.column(column, width=width, anchor=tk.W if column in ('operation', 'collection') else tk.E)
+        self.table.pack(fill=tk.BOTH, expand=True)
+        self.update_table()
+
+    def toggle(self):
+        self.metrics.enabled = self.enabled.get()
+
+    def reset(self):
+        self.metrics.reset()
+        self.update_table(reschedule=False)
+
+    def update_table(self, reschedule=True):
+        if not self.winfo_exists():
+            return
+        self.table.delete(*self.table.get_children())
+        for row in self.metrics.snapshot():
+            self.table.insert('', tk.END, values=[f"{row[column]:.2f}" if column.endswith('_ms') else row[column]
+                                                  for column, heading, width in self.COLUMNS])
+        if reschedule:
+            self.after(self.refresh, self.update_table)
@@ -0,0 +1,58 @@
+"""Snapshot size, bytes read and load time of each compression codec, on seeded synthetic data.
+
+The load time decodes every record. A shared drive's read time is estimated from the bytes read
+and the drive's throughput, as the files here are read from the page cache.
+Run from the project folder:  python benchmarks/bench_compression.py [guests] [--mbps 40]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from COMPRESSION import available_codecs
+from JOURNAL import CollectionJournal, CONTAINERS
+from SNAPSHOT import write_snapshot
+from SYNTHETIC import generate, parse_size
+
+NAMES = ('guests', 'clients', 'suppliers', 'employees', 'events')
+
+
+def time_load(directory, name):
+    # Load a collection like the app does and decode every record, returns (seconds, bytes read)
+    start = time.perf_counter()
+    data = CollectionJournal(os.path.join(directory, f'{name}.pkl'), name=name,
+                             container=CONTAINERS.get(name, dict)).load()
+    for record in data.values():
+        pass
+    elapsed = time.perf_counter() - start
+    return elapsed, os.path.getsize(os.path.join(directory, f'{name}.snap'))  # Every record read, so every byte
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare snapshot compression codecs")
+    parser.add_argument('size', nargs='?', default='100k', help="number of guests: 1k, 100k, 1m or a number")
+    parser.add_argument('--mbps', type=float, default=40.0, help="throughput of the shared drive in MB/s")
+    args = parser.parse_args()
+    collections = generate(parse_size(args.size))
+    print(f"{'codec':>6} {'collection':>10} {'MB read':>9} {'write (s)':>10} {'load (s)':>9} "
+          f"{'+ drive (s)':>12}")
+    for codec in ['none'] + available_codecs():
+        totals = [0, 0.0, 0.0]
+        with tempfile.TemporaryDirectory() as directory:
+            for name in NAMES:
+                path = os.path.join(directory, f'{name}.snap')
+                start = time.perf_counter()
+                write_snapshot(path, name, collections[name], codec)
+                written = time.perf_counter() - start
+                loaded, size = time_load(directory, name)
+                drive = loaded + size / (args.mbps * 1e6)
+                totals = [totals[0] + size, totals[1] + loaded, totals[2] + drive]
+                print(f"{codec:>6} {name:>10} {size / 1e6:>9.2f} {written:>10.3f} {loaded:>9.3f} {drive:>12.3f}")
+        print(f"{codec:>6} {'all':>10} {totals[0] / 1e6:>9.2f} {'':>10} {totals[1]:>9.3f} {totals[2]:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
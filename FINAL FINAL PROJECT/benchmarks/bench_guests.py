@@ -0,0 +1,93 @@
+"""Memory and aggregate speed of a large guest list: dictionaries, Guest records and the columnar GuestTable.
+
+Run from the project folder:  python benchmarks/bench_guests.py [guests]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from CLASSES import Guest
+from COLUMNAR import GuestTable, parse_cost
+from PRICING import pricing
+
+SIZE = 1000000
+EVENT_TYPES = ("Wedding", "Birthday", "Themed Party", "Graduation")
+SERVICES = ([], ["Catering"], ["Catering", "Decorations"], ["Cleaning"])
+
+
+def make_guests(size):
+    for i in range(1, size + 1):
+        key = str(i)
+        yield key, Guest(key, f"Guest {i}", f"guest{i}@mail.com", f"055{i:07d}", str(500 + i % 1000),
+                         EVENT_TYPES[i % 4] if i % 5 else None, SERVICES[i % 4] if i % 5 else None)
+
+
+def as_dict(guest):
+    # The shape guests had before they were records
+    record = {"Name": guest.name, "Email": guest.email, "Phone Number": guest.phone_number,
+              "Total Cost": guest.total_cost}
+    if guest.event_type:
+        record["Event Type"] = guest.event_type
+        record["Services"] = list(guest.services)
+    return record
+
+
+def build_table(size):
+    table = GuestTable()
+    for key, guest in make_guests(size):
+        table[key] = guest
+    return table
+
+
+def measure(build):
+    tracemalloc.start()
+    data = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return data, size
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def scan_revenue(guests):
+    # Total revenue and guests per event type the way a report loops over records
+    revenue = 0.0
+    per_type = {}
+    for guest in guests.values():
+        revenue += parse_cost(guest.total_cost) or 0.0
+        if guest.event_type:
+            per_type[guest.event_type] = per_type.get(guest.event_type, 0) + 1
+    return revenue, per_type
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else SIZE
+    print(f"{size} guests")
+    dicts, dict_size = measure(lambda: {key: as_dict(guest) for key, guest in make_guests(size)})
+    del dicts
+    records, record_size = measure(lambda: dict(make_guests(size)))
+    table, table_size = measure(lambda: build_table(size))
+    print(f"{'layout':>14} {'MB':>8} {'B/guest':>8}")
+    for label, total in (("dicts", dict_size), ("Guest records", record_size), ("GuestTable", table_size)):
+        print(f"{label:>14} {total / 1e6:>8.1f} {total / size:>8.0f}")
+
+    (record_revenue, record_types), record_time = timed(lambda: scan_revenue(records))
+    table_revenue, revenue_time = timed(table.total_revenue)
+    table_types, types_time = timed(table.guests_per_event_type)
+    assert abs(record_revenue - table_revenue) < 1e-6 * max(record_revenue, 1) and record_types == table_types
+    print(f"revenue + guests per type: record loop {record_time:.3f}s, "
+          f"column scans {revenue_time + types_time:.3f}s")
+    _, reprice_time = timed(lambda: table.reprice(pricing))
+    print(f"re-price every quoted guest: {reprice_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
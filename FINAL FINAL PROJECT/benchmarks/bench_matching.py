@@ -0,0 +1,74 @@
+"""Matching suppliers to an event type and number of guests: a scan of every supplier compared with the
+interval trees of the CapacityIndex, one event at a time and for a whole season in one call.
+
+Run from the project folder:  python benchmarks/bench_matching.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ENUMS import EventType
+from CLASSES import Supplier
+from MATCHING import CapacityIndex, guest_range, served_event_types
+
+SIZES = (1000, 10000, 50000)
+QUERIES = 1000
+SEASON = 2000  # Events matched by one match_many call
+
+
+def make_suppliers(size, seed=1):
+    randomness = random.Random(seed)
+    event_types = list(EventType)
+    suppliers = {}
+    for i in range(1, size + 1):
+        low = randomness.randint(0, 400)
+        suppliers[i] = Supplier(i, f"Supplier {i}", "Dubai", "04", randomness.sample(event_types, randomness.randint(1, 2)),
+                                low, low + randomness.randint(10, 300))
+    return suppliers
+
+
+def scan(suppliers, event_type, guests):
+    # What matching took before the index: every supplier, every time
+    keys = []
+    for key, supplier in suppliers.items():
+        limits = guest_range(supplier)
+        if limits and limits[0] <= guests <= limits[1] and event_type in served_event_types(supplier):
+            keys.append(key)
+    return keys
+
+
+def main():
+    randomness = random.Random(2)
+    names = [event_type.name for event_type in EventType]
+    queries = [(randomness.choice(names), randomness.randint(10, 600)) for _ in range(QUERIES)]
+    season = [(randomness.choice(names), randomness.randint(10, 600)) for _ in range(SEASON)]
+    print(f"{'suppliers':>10} {'build (s)':>10} {'scan (ms/query)':>16} {'index (ms/query)':>17} "
+          f"{'matches/query':>14} {'season of ' + str(SEASON) + ' (s)':>20}")
+    for size in SIZES:
+        suppliers = make_suppliers(size)
+        start = time.perf_counter()
+        index = CapacityIndex().build(suppliers)
+        for name in names:
+            index.tree(name)
+        built = time.perf_counter() - start
+        scan_queries = queries[:max(10, QUERIES * 1000 // size)]  # Scans are slow, fewer of them do
+        start = time.perf_counter()
+        for event_type, guests in scan_queries:
+            scan(suppliers, event_type, guests)
+        scanned = (time.perf_counter() - start) / len(scan_queries) * 1000
+        matches = 0
+        start = time.perf_counter()
+        for event_type, guests in queries:
+            matches += len(index.match(event_type, guests))
+        indexed = (time.perf_counter() - start) / len(queries) * 1000
+        start = time.perf_counter()
+        index.match_many(season)
+        batch = time.perf_counter() - start
+        print(f"{size:>10} {built:>10.3f} {scanned:>16.3f} {indexed:>17.3f} {matches // len(queries):>14} {batch:>20.3f}")
+
+
+if __name__ == "__main__":
+    main()
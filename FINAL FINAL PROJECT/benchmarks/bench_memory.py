@@ -0,0 +1,102 @@
+"""Memory per record and snapshot size/load time, the old __dict__ records compared with the slotted ones.
+
+Run from the project folder:  python benchmarks/bench_memory.py [records]
+"""
+import io
+import os
+import pickle
+import sys
+import time
+import tracemalloc
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from ENUMS import EventType
+from CLASSES import Employee, Client, Supplier, Guest, Event, Venue
+from CODEC import write_snapshot, read_snapshot
+
+SIZE = 100000
+
+
+class Plain:
+    """class representing a record the way the classes stored it before __slots__, in a __dict__"""
+
+
+def as_plain(record):
+    plain = Plain()
+    plain.__dict__.update(record.__getstate__())
+    return plain
+
+
+def as_dict(name, record):
+    # Guests and events were plain dictionaries with display names as keys
+    if name == 'guests':
+        return {"Name": record.name, "Email": record.email, "Phone Number": record.phone_number,
+                "Total Cost": record.total_cost}
+    return {'Event Type': record.event_type, 'Date': record.date, 'Client': record.client, 'Venue': record.venue}
+
+
+def make_records(name, size):
+    event_types = list(EventType)
+    for i in range(1, size + 1):
+        if name == 'employees':
+            yield i, Employee(i, f"Employee {i}", f"{i} Main Street", f"050{i:07d}", "HR", "Clerk", 3000 + i % 500)
+        elif name == 'clients':
+            client = Client(i, f"Client {i}", f"{i} Main Street", f"050{i:07d}", 10000.0)
+            client.add_event(event_types[i % 4])
+            yield i, client
+        elif name == 'suppliers':
+            yield i, Supplier(i, f"Supplier {i}", "Dubai", f"0400{i:06d}", [event_types[i % 4]], 10, 500)
+        elif name == 'guests':
+            key = str(i)  # The record's ID is the same string object as its key, as when loaded
+            yield key, Guest(key, f"Guest {i}", f"guest{i}@mail.com", f"055{i:07d}", str(500 + i % 1000))
+        elif name == 'venues':
+            key = str(i)
+            yield key, Venue(key, f"Venue {i}", "Abu Dhabi", f"0200{i:06d}", 10, 1000)
+        elif name == 'events':
+            key = str(i)
+            yield key, Event(key, event_types[i % 4], f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                             f"Client {i}", f"Venue {i}")
+
+
+def measure(build):
+    # Bytes allocated by build() that are still alive when it returns
+    tracemalloc.start()
+    data = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return data, size
+
+
+def time_load(load):
+    start = time.perf_counter()
+    load()
+    return time.perf_counter() - start
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else SIZE
+    print(f"{size} records per collection")
+    print(f"{'collection':>10} {'old B/rec':>10} {'slots B/rec':>12} {'pickle MB':>10} {'records MB':>11} "
+          f"{'unpickle s':>11} {'decode s':>9}")
+    for name in ('employees', 'clients', 'suppliers', 'guests', 'venues', 'events'):
+        if name in ('guests', 'events'):
+            old, old_size = measure(lambda: {key: as_dict(name, record) for key, record in make_records(name, size)})
+        else:
+            old, old_size = measure(lambda: {key: as_plain(record) for key, record in make_records(name, size)})
+        del old
+        new, new_size = measure(lambda: dict(make_records(name, size)))
+
+        pickled = pickle.dumps(new, pickle.HIGHEST_PROTOCOL)
+        text = io.StringIO()
+        write_snapshot(text, name, new)
+        encoded = text.getvalue()
+        unpickle_time = time_load(lambda: pickle.loads(pickled))
+        decode_time = time_load(lambda: read_snapshot(io.StringIO(encoded), name))
+        print(f"{name:>10} {old_size / size:>10.0f} {new_size / size:>12.0f} {len(pickled) / 1e6:>10.2f} "
+              f"{len(encoded.encode('utf-8')) / 1e6:>11.2f} {unpickle_time:>11.3f} {decode_time:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
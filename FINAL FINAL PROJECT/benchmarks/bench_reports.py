@@ -0,0 +1,96 @@
+"""Management reports over a large guest list: recomputed by scanning every record compared with the
+running totals kept on every save.
+
+Run from the project folder:  python benchmarks/bench_reports.py [guests]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ENUMS import EventType
+from CLASSES import Employee, Client, Guest, Event, Venue
+from COLUMNAR import GuestTable, parse_cost
+from OBSERVABLE import ObservableDict
+from REPORTS import build_reports, write_csv, write_html, event_price
+from RELATIONS import link_text
+from SERVICES import open_service
+
+SIZE = 1000000
+EVENT_TYPES = ("Wedding", "Birthday", "Themed Party", "Graduation")
+DEPARTMENTS = ("HR", "Sales", "Finance", "Logistics", "Catering")
+
+
+def fill(service, size):
+    # size guests and a company's worth of the other records, added through the collections so every
+    # running total is updated as it would be by saves
+    event_types = list(EventType)
+    table = GuestTable()
+    for i in range(1, size + 1):
+        key = str(i)
+        table[key] = Guest(key, f"Guest {i}", f"guest{i}@mail.com", f"055{i:07d}", str(500 + i % 1000),
+                           EVENT_TYPES[i % 4] if i % 5 else None, ["Catering"] if i % 5 else None)
+    service.guests = ObservableDict(table)
+    service.employees = ObservableDict({i: Employee(i, f"Employee {i}", "", "", DEPARTMENTS[i % 5], "Clerk",
+                                                    str(3000 + i % 2000)) for i in range(1, 5001)})
+    service.clients = ObservableDict({i: Client(i, f"Client {i}", "", "", 50000.0) for i in range(1, 2001)})
+    service.venues = ObservableDict({str(i): Venue(str(i), f"Hall {i}", "Dubai", "04", 10, 500)
+                                     for i in range(1, 201)})
+    service.events = ObservableDict({str(i): Event(str(i), event_types[i % 4], f"2026-{i % 12 + 1:02d}-01",
+                                                   f"Client {i % 2000 + 1}", str(i % 200 + 1))
+                                     for i in range(1, 20001)})
+
+
+def recompute(service):
+    # The same numbers computed ad hoc, every record visited each time
+    revenue = {}
+    for guest in service.guests.values():
+        if guest.event_type:
+            totals = revenue.setdefault(guest.event_type, [0, 0.0])
+            totals[0] += 1
+            totals[1] += parse_cost(guest.total_cost) or 0.0
+    payroll = {}
+    for employee in service.employees.values():
+        payroll[employee.department] = payroll.get(employee.department, 0.0) + float(employee.salary)
+    venues = {}
+    spend = {}
+    for event in service.events.values():
+        venues[link_text(event.venue)] = venues.get(link_text(event.venue), 0) + 1
+        spend[link_text(event.client)] = spend.get(link_text(event.client), 0.0) + event_price(event)
+    return revenue, payroll, venues, spend
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else SIZE
+    with tempfile.TemporaryDirectory() as directory:
+        service = open_service(directory, 'journal')
+        loaded = timed(fill, service, size)[1]
+        print(f"{size} guests, 20000 events, 5000 employees, 2000 clients loaded in {loaded:.2f} s")
+        print(f"ad hoc recompute:            {timed(recompute, service)[1]:8.3f} s")
+        print(f"first report (builds totals): {timed(build_reports, service)[1]:8.3f} s")
+        reports, seconds = timed(build_reports, service)
+        print(f"report from running totals:  {seconds:8.3f} s")
+        start = time.perf_counter()
+        write_csv(reports, os.path.join(directory, 'csv'))
+        write_html(reports, os.path.join(directory, 'report.html'))
+        print(f"write CSV and HTML:          {time.perf_counter() - start:8.3f} s")
+        start = time.perf_counter()
+        for i in range(1, 10001):
+            service.guests[str(i)].total_cost = str(700 + i % 300)
+            service.guests[str(i)].event_type = EVENT_TYPES[(i + 1) % 4]
+            service.events[str(i)] = Event(str(i), EventType.WEDDING, "2026-06-01", f"Client {i % 7 + 1}", "1")
+        print(f"10000 guest and event changes with totals kept: {(time.perf_counter() - start) * 1000:.1f} ms")
+        print(f"report after the changes:    {timed(build_reports, service)[1]:8.3f} s")
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
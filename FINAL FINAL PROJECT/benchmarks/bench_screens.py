@@ -0,0 +1,57 @@
+"""Time to switch between the management screens: the first visit builds a screen, later visits show
+the kept one and only update the rows that changed while it was hidden. Needs a display.
+
+Run from the project folder:  python benchmarks/bench_screens.py [guests]
+"""
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from SYNTHETIC import generate, write_data, parse_size
+from bench_startup import load_app_module
+
+SCREENS = ('employee_ui', 'client_ui', 'supplier_ui', 'guests_ui', 'event_ui', 'venue_ui')
+CHANGES = 100  # Guests changed while the guest screen is hidden
+
+
+def time_screen(app, screen):
+    # Show a screen and wait until the pending list tasks and redraws are done
+    start = time.perf_counter()
+    getattr(app, screen)()
+    while app.task_queue.running:
+        app.update()
+    app.update()
+    return time.perf_counter() - start
+
+
+def main():
+    size = parse_size(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    module = load_app_module()
+    with tempfile.TemporaryDirectory() as directory:
+        write_data(directory, generate(size), 'journal')
+        module.DATA_DIR = directory
+        os.environ['EVENTS_PRELOAD'] = '0'
+        try:
+            app = module.EventManagementApp()
+        except Exception as error:  # tkinter.TclError when there is no display
+            print(f"needs a display: {error}")
+            return
+        app.preload()
+        print(f"{size} guests")
+        print(f"{'screen':>12} {'first visit (ms)':>17} {'next visit (ms)':>16}")
+        first = {screen: time_screen(app, screen) for screen in SCREENS}
+        for key in list(app.guests.keys())[:CHANGES]:
+            app.set_guest_cost(key, 123)
+        for screen in SCREENS:
+            print(f"{screen:>12} {first[screen] * 1000:>17.1f} {time_screen(app, screen) * 1000:>16.1f}")
+        app.task_queue.shutdown()
+        app.close()
+        app.destroy()
+
+
+if __name__ == "__main__":
+    main()
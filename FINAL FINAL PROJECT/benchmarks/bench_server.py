@@ -0,0 +1,117 @@
+"""Requests per second of the HTTP API on localhost, over kept-alive connections and over a new connection
+per request.
+
+Run from the project folder:  python benchmarks/bench_server.py [guests] [connections] [requests]
+The server runs in its own process on a temporary copy of the data, so the numbers include JSON
+encoding and the HTTP parsing on both sides but no network.
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from CLASSES import Guest, Venue
+from SERVICES import open_service
+
+SIZE = 10000
+CONNECTIONS = 16
+REQUESTS = 4000  # Requests per scenario, spread over the connections
+
+
+def write_data(directory, size):
+    service = open_service(directory, 'journal')
+    guests = [(str(i), Guest(str(i), f"Guest {i}", f"guest{i}@mail.com", f"055{i:07d}", str(500 + i % 1000)))
+              for i in range(1, size + 1)]
+    venues = [(str(i), Venue(str(i), f"Hall {i}", "Dubai", f"04{i:07d}", 10, 500)) for i in range(1, 101)]
+    service.guests.update_many(guests)
+    service.store.put_many('guests', guests)
+    service.venues.update_many(venues)
+    service.store.put_many('venues', venues)
+    service.close()
+
+
+def start_server(directory):
+    # Start python -m SERVER on a free port and wait for the line telling which one
+    server = subprocess.Popen([sys.executable, '-m', 'SERVER', '--data', directory, '--storage', 'journal',
+                               '--port', '0'], cwd=PROJECT_DIR, stdout=subprocess.PIPE, text=True)
+    line = server.stdout.readline()
+    if not line.startswith('Serving on'):
+        server.kill()
+        raise RuntimeError("the server did not start")
+    return server, int(line.rsplit(':', 1)[1].split('/')[0])
+
+
+async def request(reader, writer, method, path, body=None, keep_alive=True):
+    # Send one request and read its response, returns (status, payload)
+    data = b'' if body is None else json.dumps(body).encode('utf-8')
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n"
+                  f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode('ascii') + data)
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    length = 0
+    for line in lines[1:]:
+        if line.lower().startswith('content-length:'):
+            length = int(line.split(':', 1)[1])
+    payload = await reader.readexactly(length)
+    return int(lines[0].split(' ')[1]), json.loads(payload) if payload else None
+
+
+async def client(port, paths, keep_alive):
+    # Send every request of paths, over one connection or over a new one for each request
+    connection = None
+    for method, path, body in paths:
+        if connection is None:
+            connection = await asyncio.open_connection('127.0.0.1', port)
+        status, payload = await request(*connection, method, path, body, keep_alive)
+        if status >= 400:
+            raise RuntimeError(f"{method} {path} answered {status}: {payload}")
+        if not keep_alive:
+            connection[1].close()
+            connection = None
+    if connection is not None:
+        connection[1].close()
+
+
+async def run_scenario(port, make_request, requests, connections, keep_alive):
+    # Requests per second of requests made by make_request(number) over a number of connections
+    share = [[make_request(number) for number in range(i, requests, connections)] for i in range(connections)]
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, paths, keep_alive) for paths in share))
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else SIZE
+    connections = int(sys.argv[2]) if len(sys.argv) > 2 else CONNECTIONS
+    requests = int(sys.argv[3]) if len(sys.argv) > 3 else REQUESTS
+    scenarios = [
+        ('get one guest', lambda n: ('GET', f'/api/guests/{n % size + 1}', None)),
+        ('list page of 50', lambda n: ('GET', f'/api/guests?offset={n * 50 % size}&limit=50', None)),
+        ('search guests', lambda n: ('GET', f'/api/guests/search?q=guest+{n % size + 1}&limit=10', None)),
+        ('update a guest', lambda n: ('PUT', f'/api/guests/{n % size + 1}', {'phone_number': f'056{n:07d}'})),
+        ('add a venue', lambda n: ('POST', '/api/venues', {'name': f'Room {n}', 'address': 'Abu Dhabi',
+                                                           'contact': '02', 'min_guests': 5, 'max_guests': 50})),
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        write_data(directory, size)
+        server, port = start_server(directory)
+        try:
+            print(f"{size} guests, {connections} connections, {requests} requests per scenario")
+            print(f"{'scenario':>18} {'keep-alive (req/s)':>20} {'new connection (req/s)':>24}")
+            for label, make_request in scenarios:
+                kept = asyncio.run(run_scenario(port, make_request, requests, connections, True))
+                fresh = asyncio.run(run_scenario(port, make_request, requests, connections, False))
+                print(f"{label:>18} {kept:>20.0f} {fresh:>24.0f}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Cold start of one collection from a JSON-row snapshot compared with a memory-mapped one.
+
+Times, counted from the start, opening the collection, showing its first page of records and
+looking one record up by ID. Run from the project folder:  python benchmarks/bench_snapshot.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CLASSES import Client
+from CODEC import write_snapshot as write_records
+from JOURNAL import CollectionJournal
+from SNAPSHOT import write_snapshot
+
+SIZES = (1000, 100000, 1000000)
+PAGE = 50  # Rows of the first screen
+
+
+def clients(size):
+    return {i: Client(i, f"Client {i}", f"{i} Main Street", f"050{i:07d}", 10000.0) for i in range(1, size + 1)}
+
+
+def time_open(directory, size):
+    # Open the collection, read its first page, then one record near the end
+    start = time.perf_counter()
+    data = CollectionJournal(os.path.join(directory, 'clients.pkl'), name='clients').load()
+    opened = time.perf_counter() - start
+    for key, record in zip(range(PAGE), data.items()):
+        pass
+    page = time.perf_counter() - start
+    data[size - 1].name
+    return opened, page, time.perf_counter() - start
+
+
+def main():
+    print(f"{'records':>10} {'format':>8} {'open (s)':>10} {'first page (s)':>16} {'lookup (s)':>12} {'file (MB)':>10}")
+    for size in SIZES:
+        data = clients(size)
+        for label in ('records', 'snap'):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, f'clients.{label}')
+                if label == 'records':
+                    with open(path, 'w', encoding='utf-8') as f:
+                        write_records(f, 'clients', data)
+                else:
+                    write_snapshot(path, 'clients', data)
+                megabytes = os.path.getsize(path) / 1e6
+                opened, page, lookup = time_open(directory, size)
+                print(f"{size:>10} {label:>8} {opened:>10.4f} {page:>16.4f} {lookup:>12.4f} {megabytes:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Sorting a list by a column: sorting every key again for each change against the kept sorted index,
+which moves one entry per change and reads only the rows on screen.
+
+Run from the project folder:  python benchmarks/bench_sorting.py [guests]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SERVICES import open_service
+from SORTING import SORT_FIELDS, sort_value, key_order
+from SYNTHETIC import generate, write_data, parse_size
+
+WINDOW = 60  # Rows a list view draws for one screen
+CHANGES = 1000  # Guest cost edits, each followed by a redraw of the sorted window
+
+
+def sort_entry(value, key):
+    return ((0,) if value is None else (1, value)), key_order(key)
+
+
+def main():
+    size = parse_size(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as directory:
+        write_data(directory, generate(size), 'journal')
+        service = open_service(directory)
+        service.preload()
+        guests = service.guests
+        keys = list(guests.keys())
+        value = sort_value('total_cost', SORT_FIELDS['guests']['total_cost'])
+
+        def top_window():
+            # The window a full sort shows, in the order the index keeps: costs that are not numbers last
+            # when descending, ties by key
+            return sorted(keys, key=lambda key: sort_entry(value(guests[key]), key), reverse=True)[:WINDOW]
+        print(f"{size} guests, {CHANGES} cost edits")
+
+        start = time.perf_counter()
+        expected = top_window()
+        full_sort = time.perf_counter() - start
+        print(f"  full sort           {full_sort * 1000:9.1f} ms, so {full_sort * CHANGES:.1f} s to re-sort after each edit")
+
+        start = time.perf_counter()
+        view = service.sorted_keys('guests', 'total_cost', descending=True)
+        print(f"  build index         {(time.perf_counter() - start) * 1000:9.1f} ms, once")
+        assert view[:WINDOW] == expected, "the index and the full sort disagree"
+
+        random.seed(1)
+        start = time.perf_counter()
+        for number in range(CHANGES):
+            service.set_guest_cost(random.choice(keys), random.randint(50, 5000))
+            window = view[:WINDOW]
+        print(f"  edit + window read  {(time.perf_counter() - start) / CHANGES * 1e6:9.1f} us per edit")
+        assert window == top_window(), "the index fell behind the edits"
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Time-to-first-window against data size, eager loading compared with lazy loading.
+
+Run from the project folder:  python benchmarks/bench_startup.py
+"""
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from ENUMS import EventType
+from CLASSES import Employee, Client, Supplier, Guest, Event, Venue
+from SNAPSHOT import write_snapshot
+from JOURNAL import JournalStore
+from REPOSITORY import COLUMNS
+
+SIZES = (1000, 10000, 100000)
+
+
+def write_collections(directory, size):
+    # Write one snapshot per collection with size records each
+    event_types = list(EventType)
+    collections = {
+        'employees': {i: Employee(i, f"Employee {i}", "", "", "HR", "Clerk", 3000 + i % 500) for i in range(1, size + 1)},
+        'clients': {i: Client(i, f"Client {i}", f"{i} Main Street", f"050{i:07d}", 10000.0) for i in range(1, size + 1)},
+        'suppliers': {i: Supplier(i, f"Supplier {i}", "Dubai", f"0400{i:06d}", [event_types[i % 4]], 10, 500)
+                      for i in range(1, size + 1)},
+        'guests': {str(i): Guest(str(i), f"Guest {i}", f"guest{i}@mail.com", f"055{i:07d}", str(500 + i % 1000))
+                   for i in range(1, size + 1)},
+        'venues': {str(i): Venue(str(i), f"Venue {i}", "Abu Dhabi", f"0200{i:06d}", 10, 1000)
+                   for i in range(1, size + 1)},
+        'events': {str(i): Event(str(i), event_types[i % 4], f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                                 f"Client {i}", f"Venue {i}") for i in range(1, size + 1)},
+    }
+    for name, data in collections.items():
+        write_snapshot(os.path.join(directory, f'{name}.snap'), name, data)
+
+
+def time_eager(directory):
+    # The old post_init: every collection is loaded before the window appears
+    start = time.perf_counter()
+    store = JournalStore(directory)
+    for name in COLUMNS:
+        store.load(name)
+    return time.perf_counter() - start
+
+
+def load_app_module():
+    path = os.path.join(PROJECT_DIR, 'final assignmnet 3.py')
+    spec = importlib.util.spec_from_file_location('event_app', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def time_first_window(module, directory):
+    # Construct the app and draw its first window, with background preloading switched off
+    module.DATA_DIR = directory
+    os.environ['EVENTS_PRELOAD'] = '0'
+    start = time.perf_counter()
+    app = module.EventManagementApp()
+    app.update()
+    elapsed = time.perf_counter() - start
+    app.destroy()
+    return elapsed
+
+
+def time_first_screen(directory, name='venues'):
+    # Without a display, time what the first screen has to load: a single collection
+    start = time.perf_counter()
+    JournalStore(directory).load(name)
+    return time.perf_counter() - start
+
+
+def main():
+    try:
+        module = load_app_module()
+        module.EventManagementApp().destroy()
+        has_display = True
+    except Exception:  # tkinter.TclError when there is no display
+        has_display = False
+    lazy_label = "first window (s)" if has_display else "venues only (s)"
+    print(f"{'records':>10} {'eager load (s)':>16} {lazy_label:>18}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            write_collections(directory, size)
+            eager = time_eager(directory)
+            lazy = time_first_window(module, directory) if has_display else time_first_screen(directory)
+            print(f"{size:>10} {eager:>16.3f} {lazy:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
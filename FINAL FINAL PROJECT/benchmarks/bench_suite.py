@@ -0,0 +1,156 @@
+"""Benchmark suite over seeded synthetic data: cold start, save, table population, search and pricing,
+with every run appended to a results file and compared with the previous run of the same size.
+
+Run from the project folder:  python benchmarks/bench_suite.py [1k 100k 1m] [--seed N] [--results FILE]
+A stage more than --threshold (default 20%) slower than last time is reported as a regression and
+the suite exits with status 1, so it can gate a change.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from REPOSITORY import COLUMNS, to_row
+from SERVICES import open_service
+from SYNTHETIC import generate, write_data, parse_size
+from bench_startup import load_app_module, time_first_window
+
+RESULTS_FILE = os.path.join(PROJECT_DIR, 'benchmarks', 'suite_results.jsonl')
+FIRST_PAGE = 60  # Rows a list view draws for the first screen
+SAVES = 1000
+NOISE = 0.05  # Stages faster than this in both runs vary too much from run to run to compare
+QUERIES = ("al", "sara", "khan", "mail", "05", "dubai", "ali al", "themed")
+
+
+def time_cold_start(module, directory):
+    # The app's first window when there is a display, else what post_init's preload reads headless
+    if module is not None:
+        return time_first_window(module, directory)
+    start = time.perf_counter()
+    service = open_service(directory)
+    service.preload()
+    elapsed = time.perf_counter() - start
+    service.close()
+    return elapsed
+
+
+def time_populate(service):
+    # What fill_table does for every list: the keys of the collection and the rows of the first page
+    pages = {}
+    start = time.perf_counter()
+    for name in COLUMNS:
+        collection = getattr(service, name)
+        keys = list(collection.keys())
+        key_set = {str(key) for key in keys}
+        pages[name] = (key_set, [(key,) + to_row(name, collection[key]) for key in keys[:FIRST_PAGE]])
+    elapsed = time.perf_counter() - start
+    for name, (key_set, rows) in pages.items():
+        assert len(key_set) == len(getattr(service, name)) and len(rows) == min(FIRST_PAGE, len(key_set)), name
+    return elapsed
+
+
+def time_search(service):
+    # The first search of each collection builds its index, the queries after it use the index
+    start = time.perf_counter()
+    for name in ('guests', 'clients', 'employees', 'suppliers', 'venues'):
+        for text in QUERIES:
+            service.search_records(name, text, 100)
+    return time.perf_counter() - start
+
+
+def time_pricing(service):
+    start = time.perf_counter()
+    service.reprice_guests()
+    return time.perf_counter() - start
+
+
+def time_save(service):
+    # Guest cost edits saved one by one, then written out when the service closes
+    keys = list(service.guests.keys())[:SAVES]
+    start = time.perf_counter()
+    for number, key in enumerate(keys):
+        service.set_guest_cost(key, 100 + number)
+    service.close()
+    return time.perf_counter() - start
+
+
+def run_size(module, size, seed):
+    timings = {}
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        write_data(directory, generate(size, seed), 'journal')
+        timings['generate'] = time.perf_counter() - start
+        timings['cold_start'] = time_cold_start(module, directory)
+        service = open_service(directory)
+        service.preload()
+        timings['populate'] = time_populate(service)
+        timings['search'] = time_search(service)
+        timings['pricing'] = time_pricing(service)
+        timings['save'] = time_save(service)
+    return timings
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_runs(path):
+    # Last stored run of each size
+    runs = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    run = json.loads(line)
+                    runs[run['size']] = run
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the app's hot paths on synthetic data")
+    parser.add_argument('sizes', nargs='*', default=['1k', '100k'], help="numbers of guests: 1k, 100k, 1m or a number")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--results', default=RESULTS_FILE, help="JSON lines file the runs are appended to")
+    parser.add_argument('--threshold', type=float, default=0.2, help="slowdown reported as a regression")
+    args = parser.parse_args()
+    try:
+        module = load_app_module()
+        module.EventManagementApp().destroy()
+    except Exception:  # tkinter.TclError when there is no display
+        module = None
+    previous = previous_runs(args.results)
+    commit = git_commit()
+    regressions = 0
+    for size in map(parse_size, args.sizes):
+        timings = run_size(module, size, args.seed)
+        before = previous.get(size, {}).get('timings', {})
+        print(f"{size} guests, seed {args.seed}{'' if module else ', no display'}")
+        for stage, seconds in timings.items():
+            line = f"  {stage:<11} {seconds:9.3f} s"
+            if before.get(stage):
+                change = seconds / before[stage] - 1
+                line += f"  {change:+7.1%} vs {previous[size]['commit'] or 'last run'}"
+                if change > args.threshold and stage != 'generate' and seconds > NOISE:
+                    line += "  REGRESSION"
+                    regressions += 1
+            print(line)
+        run = {'size': size, 'seed': args.seed, 'commit': commit, 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'python': platform.python_version(), 'display': module is not None, 'timings': timings}
+        with open(args.results, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(run) + '\n')
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
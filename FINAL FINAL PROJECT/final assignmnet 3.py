@@ -2,79 +2,225 @@ import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
 from tkinter import simpledialog
-import pickle
+from tkinter import filedialog
 import os
-import random
+import threading
+from time import perf_counter
 from ENUMS import ServiceType, EventType
 from CLASSES import Person, Employee, Client, Service, Catering, Supplier, Guest, Event, Venue
+from REPOSITORY import open_repository, COLUMNS
+from WIDGETS import VirtualTreeview, TaskStatusBar, MetricsPanel, ScreenManager
+from TASKS import TaskQueue
+from PRICING import pricing
+from SERVICES import EventService, DATA_DIR
+from REPORTS import write_csv, write_html
+from METRICS import metrics
+from OBSERVABLE import ChangeRecorder
 
+BACKGROUND_ROWS = 10000  # Lists with at least this many records are prepared on the task queue
+SYNC_INTERVAL = 1000  # Milliseconds between checks for changes saved by other copies of the app
+SYNC_LOCK_WAIT = 0.2  # Seconds a check waits for a collection another copy has locked, e.g. while it loads
+
+
+class EventManagementApp(tk.Tk, EventService):
+    # The collections, IDs, searching, pricing and saving come from EventService,
+    # this class only adds the windows on top of them
 
-class EventManagementApp(tk.Tk):
     def __init__(self):
-        super().__init__()  # Initialize the Tk parent class
+        tk.Tk.__init__(self)  # Initialize the Tk parent class
+        EventService.__init__(self, open_repository(DATA_DIR))  # Journal files by default, EVENTS_STORAGE=sqlite for SQLite
         self.title("The Best Events Company Management System")  # Set the window title
         self.geometry('600x450')  # Set the default size of the window
 
-        # Dictionaries to store data about clients, employees, suppliers, and guests
-        self.clients = {}
-        self.employees = {}
-        self.suppliers = {}
-        self.supplier_id_counter = 1  # Start supplier ID counter
-        self.guests = {}
-        self.guest_id_counter = 1
-        self.events = {}
-        self.event_id_counter = 1
-        self.venues = {}
-        self.venue_id_counter = 1
+        # Long operations run on a thread pool, their progress is shown in a status bar at the bottom
+        self.task_queue = TaskQueue(self)
+        self.status_bar = TaskStatusBar(self)
+        self.task_queue.listeners.append(self.status_bar.show_tasks)
+        self.login_task = None  # Loading of the screen picked on the login page
+        self.index_builds = {}  # Name of a search index or (name, field) of a sorted one -> on_done of its build
+        # Each screen is built the first time it is shown, then hidden and shown again on navigation
+        self.screens = ScreenManager(self, keep=(tk.Menu, TaskStatusBar), fill=tk.BOTH, expand=True, padx=10, pady=10)
 
         # Setup the initial UI and load any post-initialization configurations
         self.setup_ui()
+        self.setup_menu()
         self.post_init()
 
 
 
     def post_init(self):
-        # Load existing data from files for each category if available
-        self.clients = self.load_data('../final assignmnet /clients.pkl')  # Load client data
-        self.client_id_counter = max(self.clients.keys(), default=0) + 1 # Update the ID counter
-        self.client_id_counter = len(self.clients) + 1 # Ensure unique IDs for new clients
-
-        self.employees = self.load_data('../final assignmnet /employees.pkl')  # Load employee data
-        self.employee_id_counter = max(self.employees.keys(), default=0) + 1  # Update the ID counter
-        self.employee_id_counter = len(self.employees) + 1
-
-        self.suppliers = self.load_data('../final assignmnet /suppliers.pkl')
-        numeric_keys = [k for k in self.suppliers.keys() if isinstance(k, str) and k.isdigit()]
-        self.supplier_id_counter = max(numeric_keys, default=0) + 1
-
-        self.guests = self.load_data('../final assignmnet /guests.pkl')  # Load guest data
-        self.guest_id_counter = max(map(int, self.guests.keys()), default=0) + 1
-        self.guest_id_counter = len(self.guests) + 1
-
-        self.venues = self.load_data('../final assignmnet /venues.pkl')
-
-        # If venues dictionary is not empty, find the maximum key, convert it to int, add 1, and set it as the next venue_id_counter
-        if self.venues:
-            self.venue_id_counter = max(int(venue_id) for venue_id in self.venues.keys()) + 1
+        # Collections load on first use, the rest are preloaded in the background once the window is up
+        if os.environ.get('EVENTS_PRELOAD', '1') == '1':
+            self.after_idle(self.start_preload)
+        self.after(SYNC_INTERVAL, self.sync_ui)
+
+    def sync_ui(self):
+        # Read what other copies of the app saved on the task queue, the window never waits for the files.
+        # Any error, e.g. the data folder being unreachable for now, is retried next time
+        self.task_queue.submit(None, lambda task: self.fetch_changes(SYNC_LOCK_WAIT), self.show_changes,
+                               lambda error: self.after(SYNC_INTERVAL, self.sync_ui))
+
+    def show_changes(self, fetched):
+        # Show what other copies of the app saved, and warn about our changes they got to first
+        try:
+            dropped = self.apply_changes(fetched)
+        finally:
+            self.after(SYNC_INTERVAL, self.sync_ui)
+        if dropped:
+            records = "\n".join(f"{name[:-1].title()} {key}" for name, key in dropped[:10])
+            messagebox.showwarning("Changes Not Saved", "These records were changed on another workstation "
+                                                        f"first, their changes are shown instead:\n{records}")
+
+    def start_preload(self):
+        threading.Thread(target=self.preload, daemon=True).start()
+
+    def run_task(self, label, work, on_done=None):
+        # Run work(task) on the task queue, on_done(result) runs on the Tk thread and errors are shown
+        return self.task_queue.submit(label, work, on_done,
+                                      lambda error: messagebox.showerror("Error", f"{label} failed: {error}"))
+
+    def run_on_copy(self, label, name, work, on_done=None):
+        # Run work(task, records) on the task queue with a snapshot of a collection taken here on the Tk
+        # thread, so the work never reads records while they change. A collection not loaded yet is
+        # loaded on the task queue first
+        if name in self.__dict__:
+            records = getattr(self, name).snapshot()
+            return self.run_task(label, lambda task: work(task, records), on_done)
+        return self.run_task(f"Loading {name}", lambda task: getattr(self, name),
+                             lambda collection: self.run_on_copy(label, name, work, on_done))
+
+    def fill_table(self, table, name, row, select=None):
+        # Show a collection in a table, large ones are listed on the task queue first.
+        # select(collection) returns the keys to show, all of them if not given
+        collection = getattr(self, name)
+        select = select or (lambda collection: list(collection.keys()))
+        if len(collection) < BACKGROUND_ROWS:
+            with metrics.timer('populate', name) as timing:
+                keys = select(collection)
+                table.show_collection(collection, row, keys)
+                timing.records = len(keys)
+            return
+        start = perf_counter()
+        table.list_collection(collection, row)  # Changes made while the keys are listed are kept for show
+
+        def show(keys):
+            if table.winfo_exists():
+                table.show_listed(keys)
+                if metrics.enabled:
+                    metrics.observe('populate', name, perf_counter() - start, len(keys))
+        self.run_on_copy(f"Listing {name}", name, lambda task, records: select(records), show)
+
+    def build_index(self, label, name, indexes, index_key, index, on_done):
+        # Build a new index on the task queue from a snapshot of the collection taken here, then add it to
+        # indexes and call on_done(). The keys changed meanwhile are recorded from before the snapshot and
+        # brought up to date before the index is used. While it builds, later calls only replace on_done
+        if index_key in self.index_builds:
+            self.index_builds[index_key] = on_done
+            return
+        collection = getattr(self, name)
+        recorder = ChangeRecorder(collection)
+        records = collection.snapshot()
+        self.index_builds[index_key] = on_done
+
+        def done(index):
+            index.follow(collection, recorder.stop())
+            indexes[index_key] = index
+            self.index_builds.pop(index_key)()
+
+        def stopped(error=None):
+            recorder.stop()
+            self.index_builds.pop(index_key, None)
+            if error is not None:
+                messagebox.showerror("Error", f"{label} failed: {error}")
+        self.task_queue.submit(label, lambda task: index.build(records), done, stopped, stopped)
+
+    def filter_list(self, name, table, row, text):
+        # Search-as-you-type: show only the records with words starting with what was typed so far
+        collection = getattr(self, name)
+        if not text.strip():
+            table.show_collection(collection, row)
+        elif name in self.search_indexes:
+            table.show_collection(collection, row, self.search_records(name, text))
         else:
-            # If there are no venues loaded, start the counter at 1
-            self.venue_id_counter = 1
-
-        self.events = self.load_data('../final assignmnet /events.pkl')  # Load event data
-        self.event_id_counter = max((int(key) for key in self.events.keys()), default=0) + 1  # Update the ID counter
-        self.event_id_counter = len(self.events) + 1
-
-    def load_data(self, filename):
-        # Load data from a pickle file if it exists, otherwise return an empty dictionary
-        if os.path.exists(filename):
-            with open(filename, 'rb') as f:
-                return pickle.load(f)
-        return {}
-
-    def save_data(self, filename, data):
-        # Save the provided data object to a file using pickle
-        with open(filename, 'wb') as f:
-            pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+            # The first search of a collection builds its index, which takes a while for large ones.
+            # The list is then filtered by the text typed last
+            self.build_index(f"Searching {name}", name, self.search_indexes, name, self.new_search_index(name),
+                             lambda: table.winfo_exists() and self.filter_list(name, table, row, text))
+
+    def add_filter_entry(self, frame, name, table, row):
+        # A "Filter:" entry above a list that narrows it on every key press
+        filter_frame = ttk.Frame(frame)
+        filter_frame.pack(fill=tk.X, before=table.scrollbar)
+        ttk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT)
+        filter_entry = ttk.Entry(filter_frame)
+        filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10)
+        filter_entry.bind("<KeyRelease>", lambda event: self.filter_list(name, table, row, filter_entry.get()))
+
+    def show_sorted(self, name, table, column, field, descending=False, low=None, high=None):
+        # Show a list sorted by one field through its sorted index, only the rows on screen are read.
+        # The first sort of a field builds the index on the task queue
+        if (name, field) not in self.sort_indexes:
+            self.build_index(f"Sorting {name}", name, self.sort_indexes, (name, field),
+                             self.new_sort_index(name, field),
+                             lambda: table.winfo_exists() and self.show_sorted(name, table, column, field,
+                                                                               descending, low, high))
+            return
+        try:
+            view = self.sorted_keys(name, field, descending, low, high)
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
+            return
+        table.show_order(view, (column, descending))
+
+    def add_sort_controls(self, frame, name, table, fields, populate):
+        # Clicking a heading sorts by it, again for descending and a third time for the usual order.
+        # Returns a frame filtering the list to a range of one column, for the caller to place
+        def sort_by(column):
+            sorted_column, descending = table.sorted_by or (None, False)
+            if sorted_column == column and descending:
+                populate()
+            else:
+                self.show_sorted(name, table, column, fields[column], sorted_column == column)
+        for column in fields:
+            table.heading(column, command=lambda column=column: sort_by(column))
+
+        range_frame = ttk.Frame(frame)
+        ttk.Label(range_frame, text="Show:").pack(side=tk.LEFT)
+        column_combobox = ttk.Combobox(range_frame, values=list(fields), state="readonly", width=12)
+        column_combobox.current(0)
+        column_combobox.pack(side=tk.LEFT, padx=5)
+        ttk.Label(range_frame, text="From:").pack(side=tk.LEFT)
+        low_entry = ttk.Entry(range_frame, width=12)
+        low_entry.pack(side=tk.LEFT, padx=5)
+        ttk.Label(range_frame, text="To:").pack(side=tk.LEFT)
+        high_entry = ttk.Entry(range_frame, width=12)
+        high_entry.pack(side=tk.LEFT, padx=5)
+
+        def apply():
+            column = column_combobox.get()
+            self.show_sorted(name, table, column, fields[column], False, low_entry.get(), high_entry.get())
+
+        def clear():
+            low_entry.delete(0, tk.END)
+            high_entry.delete(0, tk.END)
+            populate()
+        ttk.Button(range_frame, text="Apply", command=apply).pack(side=tk.LEFT, padx=5)
+        ttk.Button(range_frame, text="Clear", command=clear).pack(side=tk.LEFT)
+        return range_frame
+
+    def check_booking(self, venue, date, event_id=None):
+        # Show an error and return False if the date is invalid or the venue is already booked
+        problem = self.booking_problem(venue, date, event_id)
+        if problem:
+            messagebox.showerror("Error", problem)
+            return False
+        return True
+
+    def on_close(self):
+        # Write queued changes, finish any background compaction and close the journals before exiting
+        self.task_queue.shutdown()
+        self.close()
+        self.destroy()
 
     def setup_ui(self):
         # Main frame for the application content
@@ -107,11 +253,92 @@ class EventManagementApp(tk.Tk):
         style.map('TButton', foreground=[('pressed', 'red'), ('active', 'blue')],
                   background=[('pressed', '!disabled', 'black'), ('active', 'white')])
 
+    def setup_menu(self):
+        # Data menu with bulk import and export of every collection
+        menubar = tk.Menu(self)
+        data_menu = tk.Menu(menubar, tearoff=0)
+        for name in COLUMNS:
+            data_menu.add_command(label=f"Import {name.title()}...", command=lambda name=name: self.import_ui(name))
+        data_menu.add_separator()
+        for name in COLUMNS:
+            data_menu.add_command(label=f"Export {name.title()}...", command=lambda name=name: self.export_ui(name))
+        data_menu.add_separator()
+        data_menu.add_command(label="Summary Report...", command=self.report_ui)
+        data_menu.add_command(label="Management Reports...", command=self.reports_ui)
+        data_menu.add_command(label="Diagnostics...", command=self.diagnostics_ui)
+        menubar.add_cascade(label="Data", menu=data_menu)
+        self.config(menu=menubar)
+
+    def import_ui(self, name):
+        # Import a CSV or JSON file: rows are validated and added in chunks, saved and shown once at the end
+        path = filedialog.askopenfilename(title=f"Import {name.title()}",
+                                          filetypes=[("CSV or JSON", "*.csv *.json"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            count, errors = self.import_records(name, path)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Import Failed", str(error))
+            return
+        message = f"{count} {name} imported."
+        if errors:
+            details = "\n".join(f"Row {number}: {error}" for number, error in errors[:10])
+            message += f"\n{len(errors)} rows were skipped:\n{details}"
+        messagebox.showinfo("Import", message)
+
+    def export_ui(self, name):
+        # Write a collection to a CSV or JSON file, one row at a time
+        path = filedialog.asksaveasfilename(title=f"Export {name.title()}", defaultextension=".csv",
+                                            filetypes=[("CSV", "*.csv"), ("JSON", "*.json")])
+        if not path:
+            return
+        self.run_on_copy(f"Exporting {name}", name,
+                         lambda task, records: self.export_records(name, path, task.report, records),
+                         lambda count: messagebox.showinfo("Export", f"{count} {name} exported to {path}."))
+
+    def report_ui(self):
+        # Count records and sum the guest revenue in the background, then show the totals
+        self.run_task("Building report", lambda task: self.summary(), self.show_report)
+
+    def show_report(self, summary):
+        lines = [f"{name.title()}: {count}" for name, count in summary['counts'].items()]
+        lines.append(f"Guest revenue: {summary['guest_revenue']:.2f}")
+        lines += [f"{event_type} events: {count}" for event_type, count in summary['events_by_type'].items()]
+        messagebox.showinfo("Summary Report", "\n".join(lines))
+
+    def reports_ui(self):
+        # Write revenue, venue, payroll and budget tables to an HTML page, or to CSV files next to it
+        path = filedialog.asksaveasfilename(title="Save Management Reports", defaultextension=".html",
+                                            filetypes=[("HTML", "*.html"), ("CSV files", "*.csv")])
+        if not path:
+            return
+
+        def work(task):
+            reports = self.reports()
+            if path.lower().endswith('.csv'):
+                return write_csv(reports, os.path.splitext(path)[0])
+            return [write_html(reports, path)]
+        self.run_task("Building reports", work,
+                      lambda paths: messagebox.showinfo("Management Reports", "Saved:\n" + "\n".join(paths)))
+
+    def diagnostics_ui(self):
+        # Timings of loading, saving, list filling and searching, per collection
+        window = tk.Toplevel(self)
+        window.title("Diagnostics")
+
+        def save():
+            path = filedialog.asksaveasfilename(parent=window, title="Save Timings", defaultextension=".json",
+                                                filetypes=[("JSON", "*.json"), ("Prometheus text", "*.prom")])
+            if path:
+                metrics.write(path)
+        MetricsPanel(window, metrics, save).pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
     def login_ui(self):
-        # Destroy the main/welcome frame and setup the login frame
-        self.main_frame.destroy()
-        self.login_frame = ttk.Frame(self, padding=(10, 10), style='TFrame')
-        self.login_frame.pack(fill=tk.BOTH, expand=True)
+        # Hide the current screen, destroy the main/welcome frame and show the login frame
+        self.screens.show('login', self.build_login_ui)
+
+    def build_login_ui(self, frame):
+        self.login_frame = frame
 
         # Label for login prompt
         ttk.Label(self.login_frame, text="Login as:", font=('Helvetica', 12)).pack(pady=(20, 10))
@@ -128,28 +355,30 @@ class EventManagementApp(tk.Tk):
         ttk.Button(self.login_frame, text="Proceed", command=self.proceed_login).pack(pady=20)
 
     def proceed_login(self):
-        # Determine the type of user and display the corresponding UI
+        # Determine the type of user, load the collections its screen needs in the background,
+        # then display the corresponding UI
         login_type = self.login_type.get()
-        self.login_frame.destroy()  # Destroy the current login frame
-        if login_type == "Employee":
-            self.employee_ui()
-        elif login_type == "Guest":
-            self.guests_ui()
-        elif login_type == "Client":
-            self.client_ui()
-        elif login_type == "Supplier":
-            self.supplier_ui()
-        elif login_type == "Event":
-            self.event_ui()
-        elif login_type == "Venue":
-            self.venue_ui()
+        screen, names = {"Employee": (self.employee_ui, ['employees']),
+                         "Guest": (self.guests_ui, ['guests']),
+                         "Client": (self.client_ui, ['clients']),
+                         "Supplier": (self.supplier_ui, ['suppliers']),
+                         "Event": (self.event_ui, ['events', 'venues']),
+                         "Venue": (self.venue_ui, ['venues', 'events'])}[login_type]
+        if self.login_task is not None:
+            self.login_task.cancel()  # Proceed was pressed again
+
+        def show(result):
+            self.login_task = None
+            screen()  # Hides the login frame
+        self.login_task = self.run_task(f"Loading {login_type.lower()} data",
+                                        lambda task: self.load_collections(names, task.report), show)
 
     def employee_ui(self):
-        # Clear any existing widgets from the application's main window
-        self.clear_frame()
-        # Create a new frame for employee management and add it to the main window
-        self.employee_frame = ttk.Frame(self)
-        self.employee_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        # Show the employee management screen, it is only built the first time
+        self.screens.show('employees', self.build_employee_ui)
+
+    def build_employee_ui(self, frame):
+        self.employee_frame = frame
 
         # Add a header label to the employee management frame
         header_label = ttk.Label(self.employee_frame, text="Employee Management", font=("Arial", 16, 'bold'))
@@ -168,7 +397,7 @@ class EventManagementApp(tk.Tk):
         search_frame = ttk.Frame(self.employee_frame)
         search_frame.pack(fill=tk.X, padx=10)
         # Label for the search input field
-        ttk.Label(search_frame, text="Search by ID:").pack(side=tk.LEFT)
+        ttk.Label(search_frame, text="Search by ID or Name:").pack(side=tk.LEFT)
         # Entry widget for entering the search term (employee ID)
         search_entry = ttk.Entry(search_frame)
         search_entry.pack(side=tk.LEFT, padx=10)
@@ -178,6 +407,12 @@ class EventManagementApp(tk.Tk):
 
     def find_employee(self, emp_id):
         # Attempt to convert input to an integer, catch ValueError if input is not a valid integer
+        if not emp_id.strip().isdigit():
+            # Not a number, so look the employee up by name instead
+            emp_id = self.find_by_name('employees', 'name', emp_id)
+            if emp_id is None:
+                messagebox.showinfo("Not Found", "No employee with that name.")
+                return
         try:
             emp_id = int(emp_id)
             # Check if employee ID exists in the employee dictionary
@@ -235,15 +470,19 @@ class EventManagementApp(tk.Tk):
 
         # Define the columns for the Treeview widget that will display the employee list
         columns = ("ID", "Name", "Department", "Job Title", "Salary")
-        self.employee_table = ttk.Treeview(self.employee_list_frame, columns=columns, show="headings")
+        self.employee_table = VirtualTreeview(self.employee_list_frame, columns=columns, show="headings")
         # Configure each column's heading and width
         for col in columns:
             self.employee_table.heading(col, text=col)
             self.employee_table.column(col, width=100)
-        # Pack the Treeview widget into the employee list frame
+        # Pack the Treeview widget and its scrollbar into the employee list frame
+        self.employee_table.scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
         self.employee_table.pack(fill=tk.BOTH, expand=True, pady=10)
         # Populate the employee table with data
         self.populate_employee_table()
+        self.add_sort_controls(self.employee_list_frame, 'employees', self.employee_table, {
+            "Name": 'name', "Department": 'department', "Job Title": 'job_title', "Salary": 'salary'},
+            self.populate_employee_table).pack(fill=tk.X, before=self.employee_table.scrollbar)
 
         # Add buttons for modifying and deleting selected employees, and for initiating a search
         ttk.Button(self.employee_list_frame, text="Modify Selected", command=self.modify_selected_employee).pack(
@@ -254,13 +493,12 @@ class EventManagementApp(tk.Tk):
                                                                                                            padx=10)
 
     def populate_employee_table(self):
-        # Clear existing entries in the employee table
-        for i in self.employee_table.get_children():
-            self.employee_table.delete(i)
-        # Insert new entries into the employee table
-        for emp_id, emp in self.employees.items():
-            self.employee_table.insert('', 'end', iid=emp_id,
-                                       values=(emp.ID, emp.name, emp.department, emp.job_title, emp.salary))
+        # Hand the employee keys to the table, rows are only created for the part on screen
+        self.fill_table(self.employee_table, 'employees', self.employee_row)
+
+    def employee_row(self, emp_id):
+        emp = self.employees[emp_id]
+        return {'values': (emp.ID, emp.name, emp.department, emp.job_title, emp.salary)}
 
     def add_employee_ui(self):
         # Clear any existing UI elements before displaying the form
@@ -290,18 +528,12 @@ class EventManagementApp(tk.Tk):
         ttk.Button(form_frame, text="Cancel", command=self.employee_ui).grid(row=4, column=0)
 
     def save_employee(self, name, department, job_title, salary):
-        # Ensure all fields are filled
-        if not all([name, department, job_title, salary]):
-            messagebox.showerror("Error", "All fields are required")
+        # Create the employee and save it, all fields must be filled
+        try:
+            self.create_employee(name, department, job_title, salary)
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
             return
-
-        # Create a new employee object and add it to the employees dictionary
-        new_employee = Employee(self.employee_id_counter, name, "", "", department, job_title, salary)
-        self.employees[self.employee_id_counter] = new_employee
-        # Increment the employee ID counter for the next addition
-        self.employee_id_counter += 1
-        # Save the updated employees data to a file
-        self.save_data('../final assignmnet /employees.pkl', self.employees)
         # Show a success message and return to the main employee UI
         messagebox.showinfo("Success", "Employee added successfully")
         self.employee_ui()
@@ -319,12 +551,9 @@ class EventManagementApp(tk.Tk):
         if selected_item:
             response = messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this employee?")
             if response:
-                # If confirmed, delete the employee from the dictionary
-                del self.employees[int(selected_item)]
-                # Save the updated employees data to a file
-                self.save_data('../final assignmnet /employees.pkl', self.employees)
-                # Refresh the employee list UI
-                self.employee_list_ui()
+                # If confirmed, delete the employee and record the removal in the journal,
+                # the table drops the row when notified
+                self.remove_record('employees', int(selected_item))
 
     def edit_employee_ui(self, emp_id):
         employee = self.employees[emp_id]
@@ -353,30 +582,26 @@ class EventManagementApp(tk.Tk):
         ttk.Button(form_frame, text="Cancel", command=self.employee_ui).grid(row=4, column=0)
 
     def update_employee(self, emp_id, name, department, job_title, salary):
-        if not all([name, department, job_title, salary]):
-            messagebox.showerror("Error", "All fields are required")
+        try:
+            self.edit_employee(emp_id, name, department, job_title, salary)
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
             return
-
-        employee = self.employees[emp_id]
-        employee.modify(name, department, job_title, salary)
-        self.save_data('../final assignmnet /employees.pkl', self.employees)
         messagebox.showinfo("Success", "Employee updated successfully")
         self.employee_ui()
 
     def clear_frame(self):
-        # Destroy all widgets that are children of the current Tkinter window
-        for widget in self.winfo_children():
-            widget.destroy()
+        # Hide the current screen and destroy the other widgets, e.g. a form, keeping the menu bar and the status bar
+        self.screens.clear()
 
 #--------------------------------------------------------------------------
 
     def client_ui(self):
-        # Clear any existing widgets from the application's main window
-        self.clear_frame()
+        # Show the client management screen, it is only built the first time
+        self.screens.show('clients', self.build_client_ui)
 
-        # Create a new frame for client management and add it to the main window
-        self.client_frame = ttk.Frame(self)
-        self.client_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+    def build_client_ui(self, frame):
+        self.client_frame = frame
 
         # Add a header label to the client management frame
         header_label = ttk.Label(self.client_frame, text="Client Management", font=("Arial", 16, 'bold'))
@@ -418,20 +643,12 @@ class EventManagementApp(tk.Tk):
         ttk.Button(form_frame, text="Cancel", command=self.client_ui).grid(row=5, column=0)
 
     def save_client(self, name, address, contact_details, budget, event_type):
-        if not all([name, address, contact_details, budget]):
-            messagebox.showerror("Error", "All fields are required")
-            return
-
         try:
-            new_client = Client(self.client_id_counter, name, address, contact_details, float(budget))
-            new_client.add_event(event_type)  # event_type is properly received
-            self.clients[self.client_id_counter] = new_client
-            self.client_id_counter += 1
-            self.save_data('../final assignmnet /clients.pkl', self.clients)
+            self.create_client(name, address, contact_details, budget, event_type)
             messagebox.showinfo("Success", "Client added successfully")
             self.client_ui()
-        except ValueError:
-            messagebox.showerror("Error", "Invalid budget. Please enter a numeric value.")
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
 
     def client_list_ui(self):
         # If a client list frame already exists, destroy it to refresh the content
@@ -444,15 +661,20 @@ class EventManagementApp(tk.Tk):
 
         # Define the columns for the Treeview widget that will display the client list
         columns = ("ID", "Name", "Address", "Contact Details", "Budget", "Events")
-        self.client_table = ttk.Treeview(self.client_list_frame, columns=columns, show="headings")
+        self.client_table = VirtualTreeview(self.client_list_frame, columns=columns, show="headings")
         # Configure each column's heading and width
         for col in columns:
             self.client_table.heading(col, text=col)
             self.client_table.column(col, width=100)
-        # Pack the Treeview widget into the client list frame
+        # Pack the Treeview widget and its scrollbar into the client list frame
+        self.client_table.scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
         self.client_table.pack(fill=tk.BOTH, expand=True, pady=10)
         # Populate the client table with data
         self.populate_client_table()
+        self.add_filter_entry(self.client_list_frame, 'clients', self.client_table, self.client_row)
+        self.add_sort_controls(self.client_list_frame, 'clients', self.client_table, {
+            "Name": 'name', "Budget": 'budget'},
+            self.populate_client_table).pack(fill=tk.X, before=self.client_table.scrollbar)
 
         # Add buttons for modifying and deleting selected clients
         ttk.Button(self.client_list_frame, text="Modify Selected", command=self.modify_selected_client).pack(
@@ -464,20 +686,19 @@ class EventManagementApp(tk.Tk):
 
     def search_client_ui(self):
         # This method will be triggered by the 'Search Selected' button
-        client_id = simpledialog.askstring("Search Client", "Enter Client ID:")
+        client_id = simpledialog.askstring("Search Client", "Enter Client ID or Name:")
         if client_id:
             self.find_client(client_id)
         else:
             messagebox.showinfo("Search", "No ID entered.")
 
     def populate_client_table(self):
-        for i in self.client_table.get_children():
-            self.client_table.delete(i)
-        for client_id, client in self.clients.items():
-            event_types = ", ".join([event.name for event in client.events])
-            self.client_table.insert('', 'end', iid=client_id,
-                                     values=(client.ID, client.name, client.address, client.contact, client.budget,
-                                             event_types))
+        self.fill_table(self.client_table, 'clients', self.client_row)
+
+    def client_row(self, client_id):
+        client = self.clients[client_id]
+        event_types = ", ".join([event.name for event in client.events])
+        return {'values': (client.ID, client.name, client.address, client.contact, client.budget, event_types)}
 
     def modify_selected_client(self):
         selected_item = self.client_table.focus()
@@ -490,26 +711,15 @@ class EventManagementApp(tk.Tk):
         if selected_item:
             response = messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this client?")
             if response:
-                del self.clients[int(selected_item)]
-                self.save_data('../final assignmnet /clients.pkl', self.clients)
-                self.client_list_ui()
+                self.remove_record('clients', int(selected_item))
 
     def update_client(self, client_id, name, address, contact_details, budget):
-        if not all([name, address, contact_details, budget]):
-            messagebox.showerror("Error", "All fields are required")
-            return
-
         try:
-            client = self.clients[client_id]
-            client.name = name
-            client.address = address
-            client.contact = contact_details
-            client.budget = float(budget)  # Ensure conversion to float
-            self.save_data('../final assignmnet /clients.pkl', self.clients)
+            self.edit_client(client_id, name, address, contact_details, budget)
             messagebox.showinfo("Success", "Client updated successfully")
             self.client_ui()  # Refresh the client UI
-        except ValueError:
-            messagebox.showerror("Error", "Invalid input for budget. Please enter a numeric value.")
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
 
     def edit_client_ui(self, client_id):
         client = self.clients[client_id]
@@ -541,6 +751,12 @@ class EventManagementApp(tk.Tk):
         ttk.Button(form_frame, text="Cancel", command=self.client_ui).grid(row=4, column=0)
 
     def find_client(self, client_id):
+        if not client_id.strip().isdigit():
+            # Not a number, so look the client up by name instead
+            client_id = self.find_by_name('clients', 'name', client_id)
+            if client_id is None:
+                messagebox.showinfo("Not Found", "No client with that name.")
+                return
         try:
             client_id = int(client_id)
             if client_id in self.clients:
@@ -551,13 +767,11 @@ class EventManagementApp(tk.Tk):
             messagebox.showerror("Error", "Invalid ID. Please enter a numeric ID.")
 #----------------------------------------------------------------------------------
     def supplier_ui(self):
-        # Check and reinitialize if necessary
-        if hasattr(self, 'supplier_frame') and self.supplier_frame.winfo_exists():
-            self.clear_frame()
-        else:
-            self.supplier_frame = ttk.Frame(self)
-            self.supplier_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        # Show the supplier management screen, it is only built the first time
+        self.screens.show('suppliers', self.build_supplier_ui)
 
+    def build_supplier_ui(self, frame):
+        self.supplier_frame = frame
 
         # Add a header label to the supplier management frame
         header_label = ttk.Label(self.supplier_frame, text="Supplier Management", font=("Arial", 16, 'bold'))
@@ -568,22 +782,11 @@ class EventManagementApp(tk.Tk):
 
         self.supplier_list_ui()
 
-    def clear_frame(self):
-        for widget in self.supplier_frame.winfo_children():
-            widget.destroy()
-
     def add_supplier_ui(self):
-        self.clear_frame()  # Clear only the child widgets inside supplier_frame
-
-        # Reinitialize supplier_frame if it has been destroyed or does not exist
-        if not hasattr(self, 'supplier_frame') or not self.supplier_frame.winfo_exists():
-            self.supplier_frame = ttk.Frame(self)
-            self.supplier_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-        print(f"Supplier Frame Exists: {'Yes' if self.supplier_frame.winfo_exists() else 'No'}")
+        self.clear_frame()  # Hide the supplier screen while the form is shown
 
-        # Create a new frame inside supplier_frame to hold form widgets
-        form_frame = ttk.Frame(self.supplier_frame)
+        # Create a new frame to hold form widgets
+        form_frame = ttk.Frame(self)
         form_frame.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
 
 
@@ -613,51 +816,16 @@ class EventManagementApp(tk.Tk):
         ttk.Button(form_frame, text="Cancel", command=self.supplier_ui).grid(row=7, column=0, sticky="w")
 
     def save_supplier(self, name, address, contact_details, max_guests, min_guests, event_type_str):
+        # Check the form and save the new supplier to the journal
         try:
-            max_guests = int(max_guests)
-            min_guests = int(min_guests)
-        except ValueError:
-            messagebox.showerror("Error", "Max Guests and Min Guests must be numbers")
-            return
-
-        if not all([name, address, contact_details, max_guests, min_guests, event_type_str]):
-            messagebox.showerror("Error", "All fields are required")
-            return
-
-        # Validate the event type
-        try:
-            event_type = EventType[event_type_str]
-        except KeyError:
-            messagebox.showerror("Error", "Invalid Event Type")
+            self.create_supplier(name, address, contact_details, max_guests, min_guests, event_type_str)
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
             return
 
-        # Create or update the Supplier object
-        supplier_id = self.get_next_supplier_id()  #  a method to generate unique IDs or handle existing ones
-        new_supplier = Supplier(supplier_id, name, address, contact_details, [event_type], min_guests, max_guests)
-
-        # Save or update the supplier in a collection
-        self.suppliers[supplier_id] = new_supplier  # self.suppliers is a dictionary
-
-        # Save to file or database if needed
-        # self.save_to_database(new_supplier)  # This is an example placeholder
-
-        # Notify user of success
+        # Notify user of success, the supplier list already has the new row
         messagebox.showinfo("Success", "Supplier saved successfully")
 
-        # Refresh the UI
-        self.populate_supplier_table()  # Refresh the supplier list UI
-
-    def get_next_supplier_id(self):
-        # Print keys for debugging purposes
-        print(self.suppliers.keys())
-
-        # Conversion to integers ensuring all keys are numeric
-        int_keys = [int(k) for k in self.suppliers.keys() if isinstance(k, int) or (isinstance(k, str) and k.isdigit())]
-
-        # Find the maximum integer key and add 1 to generate the next ID
-        next_id = max(int_keys, default=0) + 1
-        return next_id
-
     def supplier_list_ui(self):
 
         if hasattr(self, 'supplier_list_frame'):
@@ -669,18 +837,23 @@ class EventManagementApp(tk.Tk):
 
         # Define the columns for the Treeview widget that will display the supplier list
         columns = ("ID", "Name", "Event Type", "Address", "Contact Details", "Min Guests", "Max Guests")
-        self.supplier_table = ttk.Treeview(self.supplier_list_frame, columns=columns, show="headings")
+        self.supplier_table = VirtualTreeview(self.supplier_list_frame, columns=columns, show="headings")
 
         # Configure each column's heading and width
         for col in columns:
             self.supplier_table.heading(col, text=col)
             self.supplier_table.column(col, width=100)
 
-        # Pack the Treeview widget into the supplier list frame
+        # Pack the Treeview widget and its scrollbar into the supplier list frame
+        self.supplier_table.scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
         self.supplier_table.pack(fill=tk.BOTH, expand=True, pady=10)
 
         # Populate the supplier table with data
         self.populate_supplier_table()
+        self.add_filter_entry(self.supplier_list_frame, 'suppliers', self.supplier_table, self.supplier_row)
+        self.add_sort_controls(self.supplier_list_frame, 'suppliers', self.supplier_table, {
+            "Name": 'name', "Event Type": 'event_type', "Min Guests": 'min_guests', "Max Guests": 'max_guests'},
+            self.populate_supplier_table).pack(fill=tk.X, before=self.supplier_table.scrollbar)
 
         # Add buttons for modifying and deleting selected suppliers
         ttk.Button(self.supplier_list_frame, text="Modify Selected", command=self.modify_selected_supplier).pack(
@@ -736,24 +909,23 @@ class EventManagementApp(tk.Tk):
         self.populate_supplier_table()
 
     def populate_supplier_table(self):
-        for i in self.supplier_table.get_children():
-            self.supplier_table.delete(i)
+        self.fill_table(self.supplier_table, 'suppliers', self.supplier_row, self.complete_suppliers)
 
-        for supplier_id, supplier in self.suppliers.items():
+    def complete_suppliers(self, suppliers):
+        supplier_ids = []
+        for supplier_id, supplier in suppliers.items():
             # Ensure all necessary attributes are present and correct type
             if not all(hasattr(supplier, attr) for attr in ['min_guests', 'max_guests', 'event_type']):
-                print(f"Error: Supplier {supplier_id} is missing required attributes.")
                 continue
+            supplier_ids.append(supplier_id)
+        return supplier_ids
 
-            print(
-                f"Supplier {supplier_id} loaded with event_type={supplier.event_type}, min_guests={supplier.min_guests}, max_guests={supplier.max_guests}")
-            
-            event_type_name = ', '.join([et.name for et in supplier.event_type]) if isinstance(supplier.event_type,
-                                                                                               list) else supplier.event_type.name
-            self.supplier_table.insert('', 'end', iid=supplier_id,
-                                       values=(supplier_id, supplier.name, event_type_name,
-                                               supplier.address, supplier.contact_details, supplier.min_guests,
-                                               supplier.max_guests))
+    def supplier_row(self, supplier_id):
+        supplier = self.suppliers[supplier_id]
+        event_type_name = ', '.join([et.name for et in supplier.event_type]) if isinstance(supplier.event_type,
+                                                                                           list) else supplier.event_type.name
+        return {'values': (supplier_id, supplier.name, event_type_name, supplier.address, supplier.contact_details,
+                           supplier.min_guests, supplier.max_guests)}
 
     def modify_selected_supplier(self):
         selected_item = self.supplier_table.focus()  # Get the selected supplier
@@ -766,49 +938,22 @@ class EventManagementApp(tk.Tk):
         if selected_item:
             confirmation = messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this supplier?")
             if confirmation:
-                del self.suppliers[int(selected_item)]  # Remove the selected supplier
-                self.save_data('../final assignmnet /suppliers.pkl', self.suppliers)  # Save the updated supplier list
-                self.supplier_list_ui()  # Refresh the supplier list UI
+                self.remove_record('suppliers', int(selected_item))  # Remove the supplier and journal the removal
 
     def search_supplier_ui(self):
-        search_id = simpledialog.askinteger("Search Supplier", "Enter Supplier ID:")
-        if search_id in self.suppliers:
-            self.edit_supplier_ui(search_id)  # Edit the supplier if found
-        else:
-            messagebox.showinfo("Search Result", "Supplier with ID {} not found.".format(search_id))
+        search_text = simpledialog.askstring("Search Supplier", "Enter Supplier ID or Name:")
+        if search_text:
+            self.find_supplier(search_text)  # Edit the supplier if found
 
     def update_supplier(self, supplier_id, name, address, contact_details, event_type_str, min_guests, max_guests):
+        # Check the form and save the changed supplier to the journal
         try:
-            # Convert min and max guests to integers
-            min_guests = int(min_guests)
-            max_guests = int(max_guests)
-        except ValueError:
-            messagebox.showerror("Error", "Min and Max Guests must be valid numbers")
-            return
-
-        try:
-            # Attempt to convert event type string to EventType
-            event_type = EventType[event_type_str]
-        except KeyError:
-            messagebox.showerror("Error", "Invalid service or event type")
-            return
-
-        if not all([name, address, contact_details, event_type_str, min_guests, max_guests]):
-            messagebox.showerror("Error", "All fields are required")
+            self.edit_supplier(supplier_id, name, address, contact_details, event_type_str, min_guests, max_guests)
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
             return
-
-        # Update the supplier details
-        supplier = self.suppliers[supplier_id]
-        supplier.name = name
-        supplier.address = address
-        supplier.contact_details = contact_details
-        supplier.event_type = event_type
-        supplier.min_guests = min_guests
-        supplier.max_guests = max_guests
-
-        # Optionally, save to a file or database
         messagebox.showinfo("Success", "Supplier updated successfully")
-        self.supplier_list_ui()  # Refresh UI
+        self.supplier_ui()  # Back to the list, which already shows the change
 
     # Ensure you bind ComboBox selection properly
     def save_changes(self):
@@ -862,6 +1007,12 @@ class EventManagementApp(tk.Tk):
         ttk.Button(form_frame, text="Cancel", command=self.supplier_list_ui).grid(row=6, column=0, sticky="w")
 
     def find_supplier(self, supplier_id):
+        if not str(supplier_id).strip().isdigit():
+            # Not a number, so look the supplier up by name instead
+            supplier_id = self.find_by_name('suppliers', 'name', supplier_id)
+            if supplier_id is None:
+                messagebox.showinfo("Not Found", "No supplier with that name.")
+                return
         try:
             supplier_id = int(supplier_id)
             if supplier_id in self.suppliers:
@@ -875,9 +1026,11 @@ class EventManagementApp(tk.Tk):
     #----------------------------------
 
     def guests_ui(self):
-        self.clear_frame()
-        self.guest_frame = ttk.Frame(self)
-        self.guest_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        # Show the guest screen, it is only built the first time
+        self.screens.show('guests', self.build_guests_ui)
+
+    def build_guests_ui(self, frame):
+        self.guest_frame = frame
 
         # Guest Sign-Up Section
         ttk.Label(self.guest_frame, text="Name:").grid(row=0, column=0)
@@ -895,6 +1048,7 @@ class EventManagementApp(tk.Tk):
         ttk.Label(self.guest_frame, text="Total Cost:").grid(row=3, column=0)
         total_cost_entry = ttk.Entry(self.guest_frame)
         total_cost_entry.grid(row=3, column=1)
+        self.guest_entries = (name_entry, email_entry, phone_number_entry, total_cost_entry)
 
 
         # Hidden till sign up is clicked
@@ -911,13 +1065,16 @@ class EventManagementApp(tk.Tk):
                                                                                                       pady=10)
 
         # Search functionality (with entry and button)
-        ttk.Label(self.guest_frame, text="Search by ID:").grid(row=7, column=0)
+        ttk.Label(self.guest_frame, text="Search by ID or Name:").grid(row=7, column=0)
         search_entry = ttk.Entry(self.guest_frame)
         search_entry.grid(row=7, column=1, sticky='we')
 
         ttk.Button(self.guest_frame, text="Search", command=lambda: self.search_guest_by_id(search_entry.get())).grid(
             row=8, column=1, pady=10)
 
+        # Recalculate the cost of every guest registered with an event type and services
+        ttk.Button(self.guest_frame, text="Re-price Guests", command=self.reprice_guests_ui).grid(row=8, column=0, pady=10)
+
 
         # Update the 'Save' button command to include the total cost entry
         ttk.Button(
@@ -928,7 +1085,7 @@ class EventManagementApp(tk.Tk):
         ).grid(row=4, column=1, pady=10)
 
         # This part seems correct, but ensure the widths are set to accommodate the data.
-        self.guest_list = ttk.Treeview(self.guest_frame, columns=("Name", "Email", "Phone Number", "Total Cost"))
+        self.guest_list = VirtualTreeview(self.guest_frame, columns=("Name", "Email", "Phone Number", "Total Cost"))
         self.guest_list.heading("#0", text="ID")
         self.guest_list.column("#0", width=50)
 
@@ -938,28 +1095,33 @@ class EventManagementApp(tk.Tk):
             self.guest_list.column(col, width=120)  # Adjust width as needed
 
         self.guest_list.grid(row=5, columnspan=2, sticky='nsew')
+        self.guest_list.scrollbar.grid(row=5, column=2, sticky='ns')
 
         # Populate the Treeview with guest data
         self.populate_guest_list()
+        self.add_sort_controls(self.guest_frame, 'guests', self.guest_list, {
+            "Name": 'name', "Email": 'email', "Total Cost": 'total_cost'},
+            self.populate_guest_list).grid(row=9, column=0, columnspan=3, sticky='w')
 
         # At the end of guests_ui method after the Treeview is created.
         self.guest_list.bind("<<TreeviewSelect>>", self.on_guest_select)
 
+        # Narrow the list while typing in the search box, the Search button still opens the exact match
+        search_entry.bind("<KeyRelease>", lambda event: self.filter_list(
+            'guests', self.guest_list, self.guest_row, search_entry.get()))
+
     def populate_guest_list(self):
-        # Clear the current view
-        for item in self.guest_list.get_children():
-            self.guest_list.delete(item)
-
-        # Populate the Treeview with updated guest data
-        for guest_id, guest_info in self.guests.items():
-            # Provide a default total cost if it doesn't exist
-            total_cost = guest_info.get("Total Cost", "0")  # Default to "0" if not present
-            self.guest_list.insert("", 'end', iid=guest_id, text=guest_id, values=(
-                guest_info["Name"],
-                guest_info["Email"],
-                guest_info["Phone Number"],
-                f"${total_cost}"  # Display the total cost
-            ))
+        # Hand the guest keys to the Treeview, rows are only created for the part on screen
+        self.fill_table(self.guest_list, 'guests', self.guest_row)
+
+    def guest_row(self, guest_id):
+        guest = self.guests[guest_id]
+        return {'text': guest_id, 'values': (
+            guest.name,
+            guest.email,
+            guest.phone_number,
+            f"${guest.total_cost}"  # Display the total cost
+        )}
 
     def delete_selected_guest(self):
         selected_item = self.guest_list.selection()
@@ -968,27 +1130,13 @@ class EventManagementApp(tk.Tk):
             # Ask for confirmation before deleting
             response = messagebox.askyesno("Confirm Delete", "Are you sure you want to delete the selected guest?")
             if response:  # If the user clicks 'Yes', proceed with deletion
-                self.guest_list.delete(selected_item)
-                del self.guests[selected_item]  # Remove from your data structure
-                self.save_data('../final assignmnet /guests.pkl', self.guests)  # Save the updated data
+                self.remove_record('guests', selected_item)  # Remove and journal it, the Treeview drops the row
         else:
             messagebox.showerror("Error", "No guest selected for deletion.")
 
-    def add_guests_ui(self, name, email, phone_number, total_cost):
-        guest_id = str(self.guest_id_counter)
-        self.guests[guest_id] = {
-            "Name": name,
-            "Email": email,
-            "Phone Number": phone_number,
-            "Total Cost": total_cost  # Include total cost in guest info
-        }
-        self.guest_id_counter += 1
-
-
-        # Save the updated guests dictionary to a .pkl file
-        self.save_data('../final assignmnet /guests.pkl', self.guests)
-
-        self.populate_guest_list()
+    def add_guests_ui(self, name, email, phone_number, total_cost, event_type=None, services=None):
+        # Save the new guest to the journal, the Treeview adds the row when notified
+        self.create_guest(name, email, phone_number, total_cost, event_type, services)
 
         # Display success message to the user
         messagebox.showinfo("Success", f"{name} has been registered successfully!")
@@ -996,6 +1144,9 @@ class EventManagementApp(tk.Tk):
     def search_guest_by_id(self, guest_id):
         try:
             guest_id_str = str(guest_id)  # Convert to string if your IDs are strings
+            if guest_id_str not in self.guests:
+                # Not a known ID, so try the guest's name instead
+                guest_id_str = self.find_by_name('guests', 'name', guest_id_str) or guest_id_str
             guest_info = self.guests.get(guest_id_str)
 
             if guest_info:
@@ -1007,10 +1158,10 @@ class EventManagementApp(tk.Tk):
                 # Construct the info message including the total cost
                 info_message = (
                     f"ID: {guest_id_str}\n"
-                    f"Name: {guest_info['Name']}\n"
-                    f"Email: {guest_info['Email']}\n"
-                    f"Phone Number: {guest_info['Phone Number']}\n"
-                    f"Total Cost: {guest_info.get('Total Cost', 'N/A')}"  # Use get to avoid KeyError
+                    f"Name: {guest_info.name}\n"
+                    f"Email: {guest_info.email}\n"
+                    f"Phone Number: {guest_info.phone_number}\n"
+                    f"Total Cost: {guest_info.total_cost or 'N/A'}"
                 )
 
                 # Display the guest's information in a message box
@@ -1042,110 +1193,94 @@ class EventManagementApp(tk.Tk):
         ttk.Label(edit_window, text="Name:").grid(row=0, column=0)
         name_entry = ttk.Entry(edit_window)
         name_entry.grid(row=0, column=1)
-        name_entry.insert(0, guest_info["Name"])
+        name_entry.insert(0, guest_info.name)
 
         ttk.Label(edit_window, text="Email:").grid(row=1, column=0)
         email_entry = ttk.Entry(edit_window)
         email_entry.grid(row=1, column=1)
-        email_entry.insert(0, guest_info["Email"])
+        email_entry.insert(0, guest_info.email)
 
         ttk.Label(edit_window, text="Phone Number:").grid(row=2, column=0)
         phone_entry = ttk.Entry(edit_window)
         phone_entry.grid(row=2, column=1)
-        phone_entry.insert(0, guest_info["Phone Number"])
+        phone_entry.insert(0, guest_info.phone_number)
 
         ttk.Label(edit_window, text="Total Cost:").grid(row=3, column=0)
         total_cost_entry = ttk.Entry(edit_window)
         total_cost_entry.grid(row=3, column=1)
-        # Use get with a default value to handle missing 'Total Cost' key
-        total_cost_entry.insert(0, guest_info.get("Total Cost", "0"))
+        total_cost_entry.insert(0, guest_info.total_cost or "0")
 
         def update_guest():
-            # Update guest info in the self.guests dictionary
-            self.guests[selected_item] = {
-                "Name": name_entry.get(),
-                "Email": email_entry.get(),
-                "Phone Number": phone_entry.get(),
-                "Total Cost": total_cost_entry.get()  # Include the total cost
-            }
-
-            # Update the Treeview with the new values including the total cost
-            self.guest_list.item(selected_item, values=(
-                name_entry.get(),
-                email_entry.get(),
-                phone_entry.get(),
-                total_cost_entry.get()  # Add the total cost here
-            ))
+            # Update and save the guest, the Treeview updates its row when notified
+            self.edit_guest(selected_item, name_entry.get(), email_entry.get(), phone_entry.get(),
+                            total_cost_entry.get())
 
             # Close the edit window
             edit_window.destroy()
 
-            # Save the updated data to the .pkl file
-            self.save_data('../final assignmnet /guests.pkl', self.guests)
-
         # Button to save changes
         save_button = ttk.Button(edit_window, text="Save Changes", command=update_guest)
         save_button.grid(row=4, column=1, sticky=tk.W)  # Change the row to 4 to avoid overlapping with entries
 
-    def calculate_guest_ui(self, name, email, phone_number):
+    def calculate_guest_ui(self, name, email, phone_number, total_cost=None):
         self.clear_frame()  # Clear existing widgets
-        self.guest_frame = ttk.Frame(self)  # Recreate the frame
-        self.guest_frame.pack(fill="both", expand=True)
+        quote_frame = ttk.Frame(self)  # The guest screen is kept hidden until Back
+        quote_frame.pack(fill="both", expand=True)
 
-        lblEvent = ttk.Label(self.guest_frame, text=f"{name}, select your event type:")
+        lblEvent = ttk.Label(quote_frame, text=f"{name}, select your event type:")
         lblEvent.grid(column=0, row=0, sticky='W')
-        self.event_type = ttk.Combobox(self.guest_frame, values=["Wedding", "Birthday", "Themed Party", "Graduation"])
+        self.event_type = ttk.Combobox(quote_frame, values=["Wedding", "Birthday", "Themed Party", "Graduation"])
         self.event_type.grid(column=1, row=0, sticky='W')
 
-        lblServices = ttk.Label(self.guest_frame, text="Choose additional services:")
+        lblServices = ttk.Label(quote_frame, text="Choose additional services:")
         lblServices.grid(column=0, row=1, sticky='W')
-        self.chkCatering = ttk.Checkbutton(self.guest_frame, text="Catering ($200)")
+        self.chkCatering = ttk.Checkbutton(quote_frame, text="Catering ($200)")
         self.chkCatering.grid(column=1, row=1, sticky='W')
-        self.chkCleaning = ttk.Checkbutton(self.guest_frame, text="Cleaning ($100)")
+        self.chkCleaning = ttk.Checkbutton(quote_frame, text="Cleaning ($100)")
         self.chkCleaning.grid(column=1, row=2, sticky='W')
-        self.chkDecorations = ttk.Checkbutton(self.guest_frame, text="Decorations ($150)")
+        self.chkDecorations = ttk.Checkbutton(quote_frame, text="Decorations ($150)")
         self.chkDecorations.grid(column=1, row=3, sticky='W')
 
-        btnCalculate = ttk.Button(self.guest_frame, text="Calculate Cost", command=lambda: self.calculate_cost(name))
+        btnCalculate = ttk.Button(quote_frame, text="Calculate Cost", command=lambda: self.calculate_cost(name))
         btnCalculate.grid(column=1, row=4)
 
-    def calculate_cost(self, name):
-        base_prices = {
-            "Wedding": 1000,
-            "Birthday": 500,
-            "Themed Party": 750,
-            "Graduation": 600
-        }
-        cost = base_prices.get(self.event_type.get(), 0)
-        if self.chkCatering.instate(['selected']):
-            cost += 200
-        if self.chkCleaning.instate(['selected']):
-            cost += 100
-        if self.chkDecorations.instate(['selected']):
-            cost += 150
+        btnRegister = ttk.Button(quote_frame, text="Register with this Quote",
+                                 command=lambda: self.register_quoted_guest(name, email, phone_number))
+        btnRegister.grid(column=1, row=5)
+        ttk.Button(quote_frame, text="Back", command=self.guests_ui).grid(column=0, row=5)
+
+    def selected_services(self):
+        # Services ticked on the quote screen
+        checks = ((self.chkCatering, ServiceType.CATERING), (self.chkCleaning, ServiceType.CLEANING),
+                  (self.chkDecorations, ServiceType.DECORATIONS))
+        return [service.value for check, service in checks if check.instate(['selected'])]
 
+    def calculate_cost(self, name):
+        cost = pricing.price(self.event_type.get(), self.selected_services())
         messagebox.showinfo("Event Cost", f"{name}, your total cost is ${cost}.")
 
+    def register_quoted_guest(self, name, email, phone_number):
+        # Register the guest with the calculated cost and the quote it came from
+        try:
+            self.quote_guest(name, email, phone_number, self.event_type.get(), self.selected_services())
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
+            return
+        messagebox.showinfo("Success", f"{name} has been registered successfully!")
+        for entry in self.guest_entries:
+            entry.delete(0, tk.END)  # The guest screen is kept, so empty the sign-up form it still shows
+        self.guests_ui()
+
+    def reprice_guests_ui(self):
+        # Price every quoted guest in one batch, then save the changed ones in one journal write
+        changed = self.reprice_guests()
+        messagebox.showinfo("Re-price Guests", f"{len(changed)} guest costs were updated.")
+
     def save_cost(self):
         if hasattr(self, 'selected_guest_id') and self.selected_guest_id:
             try:
-                # Convert the input to a float and then back to a string to format as currency
-                total_cost_value = float(self.total_cost_entry.get())
-                formatted_cost = f"${total_cost_value:.2f}"
-
-                # Update the guests dictionary with the new cost
-                self.guests[self.selected_guest_id]['Total Cost'] = formatted_cost
-
-                # Update the Treeview with the new cost
-                self.guest_list.item(self.selected_guest_id, values=(
-                    self.guests[self.selected_guest_id]["Name"],
-                    self.guests[self.selected_guest_id]["Email"],
-                    self.guests[self.selected_guest_id]["Phone Number"],
-                    formatted_cost
-                ))
-
-                # Save the updated data to the .pkl file
-                self.save_data('../final assignmnet /guests.pkl', self.guests)
+                # Store the cost formatted as currency and save the guest to the journal
+                self.set_guest_cost(self.selected_guest_id, self.total_cost_entry.get())
                 messagebox.showinfo("Success", "The total cost has been saved.")
             except ValueError:
                 messagebox.showerror("Error", "Invalid cost. Please enter a numeric value.")
@@ -1157,15 +1292,12 @@ class EventManagementApp(tk.Tk):
         if selected:
             self.selected_guest_id = selected[0]
 
-    def clear_frame(self):
-        for widget in self.winfo_children():
-            widget.destroy()
-
-
     def event_ui(self):
-        self.clear_frame()
-        self.event_frame = ttk.Frame(self)
-        self.event_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        # Show the event screen, it is only built the first time
+        self.screens.show('events', self.build_event_ui)
+
+    def build_event_ui(self, frame):
+        self.event_frame = frame
 
         # Add labels and entry widgets for event details
         ttk.Label(self.event_frame, text="Event Type:").grid(row=0, column=0, sticky=tk.W)
@@ -1197,22 +1329,26 @@ class EventManagementApp(tk.Tk):
                                                                                                    pady=5)
 
         # Add search functionality
-        ttk.Label(self.event_frame, text="Search by Event ID:").grid(row=7, column=0, sticky=tk.W)
+        ttk.Label(self.event_frame, text="Search by Event ID or Client:").grid(row=7, column=0, sticky=tk.W)
         self.search_event_entry = ttk.Entry(self.event_frame)
         self.search_event_entry.grid(row=7, column=1)
         ttk.Button(self.event_frame, text="Search", command=self.search_event).grid(row=7, column=2, padx=5)
 
         # Initialize the Treeview for the events list
-        self.event_list = ttk.Treeview(self.event_frame, columns=("Event Type", "Date", "Client", "Venue"))
+        self.event_list = VirtualTreeview(self.event_frame, columns=("Event Type", "Date", "Client", "Venue"))
         self.event_list.heading("#0", text="Event ID")
         self.event_list.column("#0", width=80)
         for col in ("Event Type", "Date", "Client", "Venue"):
             self.event_list.heading(col, text=col)
             self.event_list.column(col, width=120)
         self.event_list.grid(row=8, column=0, columnspan=3, sticky='nsew')
+        self.event_list.scrollbar.grid(row=8, column=3, sticky='ns')
 
         # Populate the Treeview with event data
         self.populate_event_list()
+        self.add_sort_controls(self.event_frame, 'events', self.event_list, {
+            "Event Type": 'event_type', "Date": 'date', "Client": 'client', "Venue": 'venue'},
+            self.populate_event_list).grid(row=9, column=0, columnspan=3, sticky='w')
 
         # Bind the selection change event to a handler
         self.event_list.bind("<<TreeviewSelect>>", self.on_event_select)
@@ -1224,25 +1360,11 @@ class EventManagementApp(tk.Tk):
         client_name = self.client_name_entry.get()
         venue = self.venue_entry.get()
 
-
-
-        # Generate a new unique event ID
-        event_id = str(self.event_id_counter)
-
-
-        # Create a new event dictionary
-        new_event = {
-            'Event Type': event_type,
-            'Date': date,
-            'Client': client_name,
-            'Venue': venue
-        }
-
-        # Add the new event to the events dictionary
-        self.events[event_id] = new_event
-
-        # Update the list displayed to the user
-        self.populate_event_list()
+        # Add the event, refusing a second event at the same venue on the same day
+        try:
+            self.create_event(event_type, date, client_name, venue)
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
 
     def modify_event(self):
         # Get the selected item in the Treeview
@@ -1251,21 +1373,16 @@ class EventManagementApp(tk.Tk):
             selected_item = selected_item[0]
 
             # Gather details from the entry fields
-            event_type = self.event_type_entry.get()
+            event_type = EventType[self.event_type_entry.get()]
             date = self.event_date_entry.get()
             client_name = self.client_name_entry.get()
             venue = self.venue_entry.get()
 
-            # Update the event details in the events dictionary
-            self.events[selected_item] = {
-                'Event Type': event_type,
-                'Date': date,
-                'Client': client_name,
-                'Venue': venue
-            }
-
-            # Update the list displayed to the user
-            self.populate_event_list()
+            # Update the event, refusing to move it onto a day its venue is already booked
+            try:
+                self.edit_event(selected_item, event_type, date, client_name, venue)
+            except ValueError as error:
+                messagebox.showerror("Error", str(error))
         else:
             messagebox.showerror("Error", "No event selected for modification.")
 
@@ -1279,23 +1396,24 @@ class EventManagementApp(tk.Tk):
             response = messagebox.askyesno("Confirm Delete", "Are you sure you want to delete the selected event?")
             if response:
                 # Delete the event from the events dictionary
-                del self.events[selected_item]
-
-                # Update the list displayed to the user
-                self.populate_event_list()
+                self.remove_record('events', selected_item)
         else:
             messagebox.showerror("Error", "No event selected for deletion.")
 
     def search_event(self):
         # Get the event ID from the search entry
         event_id = self.search_event_entry.get()
+        if event_id not in self.events:
+            # Not a known ID, so try the client's name instead
+            event_id = self.find_by_name('events', 'client', event_id) or event_id
 
         # Find the event by ID
         event = self.events.get(event_id)
 
         if event:
             # Prepare the event information to be displayed
-            event_details = "\n".join(f"{key}: {value}" for key, value in event.items())
+            event_details = (f"Event Type: {event.event_type.name}\nDate: {event.date}\n"
+                             f"Client: {event.client}\nVenue: {event.venue}")
 
             # Display a message box with the event details
             messagebox.showinfo("Event Details", f"Event ID {event_id} found:\n\n{event_details}")
@@ -1312,18 +1430,17 @@ class EventManagementApp(tk.Tk):
             messagebox.showerror("Error", f"Event ID {event_id} not found.")
 
     def populate_event_list(self):
-        # Clear the current view
-        for item in self.event_list.get_children():
-            self.event_list.delete(item)
-
-        # Populate the Treeview with the events from the events dictionary
-        for event_id, event in self.events.items():
-            self.event_list.insert("", 'end', iid=event_id, text=event_id, values=(
-                event['Event Type'].name,  # This now uses the name attribute of the enum
-                event['Date'],
-                event['Client'],
-                event['Venue']
-            ))
+        # Hand the event keys to the Treeview, rows are only created for the part on screen
+        self.fill_table(self.event_list, 'events', self.event_row)
+
+    def event_row(self, event_id):
+        event = self.events[event_id]
+        return {'text': event_id, 'values': (
+            event.event_type.name,  # This now uses the name attribute of the enum
+            event.date,
+            event.client,
+            event.venue
+        )}
 
     def on_event_select(self, event):
         # Get the selected item's ID
@@ -1334,25 +1451,20 @@ class EventManagementApp(tk.Tk):
             # Get the event details and populate the entry fields for editing
             event = self.events[selected_item]
             self.event_type_entry.delete(0, tk.END)
-            self.event_type_entry.insert(0, event['Event Type'])
+            self.event_type_entry.insert(0, event.event_type.name)
             self.event_date_entry.delete(0, tk.END)
-            self.event_date_entry.insert(0, event['Date'])
+            self.event_date_entry.insert(0, event.date)
             self.client_name_entry.delete(0, tk.END)
-            self.client_name_entry.insert(0, event['Client'])
+            self.client_name_entry.insert(0, event.client)
             self.venue_entry.delete(0, tk.END)
-            self.venue_entry.insert(0, event['Venue'])
-
-        def clear_frame(self):
-            # This method will destroy all the widgets in the current frame
-            for widget in self.event_frame.winfo_children():
-                widget.destroy()
+            self.venue_entry.insert(0, event.venue)
 #-----------------------------------------------------------
     def venue_ui(self):
-        if hasattr(self, 'venue_frame'):
-            self.clear_frame()
-        else:
-            self.venue_frame = ttk.Frame(self)
-            self.venue_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        # Show the venue screen, it is only built the first time
+        self.screens.show('venues', self.build_venue_ui)
+
+    def build_venue_ui(self, frame):
+        self.venue_frame = frame
 
         # Configure column widths (allow the second column to expand)
         self.venue_frame.columnconfigure(1, weight=1)
@@ -1387,14 +1499,14 @@ class EventManagementApp(tk.Tk):
                                                                                                    columnspan=2, pady=5)
 
         # Search UI
-        ttk.Label(self.venue_frame, text="Search Venue ID:").grid(row=10, column=0, sticky=tk.W)
+        ttk.Label(self.venue_frame, text="Search Venue ID or Name:").grid(row=10, column=0, sticky=tk.W)
         self.venue_id_search_entry = ttk.Entry(self.venue_frame)
         self.venue_id_search_entry.grid(row=10, column=1)
         ttk.Button(self.venue_frame, text="Search", command=self.search_venue_by_id).grid(row=10, column=2)
 
 
         # Treeview
-        self.venue_list = ttk.Treeview(self.venue_frame,
+        self.venue_list = VirtualTreeview(self.venue_frame,
                                        columns=("Venue ID", "Name", "Address", "Contact", "Min Guests", "Max Guests"))
         self.venue_list.column("#0", width=0, stretch=tk.NO)
         self.venue_list.heading("#0", text="")
@@ -1402,9 +1514,42 @@ class EventManagementApp(tk.Tk):
             self.venue_list.heading(col, text=col)
             self.venue_list.column(col, width=120)
         self.venue_list.grid(row=9, column=0, columnspan=3, sticky='nsew')  # Make Treeview expand fully
+        self.venue_list.scrollbar.grid(row=9, column=3, sticky='ns')
 
         self.populate_venue_list()
-
+        self.add_sort_controls(self.venue_frame, 'venues', self.venue_list, {
+            "Name": 'name', "Min Guests": 'min_guests', "Max Guests": 'max_guests'},
+            self.populate_venue_list).grid(row=13, column=0, columnspan=3, sticky='w')
+
+        # Free venue search: which venues are not booked on a date and can hold the guests
+        ttk.Label(self.venue_frame, text="Free on (YYYY-MM-DD):").grid(row=11, column=0, sticky=tk.W)
+        self.venue_free_date_entry = ttk.Entry(self.venue_frame)
+        self.venue_free_date_entry.grid(row=11, column=1)
+        ttk.Label(self.venue_frame, text="Number of Guests:").grid(row=12, column=0, sticky=tk.W)
+        self.venue_free_guests_entry = ttk.Entry(self.venue_frame)
+        self.venue_free_guests_entry.grid(row=12, column=1)
+        ttk.Button(self.venue_frame, text="Find Free Venues", command=self.find_free_venues).grid(row=11, column=2)
+
+        # Narrow the list while typing in the search box
+        self.venue_id_search_entry.bind("<KeyRelease>", lambda event: self.filter_list(
+            'venues', self.venue_list, self.venue_row, self.venue_id_search_entry.get()))
+
+
+    def find_free_venues(self):
+        # Show only the venues that are free on the date and fit the number of guests
+        date = self.venue_free_date_entry.get()
+        guests = self.venue_free_guests_entry.get()
+        if not guests.strip().isdigit():
+            messagebox.showerror("Error", "Number of Guests must be a number.")
+            return
+        try:
+            free = self.free_venues(date, guests)
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
+            return
+        self.venue_list.show_collection(self.venues, self.venue_row, free)
+        if not free:
+            messagebox.showinfo("Free Venues", f"No venue is free on {date} for {guests} guests.")
 
     def on_venue_select(self, event):
         # Code to handle venue selection changes
@@ -1419,28 +1564,12 @@ class EventManagementApp(tk.Tk):
         venue_min_guests = self.venue_min_guests_entry.get()
         venue_max_guests = self.venue_max_guests_entry.get()
 
-        # Generate a new unique venue ID by incrementing the last ID used
-        venue_id = str(self.venue_id_counter)
-        self.venue_id_counter += 1
-
-        # Ensure the order of these values matches the columns in the Treeview
-        venue_details = (venue_name, venue_address, venue_contact, venue_min_guests, venue_max_guests)
-
-        new_venue = Venue(venue_id, *venue_details)
-
-        # Add the new venue to the venues dictionary, using venue_id as a string
-        self.venues[venue_id] = new_venue
-
-        # Update the Treeview with the new venue details
-        self.venue_list.insert("", 'end', iid=venue_id,
-                               values=(venue_name, venue_address, venue_contact, venue_min_guests, venue_max_guests))
+        # Add and save the new venue under the next ID, the Treeview adds the row when notified
+        self.create_venue(venue_name, venue_address, venue_contact, venue_min_guests, venue_max_guests)
 
         # Clear the entry fields after adding the venue
         self.clear_venue_entries()
 
-        # Update the list displayed to the user
-        self.populate_venue_list()
-
 
 
 
@@ -1460,6 +1589,9 @@ class EventManagementApp(tk.Tk):
 
     def search_venue_by_id(self):
         search_id = self.venue_id_search_entry.get()
+        if search_id not in self.venues:
+            # Not a known ID, so try the venue's name instead
+            search_id = self.find_by_name('venues', 'name', search_id) or search_id
         venue = self.venues.get(search_id, None)
         if venue:
             # Clear the current selection
@@ -1565,23 +1697,9 @@ class EventManagementApp(tk.Tk):
         self.wait_window(modify_window)
 
     def save_venue_changes(self, venue_id, entries, modify_window):
-        # Fetch the current venue from the dictionary using the existing ID
-        venue = self.venues[venue_id]
-
-        # Update the venue details with information from the entry widgets
-        venue.name = entries['name'].get()
-        venue.address = entries['address'].get()
-        venue.contact = entries['contact'].get()
-        venue.min_guests = entries['minimum_guests'].get()
-        venue.max_guests = entries['maximum_guests'].get()
-
-        # Update the Treeview item; note that the venue ID is not changed here
-        self.venue_list.item(venue_id, values=(venue.name, venue.address,
-                                               venue.contact, venue.min_guests, venue.max_guests))
-
-        # Save changes to the pickle file the key, which is the venue ID, remains unchanged
-        with open('../final assignmnet /venues.pkl', 'wb') as outfile:
-            pickle.dump(self.venues, outfile, pickle.HIGHEST_PROTOCOL)
+        # Update the venue with the entry widgets and save it, the venue ID is not changed here
+        self.edit_venue(venue_id, entries['name'].get(), entries['address'].get(), entries['contact'].get(),
+                        entries['minimum_guests'].get(), entries['maximum_guests'].get())
 
         # Close the modification window
         modify_window.destroy()
@@ -1590,27 +1708,25 @@ class EventManagementApp(tk.Tk):
         selected_venue_id = self.get_selected_venue_id()
         if selected_venue_id and messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this venue?"):
             # Remove the venue from the system
-            if selected_venue_id in self.venues:
-                del self.venues[selected_venue_id]
-                self.populate_venue_list()  # Refresh the UI
+            self.remove_record('venues', selected_venue_id)  # The Treeview drops the row when notified
         else:
             messagebox.showerror("Error", "No venue selected or deletion cancelled.")
 
     def populate_venue_list(self):
-        # Clear the existing entries in the Treeview
-        self.venue_list.delete(*self.venue_list.get_children())
-        # Insert new entries into the Treeview
-        for venue_id, venue in self.venues.items():
-            # Access attributes directly if venue is an instance of a class
-            venue_details = (
-                venue_id,
-                venue.name,  # Accessing name attribute
-                venue.address,  # Accessing address attribute
-                venue.contact,  # Accessing contact attribute
-                venue.min_guests,  # Accessing minimum guests attribute
-                venue.max_guests  # Accessing maximum guests attribute
-            )
-            self.venue_list.insert("", 'end', iid=venue_id, values=venue_details)
+        # Hand the venue keys to the Treeview, rows are only created for the part on screen
+        self.fill_table(self.venue_list, 'venues', self.venue_row)
+
+    def venue_row(self, venue_id):
+        venue = self.venues[venue_id]
+        # Access attributes directly if venue is an instance of a class
+        return {'values': (
+            venue_id,
+            venue.name,  # Accessing name attribute
+            venue.address,  # Accessing address attribute
+            venue.contact,  # Accessing contact attribute
+            venue.min_guests,  # Accessing minimum guests attribute
+            venue.max_guests  # Accessing maximum guests attribute
+        )}
 
     def clear_venue_entries(self):
         self.venue_name_entry.delete(0, 'end')
@@ -1624,4 +1740,8 @@ class EventManagementApp(tk.Tk):
 
 if __name__ == "__main__":
     app = EventManagementApp()
-    app.mainloop()
+    app.protocol("WM_DELETE_WINDOW", app.on_close)
+    try:
+        app.mainloop()
+    finally:
+        app.close()  # Write any changes still queued, however the main loop ended
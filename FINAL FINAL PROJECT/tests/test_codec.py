@@ -0,0 +1,28 @@
+import io
+import os
+import pickle
+import pytest
+from CLASSES import Employee
+from CODEC import load_legacy
+
+
+def test_legacy_records_load():
+    data = {1: Employee(1, 'Amna', 'Abu Dhabi', '050 123 4567', 'Sales', 'Clerk', 1000)}
+    loaded = load_legacy(io.BytesIO(pickle.dumps(data)))
+    assert loaded[1].name == 'Amna' and loaded[1].salary == 1000
+
+
+class Payload:
+    def __reduce__(self):
+        return os.system, ('echo unsafe',)
+
+
+@pytest.mark.parametrize('value', [Payload(), {1: Payload()}, ('put', 1, Payload())])
+def test_unknown_globals_are_refused(value):
+    with pytest.raises(pickle.UnpicklingError, match='not allowed'):
+        load_legacy(io.BytesIO(pickle.dumps(value)))
+
+
+def test_classes_of_other_modules_are_refused():
+    with pytest.raises(pickle.UnpicklingError, match='not allowed'):
+        load_legacy(io.BytesIO(pickle.dumps(io.BytesIO)))
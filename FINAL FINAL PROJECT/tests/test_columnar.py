@@ -0,0 +1,88 @@
+import pytest
+from CLASSES import Guest
+from COLUMNAR import GuestTable
+
+
+def guest(key, name=None, cost='100', event_type=None, services=None):
+    return Guest(key, name or f'Guest {key}', f'guest{key}@example.com', '050 123 4567', cost, event_type, services)
+
+
+def table_of(count):
+    table = GuestTable()
+    for number in range(1, count + 1):
+        table[str(number)] = guest(str(number))
+    return table
+
+
+def test_rows_read_back():
+    table = table_of(3)
+    table['G7'] = guest('G7', cost='$1,200.50', event_type='Wedding', services=['Catering'])
+    row = table['G7']
+    assert (row.name, row.total_cost, row.event_type, row.services) == ('Guest G7', '1200.50', 'Wedding', ['Catering'])
+    assert table['2'].total_cost == '100.00'
+    assert list(table) == ['1', '2', '3', 'G7']
+    assert 'G8' not in table and '4' not in table
+    with pytest.raises(KeyError):
+        table['4']
+
+
+def test_costs_that_are_not_numbers_are_kept_as_typed():
+    table = table_of(1)
+    table['1'].total_cost = 'ask the client'
+    assert table['1'].total_cost == 'ask the client'
+    assert table.total_revenue() == 0
+
+
+def test_running_totals_follow_every_change():
+    table = table_of(3)
+    table['1'] = guest('1', cost='200', event_type='Wedding')
+    table['2'] = guest('2', cost='50', event_type='Wedding')
+    table['3'] = guest('3', cost='75', event_type='Birthday')
+    table['2'].event_type = 'Birthday'
+    del table['3']
+    assert table.guests_per_event_type() == {'Wedding': 1, 'Birthday': 1}
+    assert table.revenue_per_event_type() == {'Wedding': 200.0, 'Birthday': 50.0}
+    assert table.total_revenue() == 250.0
+
+
+def test_large_and_text_ids_stay_out_of_the_dense_index():
+    table = table_of(3)
+    table['9999999999'] = guest('9999999999')
+    table['007'] = guest('007')  # Not a plain number, "7" is a different guest
+    assert len(table.rows) < 1024
+    assert table['9999999999'].name == 'Guest 9999999999'
+    assert '7' not in table and '007' in table
+    del table['9999999999']
+    assert '9999999999' not in table and len(table) == 4
+
+
+def test_compaction_keeps_every_guest():
+    table = table_of(3000)
+    for number in list(range(1, 3000, 2)) + [3000]:
+        del table[str(number)]  # Compacts once more than half the rows are deleted
+    assert len(table.ids) == len(table) == 1499
+    assert '1' not in table and '3000' not in table
+    assert all(table[str(number)].name == f'Guest {number}' for number in range(2, 3000, 2))
+    assert table.total_revenue() == 1499 * 100.0
+
+
+def test_update_that_compacts_writes_the_right_guest():
+    # Renames leave garbage text behind, the rename that crosses the limit compacts the table before
+    # the rest of the guest is written; rows after deleted ones move down when that happens
+    table = table_of(3000)
+    for number in range(1, 11):
+        del table[str(number)]
+    compacted = False
+    for attempt in range(200):
+        rows_before = len(table.ids)
+        table['216'] = guest('216', name='x' * 1000 + str(attempt), cost=str(1000 + attempt), event_type='Wedding',
+                             services=['Catering'])
+        compacted = compacted or len(table.ids) < rows_before
+        assert table['216'].total_cost == f'{1000 + attempt}.00'
+        assert table['216'].event_type == 'Wedding'
+        assert table['216'].services == ['Catering']
+    assert compacted
+    assert table['226'].total_cost == '100.00'
+    assert table['226'].event_type is None
+    assert table.guests_per_event_type() == {'Wedding': 1}
+    assert table.total_revenue() == 2989 * 100.0 + 1199
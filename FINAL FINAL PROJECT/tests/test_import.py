@@ -0,0 +1,47 @@
+import json
+from SERVICES import open_service
+
+
+def write_json(path, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(rows, f)
+    return str(path)
+
+
+def test_import_reserves_only_the_ids_it_uses(tmp_path):
+    path = write_json(tmp_path / 'employees.json', [{'name': 'Amna', 'salary': '1000'},
+                                                    {'name': 'Omar', 'salary': '900'}])
+    service = open_service(str(tmp_path))
+    assert service.import_records('employees', path) == (2, [])
+    service.create_employee('Sara', 'Sales', 'Clerk', '800')
+    assert sorted(service.employees.keys()) == [1, 2, 3]
+    service.close()
+
+    service = open_service(str(tmp_path))
+    service.create_employee('Mariam', 'Sales', 'Clerk', '800')
+    assert sorted(service.employees.keys()) == [1, 2, 3, 4]
+    service.close()
+
+
+def test_imported_ids_move_the_counter(tmp_path):
+    path = write_json(tmp_path / 'employees.json', [{'id': 40, 'name': 'Amna', 'salary': '1000'},
+                                                    {'name': 'Omar', 'salary': '900'},
+                                                    {'name': '', 'salary': '900'}])
+    service = open_service(str(tmp_path))
+    count, errors = service.import_records('employees', path)
+    assert (count, [number for number, error in errors]) == (2, [3])
+    service.create_employee('Sara', 'Sales', 'Clerk', '800')
+    assert sorted(service.employees.keys()) == [1, 40, 41]
+    service.close()
+
+
+def test_import_notifies_once_and_strips_ids(tmp_path):
+    rows = [{'id': f' G{number} ', 'name': f'Guest {number}', 'total_cost': '10'} for number in range(2500)]
+    path = write_json(tmp_path / 'guests.json', rows)
+    service = open_service(str(tmp_path))
+    changes = []
+    service.guests.subscribe(lambda change, key: changes.append((change, len(key))))
+    assert service.import_records('guests', path) == (2500, [])
+    assert changes == [('bulk', 2500)]
+    assert 'G0' in service.guests and ' G0 ' not in service.guests
+    service.close()
@@ -0,0 +1,100 @@
+import os
+from CLASSES import Employee
+from JOURNAL import JournalStore
+from REPOSITORY import to_row
+
+
+def employee(key, name, salary=1000):
+    return Employee(key, name, 'Abu Dhabi', '050 123 4567', 'Sales', 'Clerk', salary)
+
+
+def rows(data):
+    return {key: to_row('employees', record) for key, record in data.items()}
+
+
+def open_store(directory, compact_every=500):
+    # Changes are written as they are made, so two stores on one folder act like two processes
+    return JournalStore(str(directory), compact_every=compact_every, write_delay=None)
+
+
+def test_journal_round_trip(tmp_path):
+    store = open_store(tmp_path)
+    store.load('employees')
+    store.put('employees', 1, employee(1, 'Amna'))
+    store.put_many('employees', [(2, employee(2, 'Omar')), (3, employee(3, 'Sara'))])
+    store.put('employees', 1, employee(1, 'Amna', 2500))
+    store.delete('employees', 2)
+    store.close()
+
+    data = open_store(tmp_path).load('employees')
+    assert rows(data) == {1: to_row('employees', employee(1, 'Amna', 2500)),
+                          3: to_row('employees', employee(3, 'Sara'))}
+
+
+def test_changes_of_other_stores_are_read(tmp_path):
+    first, second = open_store(tmp_path), open_store(tmp_path)
+    first.load('employees')
+    second.load('employees')
+    first.put('employees', 1, employee(1, 'Amna'))
+    first.delete('employees', 1)
+    first.put('employees', 2, employee(2, 'Omar'))
+
+    data, changes, conflicts = second.refresh('employees')
+    assert data is None
+    assert conflicts == []
+    assert {key: record and to_row('employees', record) for key, record in changes} == {
+        1: None, 2: to_row('employees', employee(2, 'Omar'))}
+
+
+def test_first_change_to_a_record_wins(tmp_path):
+    first, second = open_store(tmp_path), open_store(tmp_path)
+    first.put('employees', 1, employee(1, 'Amna'))
+    first.load('employees')
+    second.load('employees')
+    first.put('employees', 1, employee(1, 'Amna', 3000))
+    second.put('employees', 1, employee(1, 'Amna', 4000))  # Made to the version the first store replaced
+    second.put('employees', 2, employee(2, 'Omar'))  # A different record still merges
+
+    data, changes, conflicts = second.refresh('employees')
+    assert conflicts == [1]
+    assert [(key, to_row('employees', record)) for key, record in changes] == [
+        (1, to_row('employees', employee(1, 'Amna', 3000)))]
+    first.close()
+    second.close()
+    assert rows(open_store(tmp_path).load('employees')) == {1: to_row('employees', employee(1, 'Amna', 3000)),
+                                                            2: to_row('employees', employee(2, 'Omar'))}
+
+
+def test_compaction_keeps_journal_0_for_stores_behind(tmp_path):
+    first, second = open_store(tmp_path, compact_every=3), open_store(tmp_path, compact_every=3)
+    first.load('employees')
+    second.load('employees')
+    first.put('employees', 1, employee(1, 'Amna'))
+    first.put('employees', 2, employee(2, 'Omar'))
+    first.put('employees', 3, employee(3, 'Sara'))  # The third entry starts a compaction
+    first.close()  # Waits for the snapshot to be written
+    assert os.path.exists(tmp_path / 'employees.0.snap')
+    assert os.path.exists(tmp_path / 'employees.pkl.journal.0')
+
+    # The second store never read journal 0, it still finds the changes there
+    data, changes, conflicts = second.refresh('employees')
+    assert data is None
+    assert sorted(key for key, record in changes) == [1, 2, 3]
+
+    second.put('employees', 4, employee(4, 'Mariam'))  # Written to the journal of generation 1
+    second.close()
+    assert sorted(open_store(tmp_path).load('employees')) == [1, 2, 3, 4]
+
+
+def test_compacting_again_folds_the_snapshot_and_later_journals(tmp_path):
+    store = open_store(tmp_path)
+    store.put('employees', 1, employee(1, 'Amna'))
+    store.compact('employees')
+    store.put('employees', 1, employee(1, 'Amna', 2000))
+    store.delete('employees', 1)
+    store.put('employees', 2, employee(2, 'Omar'))
+    store.compact('employees')
+    store.close()
+    assert os.path.exists(tmp_path / 'employees.1.snap')
+    assert not os.path.exists(tmp_path / 'employees.0.snap')
+    assert rows(open_store(tmp_path).load('employees')) == {2: to_row('employees', employee(2, 'Omar'))}
@@ -0,0 +1,60 @@
+import random
+from CLASSES import Catering, Supplier
+from ENUMS import EventType
+from MATCHING import CapacityIndex, build_tree, stab
+from OBSERVABLE import ObservableDict
+
+
+def supplier(key, event_types, low, high):
+    return Supplier(key, f'Supplier {key}', '', '', event_types, low, high)
+
+
+def test_stab_matches_a_scan_of_every_interval():
+    random.seed(4)
+    for trial in range(50):
+        intervals = []
+        for key in range(random.randrange(60)):
+            low = random.randrange(200)
+            intervals.append((low, low + random.choice([0, 1, 10, 100]), key))
+        tree = build_tree(intervals)
+        for guests in range(-5, 310, 3):
+            expected = sorted(key for low, high, key in intervals if low <= guests <= high)
+            assert sorted(stab(tree, guests)) == expected
+    assert stab(build_tree([]), 10) == []
+
+
+def test_match_by_event_type_and_guests():
+    suppliers = ObservableDict({
+        1: supplier(1, [EventType.WEDDING], 50, 300),
+        2: supplier(2, ['BIRTHDAY', 'Wedding'], '10', '100'),  # Limits typed as text
+        3: supplier(3, [EventType.WEDDING], 100, 'no limit'),  # A maximum that cannot be read has none
+        4: supplier(4, [EventType.WEDDING], 500, 100),  # An empty range serves nobody
+        10: supplier(10, [EventType.GRADUATION], 0, 1000),
+    })
+    index = CapacityIndex().build(suppliers)
+    assert index.match('WEDDING', 80) == [1, 2]
+    assert index.match('WEDDING', 150) == [1, 3]
+    assert index.match('WEDDING', 5000) == [3]
+    assert index.match('BIRTHDAY', 101) == []
+    assert index.match('THEMED_PARTY', 50) == []
+    assert index.match_many([('WEDDING', 80), ('GRADUATION', 5), ('WEDDING', 80)]) == [[1, 2], [10], [1, 2]]
+
+
+def test_caterers_serve_every_event_type():
+    index = CapacityIndex().build({'C2': Catering('C2', 'Feast', '', '', 'Menu', 20, 200),
+                                   'C10': Catering('C10', 'Banquet', '', '', 'Menu', 20, 200)})
+    assert all(index.match(event_type.name, 50) == ['C2', 'C10'] for event_type in EventType)
+
+
+def test_index_follows_the_suppliers():
+    suppliers = ObservableDict({1: supplier(1, [EventType.WEDDING], 50, 300)})
+    index = CapacityIndex().build(suppliers)
+    index.follow(suppliers)
+    assert index.match('WEDDING', 80) == [1]
+    suppliers[2] = supplier(2, [EventType.WEDDING], 60, 90)
+    suppliers[1] = supplier(1, [EventType.BIRTHDAY], 50, 300)  # Moved to another event type
+    assert index.match('WEDDING', 80) == [2]
+    assert index.match('BIRTHDAY', 80) == [1]
+    del suppliers[2]
+    suppliers.update_many([(3, supplier(3, [EventType.WEDDING], 0, 100))])
+    assert index.match('WEDDING', 80) == [3]
@@ -0,0 +1,67 @@
+import itertools
+import random
+import pytest
+import PRICING
+from CLASSES import Guest
+from COLUMNAR import GuestTable
+from ENUMS import EventType, ServiceType
+from PRICING import PricingEngine, pricing
+
+EVENT_TYPES = [None, 'Wedding', 'WEDDING', 'Themed Party', EventType.GRADUATION, 'Unknown']
+SERVICES = [(), ('Catering',), ('catering', 'CLEANING'), (ServiceType.DECORATIONS, 'Furniture'), ('Juggling',)]
+QUOTES = list(itertools.product(EVENT_TYPES, SERVICES))
+
+
+@pytest.fixture(params=['lists', 'numpy'])
+def batches(request, monkeypatch):
+    # Price batches both with plain lists and, when it is installed, with NumPy
+    if request.param == 'numpy':
+        monkeypatch.setattr(PRICING, 'np', pytest.importorskip('numpy'))
+    else:
+        monkeypatch.setattr(PRICING, 'np', None)
+    monkeypatch.setattr(PRICING, 'numpy_checked', True)
+    return request.param
+
+
+def test_prices():
+    assert pricing.price('Wedding') == 1000
+    assert pricing.price(EventType.BIRTHDAY, ['Catering', 'Cleaning']) == 800
+    assert pricing.price('Unknown', ['Catering']) == 200
+    assert pricing.price('Graduation', ['Catering', 'Catering']) == 800  # A service counts once
+
+
+def test_price_batch_matches_price(batches):
+    engine = PricingEngine()
+    random.seed(1)
+    quotes = QUOTES + [random.choice(QUOTES) for number in range(500)]
+    assert engine.price_batch(quotes) == [engine.price(event_type, services) for event_type, services in quotes]
+    assert engine.price_batch([]) == []
+
+
+def test_code_prices_match_price():
+    event_values = [None, 'Wedding', 'Birthday', 'Unknown']
+    service_values = [(), ('Catering',), ('Cleaning', 'Decorations')]
+    prices = pricing.code_prices(event_values, service_values)
+    assert prices == [pricing.price(event_type, services)
+                      for event_type in event_values for services in service_values]
+
+
+def test_guest_table_reprice_matches_price(batches):
+    table = GuestTable()
+    random.seed(2)
+    for number in range(1, 2001):
+        event_type, services = random.choice(QUOTES)
+        event_type = None if event_type is None else str(getattr(event_type, 'name', event_type))
+        services = [str(getattr(service, 'value', service)) for service in services]
+        table[str(number)] = Guest(str(number), f'Guest {number}', '', '', random.choice(['0', '1000', 'ask']),
+                                   event_type, services)
+    for number in range(1, 2001, 7):
+        del table[str(number)]
+    expected = {key: pricing.price(table[key].event_type, table[key].services) for key in table
+                if table[key].event_type}
+    changed = set(table.reprice(pricing))
+    assert changed <= set(expected)
+    assert all(table[key].total_cost == f'{price:.2f}' for key, price in expected.items())
+    assert table.total_revenue() == sum(float(table[key].total_cost) for key in table
+                                        if table[key].total_cost.replace('.', '').isdigit())
+    assert table.reprice(pricing) == []  # Nothing left to change
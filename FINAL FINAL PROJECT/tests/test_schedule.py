@@ -0,0 +1,72 @@
+import random
+from datetime import date, timedelta
+from CLASSES import Event, Venue
+from ENUMS import EventType
+from OBSERVABLE import ObservableDict
+from SCHEDULE import ScheduleIndex, VenueSchedule
+
+
+def day(number):
+    return date(2026, 1, 1) + timedelta(days=number)
+
+
+def test_overlapping_bookings_are_all_found():
+    # A long booking hidden behind a short one that ends before the new start, e.g. imported events
+    schedule = VenueSchedule()
+    schedule.add(day(0), day(30), 'long')
+    schedule.add(day(5), day(5), 'short')
+    assert schedule.conflict(day(10), day(10)) == 'long'
+    assert schedule.conflict(day(10), day(10), ignore='long') is None
+    schedule.remove(day(0), day(30), 'long')
+    assert schedule.conflict(day(10), day(10)) is None
+    assert schedule.conflict(day(5), day(6)) == 'short'
+
+
+def test_conflicts_match_a_scan_of_every_booking():
+    random.seed(3)
+    for trial in range(100):
+        schedule = VenueSchedule()
+        bookings = []
+        for number in range(40):
+            if bookings and random.random() < 0.3:
+                booking = bookings.pop(random.randrange(len(bookings)))
+                schedule.remove(*booking)
+            else:
+                start = day(random.randrange(100))
+                booking = (start, start + timedelta(days=random.choice([0, 0, 1, 30])), str(number))
+                bookings.append(booking)
+                schedule.add(*booking)
+            start = day(random.randrange(110))
+            end = start + timedelta(days=random.randrange(3))
+            ignore = random.choice(bookings)[2] if bookings else None
+            clashes = {event_id for booked_start, booked_end, event_id in bookings
+                       if booked_start <= end and booked_end >= start and event_id != ignore}
+            found = schedule.conflict(start, end, ignore)
+            assert found in clashes if clashes else found is None
+
+
+def test_index_follows_the_events():
+    events = ObservableDict({'1': Event('1', EventType.WEDDING, '2026-03-01', 'Amna', 'Grand Hall'),
+                             '2': Event('2', EventType.BIRTHDAY, 'some day', 'Omar', 'Grand Hall')})
+    index = ScheduleIndex(lambda venue: venue.strip().lower()).build(events)
+    index.follow(events)
+    assert index.conflict('grand hall ', '2026-03-01') == '1'
+    assert index.conflict('Grand Hall', '2026-03-01', ignore='1') is None
+    assert index.conflict('Garden', '2026-03-01') is None
+
+    events['3'] = Event('3', EventType.GRADUATION, '2026-03-02', 'Sara', 'Grand Hall')
+    events['1'] = Event('1', EventType.WEDDING, '2026-03-05', 'Amna', 'Grand Hall')  # Moved to another day
+    del events['3']
+    assert index.conflict('Grand Hall', '2026-03-01') is None
+    assert index.conflict('Grand Hall', '2026-03-02') is None
+    assert index.conflict('Grand Hall', '2026-03-05') == '1'
+
+
+def test_free_venues():
+    events = ObservableDict({'1': Event('1', EventType.WEDDING, '2026-03-01', 'Amna', 'Grand Hall')})
+    venues = {'V1': Venue('V1', 'Grand Hall', '', '', 50, 500), 'V2': Venue('V2', 'Garden', '', '', '10', '100'),
+              'V3': Venue('V3', 'Tent', '', '', '', '')}
+    index = ScheduleIndex(lambda venue: venues[venue].name.lower() if venue in venues else venue.lower())
+    index.build(events)
+    assert index.free_venues(venues, '2026-03-01', 80) == ['V2', 'V3']
+    assert index.free_venues(venues, '2026-03-02', 300) == ['V1', 'V3']
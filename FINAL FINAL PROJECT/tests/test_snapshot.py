@@ -0,0 +1,54 @@
+import pytest
+from CLASSES import Employee
+from COMPRESSION import available_codecs
+from REPOSITORY import to_row
+from SNAPSHOT import ChunkedSnapshot, MappedSnapshot, open_snapshot, write_snapshot
+import SNAPSHOT
+
+
+def employees(count):
+    return {key: Employee(key, f'Employee {key}', f'Street {key}', '050 123 4567', 'Sales', 'Clerk', 1000.5 + key)
+            for key in range(1, count + 1)}
+
+
+def rows(items):
+    return {key: to_row('employees', record) for key, record in items}
+
+
+def test_mapped_snapshot_round_trip(tmp_path):
+    data = employees(50)
+    data['x-7'] = Employee('x-7', 'Nöura ☀', '', '', 'Sales', 'Clerk', 0)  # A text key and non-ASCII text
+    path = str(tmp_path / 'employees.0.snap')
+    write_snapshot(path, 'employees', data)
+
+    snapshot = open_snapshot(path, 'employees')
+    assert isinstance(snapshot, MappedSnapshot)
+    assert list(snapshot.keys()) == list(data)
+    assert rows(snapshot.items()) == rows(data.items())
+    key, record = snapshot.record_at(snapshot.find('x-7'))
+    assert (key, to_row('employees', record)) == ('x-7', to_row('employees', data['x-7']))
+    assert snapshot.find(51) == -1
+
+
+def test_mapped_snapshot_reads_missing_values_as_empty_text(tmp_path):
+    data = {1: Employee(1, 'Amna', None, None, 'Sales', 'Clerk', 1000)}
+    path = str(tmp_path / 'employees.0.snap')
+    write_snapshot(path, 'employees', data)
+    assert rows(open_snapshot(path, 'employees').items()) == {1: ('Amna', '', '', 'Sales', 'Clerk', 1000)}
+
+
+@pytest.mark.parametrize('codec', available_codecs())
+def test_compressed_snapshot_round_trip(tmp_path, monkeypatch, codec):
+    monkeypatch.setattr(SNAPSHOT, 'CHUNK_RECORDS', 16)  # Several chunks, the last one short
+    data = employees(50)
+    path = str(tmp_path / 'employees.0.snap')
+    write_snapshot(path, 'employees', data, codec)
+
+    snapshot = open_snapshot(path, 'employees')
+    assert isinstance(snapshot, ChunkedSnapshot)
+    assert list(snapshot.keys()) == list(data)
+    assert rows(snapshot.items()) == rows(data.items())
+
+
+def test_missing_snapshot(tmp_path):
+    assert open_snapshot(str(tmp_path / 'employees.0.snap'), 'employees') is None
@@ -0,0 +1,199 @@
+import importlib.util
+import os
+import random
+import pytest
+from OBSERVABLE import ObservableDict
+from SORTING import SortedIndex, key_order, parse_bound, sort_value
+
+
+class Record:
+    """class representing a record with the one field the tests sort by"""
+    def __init__(self, cost):
+        self.cost = cost
+
+
+def expected(collection, low=None, high=None, descending=False):
+    # The keys a view should hold, by sorting every record
+    value = sort_value('cost', 'number')
+    entries = [((0,) if value(record) is None else (1, value(record)), key_order(key), key)
+               for key, record in collection.items()]
+    if low is not None or high is not None:
+        entries = [entry for entry in entries if entry[0] != (0,) and (low is None or entry[0][1] >= low)
+                   and (high is None or entry[0][1] <= high)]
+    keys = [entry[2] for entry in sorted(entries)]
+    return keys[::-1] if descending else keys
+
+
+def random_cost():
+    return random.choice([None, 'n/a', str(random.randrange(50)), f'${random.randrange(50)}.50'])
+
+
+def test_views_stay_sorted_while_records_change():
+    random.seed(5)
+    collection = ObservableDict({key: Record(random_cost()) for key in range(300)})
+    collection['G1'] = Record('10')  # Text keys sort after numbers on ties
+    index = SortedIndex(sort_value('cost', 'number')).build(collection)
+    index.follow(collection)
+    views = [(index.view(), None, None, False), (index.view(descending=True), None, None, True),
+             (index.view(10, 30), 10, 30, False), (index.view(high=20, descending=True), None, 20, True)]
+    for number in range(500):
+        key = random.randrange(400)
+        if key in collection and random.random() < 0.3:
+            del collection[key]
+        else:
+            collection[key] = Record(random_cost())
+        if number % 50 == 0:
+            collection.update_many([(random.randrange(400), Record(random_cost())) for each in range(20)])
+        for view, low, high, descending in views:
+            keys = expected(collection, low, high, descending)
+            assert len(view) == len(keys)
+            assert view[:20] == keys[:20] and view[-5:] == keys[-5:]
+            assert view[3:40:7] == keys[3:40:7]
+            if keys:
+                position = random.randrange(len(keys))
+                assert view[position] == keys[position] and view.index(keys[position]) == position
+    assert 'missing' not in views[0][0]
+    with pytest.raises(IndexError):
+        views[0][0][len(collection)]
+
+
+def test_index_built_from_a_snapshot_catches_up():
+    # Lists build their index from a snapshot on another thread, then apply the keys changed meanwhile
+    collection = ObservableDict({key: Record(str(key)) for key in range(100)})
+    snapshot = dict(collection.items())
+    collection[5] = Record('500')
+    del collection[6]
+    collection[200] = Record('1')
+    index = SortedIndex(sort_value('cost', 'number')).build(snapshot)
+    index.follow(collection, changed=[5, 6, 200])
+    assert list(index.view()) == expected(collection)
+
+
+def test_parse_bound():
+    assert parse_bound('number', ' $1,200 ') == 1200.0
+    assert parse_bound('text', ' Smith ') == 'smith'
+    assert parse_bound('number', '') is None
+    with pytest.raises(ValueError):
+        parse_bound('number', 'cheap')
+
+
+class FakeTreeview:
+    """class representing the part of a ttk.Treeview the virtual list uses, without a display"""
+    def __init__(self, master=None, **kwargs):
+        self.items = []
+        self.headings = {}
+        self.idle = []
+
+    def insert(self, parent, index, iid=None, **kwargs):
+        self.items.insert(index, str(iid))
+
+    def delete(self, *items):
+        for item in items:
+            self.items.remove(str(item))
+
+    def get_children(self, item=None):
+        return tuple(self.items)
+
+    def move(self, item, parent, index):
+        self.items.remove(str(item))
+        self.items.insert(index, str(item))
+
+    def exists(self, item):
+        return str(item) in self.items
+
+    def item(self, item, option=None, **kwargs):
+        pass
+
+    def heading(self, column, option=None, **kwargs):
+        if option:
+            return self.headings.get(column, column)
+        self.headings[column] = kwargs.get('text', column)
+
+    def cget(self, option):
+        return 10
+
+    def winfo_height(self):
+        return 0
+
+    def after_idle(self, callback):
+        self.idle.append(callback)
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def yview_moveto(self, fraction):
+        pass
+
+    def run_idle(self):
+        idle, self.idle = self.idle, []
+        for callback in idle:
+            callback()
+
+
+class FakeScrollbar:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def set(self, *args):
+        pass
+
+
+@pytest.fixture
+def sorted_list(monkeypatch):
+    # A VirtualTreeview built on the fake Treeview, showing a sorted view of a collection
+    ttk = pytest.importorskip('tkinter.ttk')
+    monkeypatch.setattr(ttk, 'Treeview', FakeTreeview)
+    monkeypatch.setattr(ttk, 'Scrollbar', FakeScrollbar)
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'WIDGETS.py')
+    spec = importlib.util.spec_from_file_location('widgets_without_display', path)
+    widgets = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(widgets)
+    random.seed(6)
+    collection = ObservableDict({key: Record(str(random.randrange(50))) for key in range(500)})
+    index = SortedIndex(sort_value('cost', 'number')).build(collection)
+    index.follow(collection)
+    tree = widgets.VirtualTreeview(None, row=lambda key: {})
+    tree.show_collection(collection)
+    tree.show_order(index.view(descending=True), ('cost', True))
+    return tree, collection
+
+
+def window(tree, collection):
+    return [str(key) for key in expected(collection, descending=True)[tree.offset:tree.offset + 30]]
+
+
+def test_sorted_list_follows_changes(sorted_list):
+    tree, collection = sorted_list
+    assert tree.headings == {'cost': 'cost ▼'}
+    assert tree.items == window(tree, collection)
+    for number in range(200):
+        key = random.randrange(700)
+        if key in collection and random.random() < 0.3:
+            del collection[key]
+        else:
+            collection[key] = Record(str(random.randrange(50)))
+        if number % 20 == 0:
+            tree.run_idle()
+            tree.scroll_to(random.randrange(len(collection)))
+            assert tree.items == window(tree, collection)
+    tree.run_idle()
+    assert tree.items == window(tree, collection)
+
+
+def test_rows_deleted_from_a_sorted_list(sorted_list):
+    tree, collection = sorted_list
+    for number in range(30):
+        key = int(random.choice(tree.items))
+        if number % 2:
+            tree.delete(key)  # The row first, while the sorted view still holds the key
+            del collection[key]
+        else:
+            del collection[key]
+            tree.remove_key(key)
+        tree.add_keys([next(iter(collection))])
+        tree.run_idle()
+        assert tree.items == window(tree, collection)
+        assert str(key) not in tree.items
+    tree.set_rows(list(collection))
+    tree.delete(tree.keys[0])
+    assert len(tree.keys) == len(collection) - 1
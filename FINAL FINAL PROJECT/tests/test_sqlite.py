@@ -0,0 +1,38 @@
+import pytest
+from CLASSES import Employee, Guest
+from REPOSITORY import SQLiteRepository, to_row
+from SERVICES import open_service
+
+
+def employee(key, name, salary=1000):
+    return Employee(key, name, 'Abu Dhabi', '050 123 4567', 'Sales', 'Clerk', salary)
+
+
+def test_edited_records_keep_their_place(tmp_path):
+    repository = SQLiteRepository(str(tmp_path))
+    repository.put_many('employees', [(key, employee(key, name)) for key, name in ((1, 'Amna'), (2, 'Omar'),
+                                                                                 (3, 'Sara'))])
+    repository.put('employees', 1, employee(1, 'Amna', 2000))
+    repository.put_many('employees', [(2, employee(2, 'Omar', 3000))])
+    repository.put('employees', 4, employee(4, 'Mariam'))
+    assert repository.fetch_keys('employees') == [1, 2, 3, 4]
+    assert [key for key, row in repository.fetch_all('employees')] == [1, 2, 3, 4]
+    assert repository.fetch_one('employees', 1) == to_row('employees', employee(1, 'Amna', 2000))
+    repository.close()
+
+
+@pytest.mark.parametrize('backend', ['journal', 'sqlite'])
+def test_repriced_costs_look_the_same_on_every_backend(tmp_path, backend):
+    service = open_service(str(tmp_path), backend)
+    service.guests['1'] = Guest('1', 'Amna', '', '', '0', 'Wedding', ['Catering'])
+    service.guests['2'] = Guest('2', 'Omar', '', '', '0')
+    service.save_record('guests', '1')
+    service.save_record('guests', '2')
+    assert service.reprice_guests() == ['1']
+    service.set_guest_cost('2', '99.5')
+    service.close()
+
+    service = open_service(str(tmp_path), backend)
+    assert (service.guests['1'].total_cost, service.guests['2'].total_cost) == ('1200.00', '99.50')
+    assert service.reprice_guests() == []
+    service.close()
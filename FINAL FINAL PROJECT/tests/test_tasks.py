@@ -0,0 +1,81 @@
+import threading
+from TASKS import TaskQueue
+
+
+class Widget:
+    """class representing the part of a Tk widget a TaskQueue uses, after() calls are run by run_checks()"""
+    def __init__(self):
+        self.scheduled = []
+        self.reported = []
+
+    def after(self, delay, callback):
+        self.scheduled.append(callback)
+
+    def _root(self):
+        return self
+
+    def report_callback_exception(self, kind, error, traceback):
+        self.reported.append(error)
+
+    def run_checks(self):
+        while self.scheduled:
+            self.scheduled.pop(0)()
+
+
+def test_a_failing_callback_does_not_stop_the_others():
+    widget = Widget()
+    queue = TaskQueue(widget)
+    release = threading.Event()
+    results = []
+
+    def fail(result):
+        raise RuntimeError('broken screen')
+    first = queue.submit('first', lambda task: 1, fail)
+    second = queue.submit(None, lambda task: 2, results.append)
+    first.future.result(), second.future.result()
+    slow = queue.submit('slow', lambda task: release.wait(5) and 3, results.append)
+    widget.scheduled.pop(0)()  # One check with the two quick tasks finished
+
+    assert results == [2]
+    assert [str(error) for error in widget.reported] == ['broken screen']
+    assert widget.scheduled, "the slow task is still checked"
+    release.set()
+    slow.future.result()
+    widget.run_checks()
+    assert results == [2, 3]
+    queue.shutdown()
+
+
+def test_errors_go_to_on_error_or_are_reported():
+    widget = Widget()
+    queue = TaskQueue(widget)
+    errors = []
+
+    def work(task):
+        raise ValueError('bad file')
+    handled = queue.submit('handled', work, on_error=errors.append)
+    unhandled = queue.submit('unhandled', work)
+    handled.future.exception(), unhandled.future.exception()
+    widget.run_checks()
+    assert [str(error) for error in errors] == ['bad file']
+    assert [str(error) for error in widget.reported] == ['bad file']
+    queue.shutdown()
+
+
+def test_cancelled_tasks_only_call_on_cancel():
+    widget = Widget()
+    queue = TaskQueue(widget)
+    calls = []
+    started = threading.Event()
+
+    def work(task):
+        started.set()
+        while True:
+            task.report(0)
+    task = queue.submit('long', work, calls.append, calls.append, lambda: calls.append('cancelled'))
+    started.wait(5)
+    task.cancel()
+    task.future.exception(5)
+    widget.run_checks()
+    assert calls == ['cancelled']
+    queue.shutdown()